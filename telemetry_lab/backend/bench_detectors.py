@@ -0,0 +1,115 @@
+"""Throughput of every registered leak detector.
+
+Each detector streams a flow series through ``update_batch`` in
+``--chunk-rows`` batches (the ``detect_leaks`` path) and evaluates an
+``--series`` x ``--rows`` array in one ``detect_batch`` call (the
+many-segments path). Rows per second for both are printed as one JSON line
+per detector.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from telemetry_lab.backend.detect_leaks import DETECTORS, make_detector
+from telemetry_lab.backend.frame import CHUNK_ROWS, concat_frames, read_frame
+from telemetry_lab.backend.generate_data import generate_frames
+
+
+@dataclass
+class DetectorThroughput:
+    detector: str
+    rows: int
+    series: int
+    streaming_rows_per_second: float
+    batch_rows_per_second: float
+
+
+def _rate(rows: int, seconds: float) -> float:
+    return rows / seconds if seconds > 0 else 0.0
+
+
+def benchmark(
+    flows: np.ndarray, timestamps: np.ndarray, *, chunk_rows: int = CHUNK_ROWS
+) -> list[DetectorThroughput]:
+    """Time each registered detector on ``flows`` (n_series x n_samples).
+
+    Streaming runs over the first series only; the batch call covers them all.
+    """
+    results = []
+    for name in sorted(DETECTORS):
+        detector = make_detector(name)
+        started = time.perf_counter()
+        for start in range(0, flows.shape[1], chunk_rows):
+            stop = start + chunk_rows
+            detector.update_batch(flows[0, start:stop], timestamps[start:stop])
+        detector.finish(int(timestamps[-1]))
+        streaming = time.perf_counter() - started
+
+        started = time.perf_counter()
+        make_detector(name).detect_batch(flows)
+        batch = time.perf_counter() - started
+        results.append(
+            DetectorThroughput(
+                detector=name,
+                rows=flows.shape[1],
+                series=flows.shape[0],
+                streaming_rows_per_second=_rate(flows.shape[1], streaming),
+                batch_rows_per_second=_rate(flows.size, batch),
+            )
+        )
+    return results
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Measure leak detector throughput.")
+    parser.add_argument(
+        "--in",
+        dest="input_path",
+        default=None,
+        help="Telemetry CSV or .cols to replay (default: generate --rows baseline samples).",
+    )
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Generated samples per series.")
+    parser.add_argument("--series", type=int, default=8, help="Series in the batch call.")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--chunk-rows", type=int, default=CHUNK_ROWS, help="Rows per streaming batch."
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    if args.input_path:
+        frame = read_frame(Path(args.input_path))
+        frame = frame.take(~frame.missing)
+        flows = np.tile(frame.channels["flow"], (args.series, 1))
+    else:
+        frames = [
+            concat_frames(
+                list(
+                    generate_frames(
+                        start_time=datetime(2024, 1, 1),
+                        samples=args.rows,
+                        seed=args.seed,
+                        tag=tag,
+                    )
+                )
+            )
+            for tag in range(args.series)
+        ]
+        frame = frames[0]
+        flows = np.stack([item.channels["flow"] for item in frames])
+    for result in benchmark(flows, frame.timestamps, chunk_rows=args.chunk_rows):
+        print(json.dumps(asdict(result)))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,52 @@
-"""Leak detection baseline using EWMA + persistence window."""
+"""Leak detection baseline using EWMA (or CUSUM) + persistence window.
+
+``detect_leaks`` and ``detect_leaks_batch`` evaluate whole series (or a 2-D
+array of pipeline segments) with vectorized operations; ``LeakDetector``
+is the incremental form for live feeds. Both run on raw telemetry: missing
+samples are skipped without resetting the EWMA, so a run of low flow carries
+across a gap, and alert indices refer to the raw rows.
+
+``DETECTORS`` maps a name to each ``RunDetector`` (``ewma`` and ``cusum``);
+all of them stream with ``update``/``update_batch`` and evaluate many series
+at once with ``detect_batch``.
+"""
 
 from __future__ import annotations
 
 import argparse
-import csv
 import json
+import sys
+from abc import ABC, abstractmethod
 from dataclasses import asdict, dataclass
 from pathlib import Path
-from typing import Iterable
+from typing import Callable, ClassVar, Iterable, Self, Sequence
+
+import numpy as np
+
+from telemetry_lab.backend import frame as frame_module
+from telemetry_lab.backend.frame import (
+    CHUNK_ROWS,
+    format_timestamps,
+    is_columnar,
+    iter_frames,
+    load_column,
+    read_frame,
+)
+from telemetry_lab.backend.metrics import stage_timer
+from telemetry_lab.backend.result_cache import (
+    DEFAULT_MAX_BYTES,
+    ResultCache,
+    cache_key,
+    code_version,
+)
+
+LEAK_REASON = "Sustained flow drop vs EWMA baseline"
+CUSUM_REASON = "Sustained flow drop vs EWMA baseline (CUSUM)"
+
+# Samples per step of the blocked EWMA filter; one step is a small matrix
+# product, so the Python loop runs once per block rather than once per sample.
+EWMA_BLOCK = 64
+CUSUM_BLOCK = 4096
 
 
 @dataclass
@@ -18,6 +57,17 @@ class LeakAlert:
     reason: str
 
 
+@dataclass
+class SegmentLeakAlert(LeakAlert):
+    segment_id: str
+
+
+@dataclass
+class TimedLeakAlert(LeakAlert):
+    start_time: str
+    end_time: str
+
+
 def ewma(values: list[float], alpha: float = 0.05) -> list[float]:
     smoothed: list[float] = []
     prev = values[0]
@@ -27,47 +77,479 @@ def ewma(values: list[float], alpha: float = 0.05) -> list[float]:
     return smoothed
 
 
-def detect_leaks(flow_values: list[float], persistence: int = 6) -> list[LeakAlert]:
-    """Detect sustained flow drops relative to EWMA baseline."""
-    if not flow_values:
-        return []
+def ewma_filter(
+    values: np.ndarray, alpha: float = 0.05, initial: np.ndarray | float | None = None
+) -> np.ndarray:
+    """EWMA along the last axis of ``values`` as a blocked recursive filter.
 
-    baseline = ewma(flow_values)
-    alerts: list[LeakAlert] = []
+    Within a block of ``EWMA_BLOCK`` samples the recursion unrolls to
+    ``y[t] = d**(t + 1) * y[-1] + sum(alpha * d**(t - k) * x[k])`` with
+    ``d = 1 - alpha``, i.e. one matrix product for every series at once.
+    ``initial`` is the EWMA value before the first sample (defaults to the
+    first sample, matching ``ewma``).
+    """
+    values = np.asarray(values, dtype=np.float64)
+    smoothed = np.empty_like(values)
+    if not values.shape[-1]:
+        return smoothed
+    prev = values[..., 0] if initial is None else np.broadcast_to(initial, values.shape[:-1])
+    steps = np.arange(EWMA_BLOCK)
+    lags = steps[None, :] - steps[:, None]
+    weights = np.where(lags >= 0, alpha * (1 - alpha) ** np.maximum(lags, 0), 0.0)
+    decay = (1 - alpha) ** (steps + 1)
+    for start in range(0, values.shape[-1], EWMA_BLOCK):
+        block = values[..., start : start + EWMA_BLOCK]
+        width = block.shape[-1]
+        out = block @ weights[:width, :width] + prev[..., None] * decay[:width]
+        smoothed[..., start : start + width] = out
+        prev = out[..., -1]
+    return smoothed
+
+
+def cusum(increments: np.ndarray, initial: np.ndarray | float = 0.0) -> np.ndarray:
+    """One-sided CUSUM ``s[t] = max(0, s[t - 1] + z[t])`` along the last axis.
+
+    The recursion unrolls to ``s[t] = C[t] - min(-s[-1], min(C[1..t]))``
+    with ``C`` the running sum of ``z``, so each block of ``CUSUM_BLOCK``
+    samples is a cumulative sum and a running minimum over every series at
+    once. Restarting the sum per block keeps it small. ``initial`` is the
+    sum before the first sample.
+    """
+    increments = np.asarray(increments, dtype=np.float64)
+    sums = np.empty_like(increments)
+    prev = np.broadcast_to(np.asarray(initial, dtype=np.float64), increments.shape[:-1])
+    for start in range(0, increments.shape[-1], CUSUM_BLOCK):
+        running = np.cumsum(increments[..., start : start + CUSUM_BLOCK], axis=-1)
+        floor = np.minimum(np.minimum.accumulate(running, axis=-1), -prev[..., None])
+        out = running - floor
+        sums[..., start : start + out.shape[-1]] = out
+        prev = out[..., -1]
+    return sums
+
+
+def persistent_runs(
+    below: np.ndarray, persistence: int = 1
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Run-length encode a 2-D below-baseline mask.
+
+    Returns the row, start and inclusive end of every run of at least
+    ``persistence`` consecutive ``True`` values, in row-major order.
+    """
+    padded = np.zeros((below.shape[0], below.shape[1] + 2), dtype=np.int8)
+    padded[:, 1:-1] = below
+    edges = np.diff(padded, axis=1)
+    rows, starts = np.nonzero(edges == 1)
+    _, stops = np.nonzero(edges == -1)
+    keep = stops - starts >= persistence
+    return rows[keep], starts[keep], stops[keep] - 1
+
+
+def _leak_runs(
+    flows: np.ndarray, persistence: int, alpha: float, drop_threshold: float
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return (segment, start, end) of every below-baseline run that persists."""
+    return persistent_runs(flows < ewma_filter(flows, alpha) - drop_threshold, persistence)
+
+
+def _confidences(starts: np.ndarray, ends: np.ndarray) -> list[float]:
+    return np.minimum(0.95, 0.5 + 0.05 * (ends - starts + 1)).tolist()
+
+
+@dataclass
+class AlertEvent:
+    event: str
+    timestamp: int
+    alert: LeakAlert
+    start_timestamp: int
+    end_timestamp: int
 
-    below: list[int] = []
-    for idx, (value, base) in enumerate(zip(flow_values, baseline, strict=True)):
-        if value < base - 2.5:
-            below.append(idx)
+    def timed_alert(self) -> TimedLeakAlert:
+        """The alert with the timestamps of its first and last sample."""
+        start, end = format_timestamps(np.array([self.start_timestamp, self.end_timestamp]))
+        return TimedLeakAlert(**asdict(self.alert), start_time=start, end_time=end)
+
+
+def _confidence(run_length: int) -> float:
+    return min(0.95, 0.5 + 0.05 * run_length)
+
+
+def _gaps(values: np.ndarray, missing: np.ndarray | None) -> np.ndarray:
+    gaps = np.isnan(values)
+    return gaps if missing is None else gaps | np.asarray(missing, dtype=bool)
+
+
+class RunDetector(ABC):
+    """Streaming and batch interface shared by the registered detectors.
+
+    Subclasses are dataclasses holding their parameters and carried state,
+    and only decide which samples are flagged: ``_flag`` for one sample
+    (O(1) in Python) and ``_flags`` for an array, vectorized along the last
+    axis. Everything else (runs of at least ``persistence`` flagged samples,
+    gaps, raw indices, open/close events, checkpoints) lives here.
+
+    ``index`` counts raw rows, missing ones included. A missing sample leaves
+    the detector state and the current run untouched, so runs span gaps and
+    confidence counts only the samples that were present.
+    """
+
+    reason: ClassVar[str]
+    persistence: int
+    index: int
+    run_start: int | None
+    run_length: int
+    run_end: int
+    run_start_time: int
+    run_end_time: int
+
+    @abstractmethod
+    def _flag(self, value: float) -> bool:
+        """Whether one sample is flagged; advances the state."""
+
+    @abstractmethod
+    def _flags(self, values: np.ndarray, carry: bool) -> np.ndarray:
+        """Flag mask for ``values``; ``carry`` continues from (and advances) the state."""
+
+    def _event(self, event: str, timestamp: int, run_start: int) -> AlertEvent:
+        alert = LeakAlert(
+            start_index=run_start,
+            end_index=self.run_end,
+            confidence=_confidence(self.run_length),
+            reason=self.reason,
+        )
+        return AlertEvent(
+            event=event,
+            timestamp=timestamp,
+            alert=alert,
+            start_timestamp=self.run_start_time,
+            end_timestamp=self.run_end_time,
+        )
+
+    def update(self, value: float, timestamp: int, missing: bool = False) -> list[AlertEvent]:
+        """Feed one flow sample; returns the alert events it opens or closes.
+
+        A ``missing`` (or NaN) sample only advances the row index.
+        """
+        if missing or np.isnan(value):
+            self.index += 1
+            return []
+        events: list[AlertEvent] = []
+        if self._flag(value):
+            if self.run_start is None:
+                self.run_start, self.run_start_time = self.index, timestamp
+            self.run_length += 1
+            self.run_end, self.run_end_time = self.index, timestamp
+            if self.run_length == self.persistence:
+                events.append(self._event("open", timestamp, self.run_start))
         else:
-            if len(below) >= persistence:
-                alerts.append(
-                    LeakAlert(
-                        start_index=below[0],
-                        end_index=below[-1],
-                        confidence=min(0.95, 0.5 + 0.05 * len(below)),
-                        reason="Sustained flow drop vs EWMA baseline",
-                    )
-                )
-            below = []
-
-    if len(below) >= persistence:
-        alerts.append(
-            LeakAlert(
-                start_index=below[0],
-                end_index=below[-1],
-                confidence=min(0.95, 0.5 + 0.05 * len(below)),
-                reason="Sustained flow drop vs EWMA baseline",
+            events += self.finish(timestamp)
+        self.index += 1
+        return events
+
+    def finish(self, timestamp: int) -> list[AlertEvent]:
+        """Close the current run (end of input or recovery)."""
+        events: list[AlertEvent] = []
+        if self.run_start is not None and self.run_length >= self.persistence:
+            events.append(self._event("close", timestamp, self.run_start))
+        self.run_start = None
+        self.run_length = 0
+        return events
+
+    def update_batch(
+        self, values: np.ndarray, timestamps: np.ndarray, missing: np.ndarray | None = None
+    ) -> list[AlertEvent]:
+        """Feed a batch of samples at once; equivalent to calling ``update`` on each.
+
+        Rows flagged in ``missing`` (or NaN) are dropped up front and the rest
+        are mapped back to raw indices. The flags come from ``_flags`` and runs
+        from run-length encoding, so only runs that matter (long enough,
+        continuing the carried run, or still open at the end of the batch) are
+        visited in Python.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        count = len(values)
+        rows = np.flatnonzero(~_gaps(values, missing))
+        present, stamps = values[rows], np.asarray(timestamps)[rows]
+        if not len(rows):
+            self.index += count
+            return []
+        _, starts, ends = persistent_runs(self._flags(present, carry=True)[None, :])
+
+        events: list[AlertEvent] = []
+        if self.run_start is not None and not (starts.size and starts[0] == 0):
+            events += self.finish(int(stamps[0]))
+        carried = self.run_length
+        carried_start = self.index if self.run_start is None else self.run_start
+        last = len(rows) - 1
+        # A run continuing the carried one is always visited, so it is either
+        # extended or finished instead of leaking stale state into a later batch.
+        continues = (starts == 0) & (carried > 0)
+        relevant = (
+            (ends - starts + 1 + np.where(starts == 0, carried, 0) >= self.persistence)
+            | (ends == last)
+            | continues
+        )
+        for start, end in zip(starts[relevant].tolist(), ends[relevant].tolist(), strict=True):
+            prior = carried if start == 0 else 0
+            run_start = carried_start if prior else self.index + int(rows[start])
+            if not prior:
+                self.run_start_time = int(stamps[start])
+            length = prior + end - start + 1
+            if prior < self.persistence <= length:
+                opened_at = start + self.persistence - prior - 1
+                self.run_length = self.persistence
+                self.run_end = self.index + int(rows[opened_at])
+                self.run_end_time = int(stamps[opened_at])
+                events.append(self._event("open", self.run_end_time, run_start))
+            self.run_start, self.run_length = run_start, length
+            self.run_end, self.run_end_time = self.index + int(rows[end]), int(stamps[end])
+            if end < last:
+                events += self.finish(int(stamps[end + 1]))
+        self.index += count
+        return events
+
+    def detect_batch(
+        self, flows: np.ndarray, segment_ids: Sequence[str] | None = None
+    ) -> list[SegmentLeakAlert]:
+        """Alerts for an (n_segments x n_samples) array of gap-free flow series at once.
+
+        Uses this detector's parameters but not its carried state. Alerts carry
+        their segment id (the row number unless ``segment_ids`` is given).
+        """
+        flows = np.atleast_2d(np.asarray(flows, dtype=np.float64))
+        ids = [str(row) for row in range(flows.shape[0])] if segment_ids is None else segment_ids
+        segments, starts, ends = persistent_runs(self._flags(flows, carry=False), self.persistence)
+        return [
+            SegmentLeakAlert(
+                start_index=start,
+                end_index=end,
+                confidence=confidence,
+                reason=self.reason,
+                segment_id=ids[segment],
             )
+            for segment, start, end, confidence in zip(
+                segments.tolist(),
+                starts.tolist(),
+                ends.tolist(),
+                _confidences(starts, ends),
+                strict=True,
+            )
+        ]
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self))  # type: ignore[call-overload]
+
+    @classmethod
+    def from_json(cls, blob: str) -> Self:
+        return cls(**json.loads(blob))
+
+
+@dataclass
+class LeakDetector(RunDetector):
+    """Incremental EWMA + persistence detector.
+
+    ``update`` costs O(1) per sample: only the EWMA value and the current
+    below-baseline run are kept. The whole state is the dataclass itself, so
+    ``to_json``/``from_json`` checkpoint it and a restarted process resumes
+    where it stopped without replaying history. Timestamps are epoch seconds.
+    """
+
+    reason: ClassVar[str] = LEAK_REASON
+
+    alpha: float = 0.05
+    drop_threshold: float = 2.5
+    persistence: int = 6
+    index: int = 0
+    baseline: float | None = None
+    run_start: int | None = None
+    run_length: int = 0
+    run_end: int = 0
+    run_start_time: int = 0
+    run_end_time: int = 0
+
+    def _flag(self, value: float) -> bool:
+        if self.baseline is None:
+            self.baseline = value
+        self.baseline = self.alpha * value + (1 - self.alpha) * self.baseline
+        return value < self.baseline - self.drop_threshold
+
+    def _flags(self, values: np.ndarray, carry: bool) -> np.ndarray:
+        baseline = ewma_filter(values, self.alpha, self.baseline if carry else None)
+        if carry:
+            self.baseline = float(baseline[-1])
+        return values < baseline - self.drop_threshold
+
+
+@dataclass
+class CusumDetector(RunDetector):
+    """Two-sided CUSUM on the residual from an EWMA baseline.
+
+    Residuals beyond ``slack`` accumulate in a low-side sum (flow below the
+    baseline) and a high-side sum (above it). Only the low side flags samples,
+    so alerts are leaks; the high side is kept in ``high`` and reported by
+    ``surging`` for callers that watch for upward shifts. A small sustained
+    drop that never crosses the EWMA detector's ``drop_threshold`` still
+    builds up, so slow leaks are flagged sooner. ``persistence`` defaults to 1
+    because the sums already integrate over time.
+
+    The defaults come from ``tune_leaks --detector cusum`` on the demo and
+    generated injections: every leak is hit while about a fifth of the
+    sawtooth run is flagged. ``slack=0.5, threshold=5`` catches a 3-unit step
+    on a level flow but flags most of each sawtooth cycle.
+    """
+
+    reason: ClassVar[str] = CUSUM_REASON
+
+    alpha: float = 0.2
+    slack: float = 10.0
+    threshold: float = 50.0
+    persistence: int = 1
+    index: int = 0
+    baseline: float | None = None
+    low: float = 0.0
+    high: float = 0.0
+    run_start: int | None = None
+    run_length: int = 0
+    run_end: int = 0
+    run_start_time: int = 0
+    run_end_time: int = 0
+
+    def _flag(self, value: float) -> bool:
+        if self.baseline is None:
+            self.baseline = value
+        self.baseline = self.alpha * value + (1 - self.alpha) * self.baseline
+        residual = value - self.baseline
+        self.low = max(0.0, self.low - residual - self.slack)
+        self.high = max(0.0, self.high + residual - self.slack)
+        return self.low > self.threshold
+
+    def _flags(self, values: np.ndarray, carry: bool) -> np.ndarray:
+        baseline = ewma_filter(values, self.alpha, self.baseline if carry else None)
+        residual = values - baseline
+        low = cusum(-residual - self.slack, self.low if carry else 0.0)
+        high = cusum(residual - self.slack, self.high if carry else 0.0)
+        if carry:
+            self.baseline = float(baseline[-1])
+            self.low, self.high = float(low[-1]), float(high[-1])
+        return low > self.threshold
+
+    @property
+    def surging(self) -> bool:
+        """Whether flow has shifted above the baseline as of the last sample."""
+        return self.high > self.threshold
+
+
+DETECTORS: dict[str, Callable[..., RunDetector]] = {
+    "ewma": LeakDetector,
+    "cusum": CusumDetector,
+}
+
+
+# Tuning parameters each registered detector accepts besides ``persistence``.
+DETECTOR_PARAMS: dict[str, tuple[str, ...]] = {
+    "ewma": ("alpha", "drop_threshold"),
+    "cusum": ("alpha", "slack", "threshold"),
+}
+
+
+def make_detector(name: str, persistence: int | None = None, **params: float | None) -> RunDetector:
+    """A registered detector; ``persistence`` and ``params`` override its defaults if not None."""
+    given = {key: value for key, value in params.items() if value is not None}
+    if persistence is not None:
+        given["persistence"] = persistence
+    return DETECTORS[name](**given)
+
+
+def add_detector_arguments(parser: argparse.ArgumentParser) -> None:
+    """``--detector``, ``--persistence`` and the per-detector tuning flags."""
+    parser.add_argument(
+        "--detector",
+        choices=sorted(DETECTORS),
+        default="ewma",
+        help="Registered leak detector to run.",
+    )
+    parser.add_argument(
+        "--persistence",
+        type=int,
+        default=None,
+        help="Consecutive flagged points required to trigger an alert (detector default).",
+    )
+    parser.add_argument("--alpha", type=float, default=None, help="EWMA baseline weight.")
+    parser.add_argument(
+        "--drop-threshold",
+        dest="drop_threshold",
+        type=float,
+        default=None,
+        help="ewma: drop below the baseline that flags a sample.",
+    )
+    parser.add_argument(
+        "--slack", type=float, default=None, help="cusum: residual ignored per sample."
+    )
+    parser.add_argument(
+        "--threshold", type=float, default=None, help="cusum: low-side sum that flags a sample."
+    )
+
+
+def detector_params(parser: argparse.ArgumentParser, args: argparse.Namespace) -> dict[str, float]:
+    """The tuning flags given for ``args.detector``; other detectors' flags are errors."""
+    names = {name for accepted in DETECTOR_PARAMS.values() for name in accepted}
+    given = {name: getattr(args, name) for name in sorted(names) if getattr(args, name) is not None}
+    for name in given:
+        if name not in DETECTOR_PARAMS[args.detector]:
+            flag = "--" + name.replace("_", "-")
+            parser.error(f"{flag} does not apply to the {args.detector} detector")
+    if not 0 < given.get("alpha", 1.0) <= 1:
+        parser.error("--alpha must be in (0, 1]")
+    return given
+
+
+def detect_leaks(
+    flow_values: list[float] | np.ndarray,
+    persistence: int = 6,
+    *,
+    alpha: float = 0.05,
+    drop_threshold: float = 2.5,
+    missing: np.ndarray | None = None,
+) -> list[LeakAlert]:
+    """Detect sustained flow drops relative to EWMA baseline.
+
+    Missing samples (``missing`` or NaN) are skipped; indices are raw.
+    """
+    if not len(flow_values):
+        return []
+
+    values = np.asarray(flow_values, dtype=np.float64)
+    rows = np.flatnonzero(~_gaps(values, missing))
+    _, starts, ends = _leak_runs(values[None, rows], persistence, alpha, drop_threshold)
+    return [
+        LeakAlert(start_index=start, end_index=end, confidence=confidence, reason=LEAK_REASON)
+        for start, end, confidence in zip(
+            rows[starts].tolist(), rows[ends].tolist(), _confidences(starts, ends), strict=True
         )
+    ]
+
+
+def detect_leaks_batch(
+    flows: np.ndarray,
+    persistence: int = 6,
+    *,
+    alpha: float = 0.05,
+    drop_threshold: float = 2.5,
+    segment_ids: Sequence[str] | None = None,
+) -> list[SegmentLeakAlert]:
+    """Detect leaks on an (n_segments x n_samples) array of flow series at once.
 
-    return alerts
+    The EWMA baselines and the below-baseline run lengths of every segment are
+    computed with whole-array operations; alerts carry their segment id
+    (the row number unless ``segment_ids`` is given).
+    """
+    detector = LeakDetector(alpha=alpha, drop_threshold=drop_threshold, persistence=persistence)
+    return detector.detect_batch(flows, segment_ids)
 
 
 def read_flow(path: Path) -> list[float]:
-    with path.open("r", newline="") as handle:
-        rows = list(csv.DictReader(handle))
-    return [float(row["flow"]) for row in rows]
+    if is_columnar(path):
+        return load_column(path, "flow").tolist()
+    return read_frame(path).channels["flow"].tolist()
 
 
 def write_json(path: Path, alerts: Iterable[LeakAlert]) -> None:
@@ -81,8 +563,8 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument(
         "--in",
         dest="input_path",
-        default=str(Path(__file__).resolve().parents[1] / "data" / "cleaned.csv"),
-        help="Input CSV file with cleaned telemetry.",
+        default=str(Path(__file__).resolve().parents[1] / "data" / "sample.csv"),
+        help="Raw telemetry CSV or .cols; missing rows are skipped.",
     )
     parser.add_argument(
         "--out",
@@ -90,19 +572,54 @@ def parse_args() -> argparse.Namespace:
         default=str(Path(__file__).resolve().parents[1] / "data" / "alerts.json"),
         help="Output JSON file for alerts.",
     )
+    add_detector_arguments(parser)
     parser.add_argument(
-        "--persistence",
+        "--chunk-rows",
         type=int,
-        default=6,
-        help="Number of consecutive points required to trigger an alert.",
+        default=CHUNK_ROWS,
+        help="Rows read per batch; detector state carries across batches.",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        dest="cache_dir",
+        default=None,
+        help="Reuse alerts cached here for unchanged input, parameters and code.",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--cache-max-bytes", type=int, default=DEFAULT_MAX_BYTES, help="Result cache size limit."
+    )
+    args = parser.parse_args()
+    args.params = detector_params(parser, args)
+    return args
 
 
 def main() -> None:
     args = parse_args()
-    alerts = detect_leaks(read_flow(Path(args.input_path)), persistence=args.persistence)
-    write_json(Path(args.output_path), alerts)
+    detector = make_detector(args.detector, args.persistence, **args.params)
+    events: list[AlertEvent] = []
+    last_timestamp = 0
+    input_path = Path(args.input_path)
+    output_path = Path(args.output_path)
+    outputs = {"alerts.json": output_path}
+    cache = key = None
+    if args.cache_dir:
+        cache = ResultCache(Path(args.cache_dir), args.cache_max_bytes)
+        params = {"detector": args.detector, **json.loads(detector.to_json())}
+        code = code_version(sys.modules[__name__], frame_module)
+        key = cache_key("detect_leaks", input_path, params, code)
+
+    # A restored result is not a run: recording it would overwrite the stage's throughput.
+    if cache and key and cache.restore(key, outputs):
+        return
+    with stage_timer(output_path.parent, "detect_leaks") as timer:
+        for chunk in iter_frames(input_path, args.chunk_rows):
+            events += detector.update_batch(chunk.channels["flow"], chunk.timestamps, chunk.missing)
+            last_timestamp = int(chunk.timestamps[-1])
+            timer.rows += len(chunk)
+        events += detector.finish(last_timestamp)
+        write_json(output_path, [event.timed_alert() for event in events if event.event == "close"])
+        if cache and key:
+            cache.store(key, outputs)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,543 @@
+"""Columnar telemetry frame shared by the pipeline stages.
+
+Telemetry is parsed once into NumPy arrays (int64 epoch seconds plus one
+float64 array per channel) so detectors can run as vectorized operations
+instead of re-parsing CSV strings row by row. Artifacts can also be kept in a
+binary column store (``.cols``) that readers memory-map instead of parsing.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import io
+import struct
+import warnings
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from itertools import islice
+from pathlib import Path
+from typing import Any, BinaryIO, Iterable, Iterator, Mapping, Sequence, TextIO
+
+import numpy as np
+
+CHANNELS = ("flow", "pressure", "temperature")
+FIELDNAMES = ["timestamp", *CHANNELS]
+
+# Rows per chunk when streaming CSV input.
+CHUNK_ROWS = 1 << 16
+
+# Binary column store: a directory holding one ``.npy`` file per column. The
+# headers have a fixed size so rows can be streamed in and counted afterwards.
+COLUMNAR_SUFFIX = ".cols"
+_NPY_MAGIC = b"\x93NUMPY\x01\x00"
+_NPY_HEADER_BYTES = 128
+_COLUMN_DTYPES = {"timestamp": np.dtype("<i8"), **{name: np.dtype("<f8") for name in CHANNELS}}
+
+# Downsampling keeps a minimum and a maximum row per channel in every bucket.
+MIN_DOWNSAMPLE_POINTS = 2 * len(CHANNELS)
+
+
+@dataclass
+class TelemetryFrame:
+    timestamps: np.ndarray
+    channels: dict[str, np.ndarray]
+    missing: np.ndarray
+
+    @classmethod
+    def from_columns(
+        cls, timestamps: np.ndarray, channels: Mapping[str, np.ndarray]
+    ) -> TelemetryFrame:
+        """Build a frame from typed columns, deriving the missing mask."""
+        arrays = {name: np.asarray(channels[name], dtype=np.float64) for name in CHANNELS}
+        missing = np.zeros(len(timestamps), dtype=bool)
+        for values in arrays.values():
+            missing |= np.isnan(values)
+        return cls(
+            timestamps=np.asarray(timestamps, dtype=np.int64),
+            channels=arrays,
+            missing=missing,
+        )
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Mapping[str, str]]) -> TelemetryFrame:
+        """Parse ``csv.DictReader``-style rows into a frame."""
+        rows = list(rows)
+        return cls.from_columns(
+            parse_timestamps([row["timestamp"] for row in rows]),
+            {name: parse_values([row[name] for row in rows]) for name in CHANNELS},
+        )
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def take(self, selector: np.ndarray | slice) -> TelemetryFrame:
+        """Return the rows picked by a boolean mask, index array, or slice."""
+        return TelemetryFrame(
+            timestamps=self.timestamps[selector],
+            channels={name: values[selector] for name, values in self.channels.items()},
+            missing=self.missing[selector],
+        )
+
+    def to_rows(self) -> list[dict[str, str]]:
+        """Render the frame back into string rows (for CSV writers and tests)."""
+        columns = [
+            format_timestamps(self.timestamps).tolist(),
+            *[[repr(value) for value in self.channels[name].tolist()] for name in CHANNELS],
+        ]
+        return [dict(zip(FIELDNAMES, values, strict=True)) for values in zip(*columns)]
+
+
+def concat_frames(frames: Sequence[TelemetryFrame]) -> TelemetryFrame:
+    return TelemetryFrame(
+        timestamps=np.concatenate([frame.timestamps for frame in frames]),
+        channels={
+            name: np.concatenate([frame.channels[name] for frame in frames]) for name in CHANNELS
+        },
+        missing=np.concatenate([frame.missing for frame in frames]),
+    )
+
+
+def _parse_timestamp(value: str) -> int:
+    parsed = datetime.fromisoformat(value)
+    if parsed.microsecond:
+        raise ValueError(f"sub-second timestamp {value!r}: telemetry is stored in whole seconds")
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp())
+
+
+def parse_timestamps(values: list[str]) -> np.ndarray:
+    """Parse ISO-8601 strings into int64 epoch seconds (naive values are UTC).
+
+    Sub-second timestamps raise ``ValueError`` rather than being truncated.
+    """
+    try:
+        with warnings.catch_warnings():
+            # NumPy only warns about explicit offsets; route those through datetime.
+            warnings.simplefilter("error")
+            parsed = np.array(values, dtype="datetime64[us]").astype(np.int64)
+        seconds, fraction = np.divmod(parsed, 1_000_000)
+        if fraction.any():
+            raise ValueError("sub-second timestamp")
+        return seconds
+    except (ValueError, UserWarning):
+        return np.array([_parse_timestamp(value) for value in values], dtype=np.int64)
+
+
+def format_timestamps(timestamps: np.ndarray) -> np.ndarray:
+    """Format epoch seconds as the naive ISO-8601 strings the generator writes."""
+    return np.datetime_as_string(np.asarray(timestamps).astype("datetime64[s]"), unit="s")
+
+
+def nullable_floats(values: np.ndarray) -> list[float | None]:
+    """Floats for JSON payloads, with NaN as ``null``."""
+    return [None if value != value else value for value in values.tolist()]
+
+
+def columnar_payload(frame: TelemetryFrame) -> dict[str, Any]:
+    """Columnar JSON for a frame, with missing values as ``null``."""
+    return {
+        "timestamp": format_timestamps(frame.timestamps).tolist(),
+        **{name: nullable_floats(frame.channels[name]) for name in CHANNELS},
+    }
+
+
+def _parse_value(value: str) -> float:
+    try:
+        return float(value)
+    except ValueError:
+        return float("nan")
+
+
+def parse_values(values: list[str]) -> np.ndarray:
+    """Parse telemetry strings into float64; unparseable cells become NaN."""
+    try:
+        return np.array(values, dtype=np.float64)
+    except ValueError:
+        return np.array([_parse_value(value) for value in values], dtype=np.float64)
+
+
+def _records_to_frame(records: list[list[str]], positions: list[int]) -> TelemetryFrame:
+    columns = list(zip(*records)) or [() for _ in range(max(positions) + 1)]
+    return TelemetryFrame.from_columns(
+        parse_timestamps(list(columns[positions[0]])),
+        {
+            name: parse_values(list(columns[position]))
+            for name, position in zip(CHANNELS, positions[1:], strict=True)
+        },
+    )
+
+
+def frame_from_cells(cells: list[list[str]]) -> TelemetryFrame:
+    """Parse rows of cells in ``FIELDNAMES`` order into a frame."""
+    return _records_to_frame(cells, list(range(len(FIELDNAMES))))
+
+
+def is_columnar(path: Path) -> bool:
+    """True for a binary column store (a ``.cols`` directory of ``.npy`` files)."""
+    return path.suffix == COLUMNAR_SUFFIX or path.is_dir()
+
+
+def load_column(path: Path, name: str) -> np.ndarray:
+    """Memory-map one column of a column store without reading the others."""
+    return np.load(path / f"{name}.npy", mmap_mode="r")
+
+
+def open_columns(path: Path) -> TelemetryFrame:
+    """Open a column store as a frame whose arrays are read-only memory maps."""
+    return TelemetryFrame.from_columns(
+        load_column(path, "timestamp"), {name: load_column(path, name) for name in CHANNELS}
+    )
+
+
+def read_column_rows(path: Path, start: int, stop: int) -> TelemetryFrame:
+    """Rows ``[start, stop)`` of a column store, reading only those rows."""
+    return TelemetryFrame.from_columns(
+        load_column(path, "timestamp")[start:stop],
+        {name: load_column(path, name)[start:stop] for name in CHANNELS},
+    )
+
+
+def _npy_header(dtype: np.dtype, rows: int) -> bytes:
+    header = repr(
+        {"descr": np.lib.format.dtype_to_descr(dtype), "fortran_order": False, "shape": (rows,)}
+    )
+    header = header.ljust(_NPY_HEADER_BYTES - len(_NPY_MAGIC) - 3) + "\n"
+    return _NPY_MAGIC + struct.pack("<H", len(header)) + header.encode("latin1")
+
+
+def iter_frames(path: Path, chunk_rows: int = CHUNK_ROWS) -> Iterator[TelemetryFrame]:
+    """Stream telemetry (CSV or column store) as frames of at most ``chunk_rows`` rows.
+
+    Only one chunk of string records is alive at a time, so memory stays flat
+    however large the export is. Column stores yield zero-copy slices, with
+    the missing mask computed per slice rather than for the whole store.
+    """
+    if is_columnar(path):
+        timestamps = load_column(path, "timestamp")
+        channels = {name: load_column(path, name) for name in CHANNELS}
+        for start in range(0, len(timestamps), chunk_rows):
+            rows = slice(start, start + chunk_rows)
+            yield TelemetryFrame.from_columns(
+                timestamps[rows], {name: values[rows] for name, values in channels.items()}
+            )
+        return
+    with path.open("r", newline="") as handle:
+        reader = csv.reader(handle)
+        header = next(reader, [])
+        positions = [header.index(name) for name in FIELDNAMES]
+        while records := list(islice(reader, chunk_rows)):
+            yield _records_to_frame(records, positions)
+
+
+def iter_csv_cells(path: Path, chunk_rows: int = CHUNK_ROWS) -> Iterator[list[list[str]]]:
+    """Stream a CSV's rows as cells in ``FIELDNAMES`` order, exactly as written.
+
+    ``write_csv_cells`` copies such rows to another CSV without re-rendering
+    their timestamps or numbers.
+    """
+    with path.open("r", newline="") as handle:
+        reader = csv.reader(handle)
+        header = next(reader, [])
+        positions = [header.index(name) for name in FIELDNAMES]
+        while records := list(islice(reader, chunk_rows)):
+            yield [[record[position] for position in positions] for record in records]
+
+
+def write_csv_cells(path: Path, chunks: Iterable[list[list[str]]]) -> None:
+    with FrameWriter(path) as writer:
+        for cells in chunks:
+            writer.write_cells(cells)
+
+
+def read_appended(
+    path: Path, offset: int = 0, max_bytes: int = 1 << 23
+) -> tuple[TelemetryFrame, int]:
+    """Parse complete CSV rows written after byte ``offset`` of a growing file.
+
+    Returns the rows and the offset to resume from. A partially written last
+    line is left for the next call, and at most about ``max_bytes`` are read
+    per call. Offset 0 starts right after the header.
+    """
+    with path.open("rb") as handle:
+        header_line = handle.readline()
+        if not header_line.endswith(b"\n"):
+            return _records_to_frame([], list(range(len(FIELDNAMES)))), offset
+        header = next(csv.reader([header_line.decode("utf-8")]))
+        start = max(offset, len(header_line))
+        handle.seek(start)
+        data = handle.read(max_bytes)
+        if len(data) == max_bytes:
+            data += handle.readline()
+    end = data.rfind(b"\n") + 1
+    records = list(csv.reader(data[:end].decode("utf-8").splitlines()))
+    return _records_to_frame(records, [header.index(name) for name in FIELDNAMES]), start + end
+
+
+# Bytes before a reader's offset kept to recognise a file rewritten in place.
+_CURSOR_TAIL_BYTES = 256
+
+
+def _cursor_fingerprint(path: Path, offset: int) -> bytes:
+    with path.open("rb") as handle:
+        header = handle.readline()
+        start = max(offset - _CURSOR_TAIL_BYTES, len(header))
+        handle.seek(start)
+        return header + handle.read(max(offset - start, 0))
+
+
+@dataclass
+class AppendCursor:
+    """How far ``read_appended`` got into a growing CSV, and which file it was.
+
+    ``replaced`` notices when the file was swapped (new inode), truncated,
+    given an older mtime, or rewritten in place with a different header or
+    different bytes before the offset, so readers start over instead of
+    resuming mid-file with stale state.
+    """
+
+    offset: int = 0
+    inode: int | None = None
+    mtime_ns: int = 0
+    fingerprint: bytes = b""
+
+    def replaced(self, path: Path) -> bool:
+        if self.inode is None:
+            return False
+        stat = path.stat()
+        if (
+            stat.st_ino != self.inode
+            or stat.st_size < self.offset
+            or stat.st_mtime_ns < self.mtime_ns
+        ):
+            return True
+        return _cursor_fingerprint(path, self.offset) != self.fingerprint
+
+    def advance(self, path: Path, offset: int) -> None:
+        stat = path.stat()
+        self.offset, self.inode, self.mtime_ns = offset, stat.st_ino, stat.st_mtime_ns
+        self.fingerprint = _cursor_fingerprint(path, offset)
+
+    def to_dict(self) -> dict[str, Any]:
+        """JSON-ready state; ``from_dict`` restores it."""
+        return {**asdict(self), "fingerprint": self.fingerprint.hex()}
+
+    @classmethod
+    def from_dict(cls, state: dict[str, Any]) -> AppendCursor:
+        return cls(**{**state, "fingerprint": bytes.fromhex(state["fingerprint"])})
+
+
+def csv_line_ranges(path: Path, parts: int) -> list[tuple[int, int]]:
+    """Split a CSV's rows into up to ``parts`` byte ranges that start on line boundaries."""
+    size = path.stat().st_size
+    with path.open("rb") as handle:
+        bounds = [len(handle.readline())]
+        for part in range(1, parts):
+            target = bounds[0] + (size - bounds[0]) * part // parts
+            handle.seek(max(target - 1, bounds[-1]))
+            handle.readline()
+            bounds.append(max(handle.tell(), bounds[-1]))
+    bounds.append(size)
+    return [(first, last) for first, last in zip(bounds, bounds[1:]) if last > first]
+
+
+def read_csv_range(
+    path: Path, start: int, stop: int, halo_rows: int = 0
+) -> tuple[TelemetryFrame, int]:
+    """Parse the CSV rows in bytes ``[start, stop)`` plus up to ``halo_rows`` rows before them.
+
+    ``start`` must be a line boundary (see ``csv_line_ranges``). Returns the
+    rows and how many leading rows belong to the halo.
+    """
+    cells, halo = read_csv_range_cells(path, start, stop, halo_rows)
+    return frame_from_cells(cells), halo
+
+
+def read_csv_range_cells(
+    path: Path, start: int, stop: int, halo_rows: int = 0
+) -> tuple[list[list[str]], int]:
+    """``read_csv_range`` returning the rows as cells in ``FIELDNAMES`` order."""
+    with path.open("rb") as handle:
+        header_line = handle.readline()
+        header = next(csv.reader([header_line.decode("utf-8")]))
+        floor = len(header_line)
+        halo: list[bytes] = []
+        lookback = 256 * halo_rows
+        while halo_rows and start > floor:
+            first = max(start - lookback, floor)
+            handle.seek(first)
+            lines = handle.read(start - first).splitlines(keepends=True)
+            if first > floor:
+                lines = lines[1:]  # may begin mid-line
+            if len(lines) >= halo_rows or first == floor:
+                halo = lines[-halo_rows:]
+                break
+            lookback *= 2
+        handle.seek(start)
+        data = b"".join(halo) + handle.read(stop - start)
+    positions = [header.index(name) for name in FIELDNAMES]
+    records = csv.reader(data.decode("utf-8").splitlines())
+    return [[record[position] for position in positions] for record in records], len(halo)
+
+
+def read_frame(path: Path) -> TelemetryFrame:
+    """Read telemetry (CSV or column store) into a frame, parsing each column once."""
+    if is_columnar(path):
+        return open_columns(path)
+    frames = list(iter_frames(path))
+    if not frames:
+        return _records_to_frame([], list(range(len(FIELDNAMES))))
+    return frames[0] if len(frames) == 1 else concat_frames(frames)
+
+
+class FrameWriter:
+    """Writes telemetry chunks to a CSV or column store as they are produced.
+
+    ``write`` renders frames; ``write_cells`` copies ``iter_csv_cells`` rows
+    to a CSV verbatim. Column store row counts are patched in on ``close``.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.rows = 0
+        self._columns: dict[str, BinaryIO] = {}
+        self._csv: TextIO | None = None
+        if is_columnar(path):
+            path.mkdir(parents=True, exist_ok=True)
+            self._columns = {name: (path / f"{name}.npy").open("wb") for name in FIELDNAMES}
+            for name, handle in self._columns.items():
+                handle.write(_npy_header(_COLUMN_DTYPES[name], 0))
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._csv = path.open("w", newline="")
+            self._writer = csv.writer(self._csv)
+            self._writer.writerow(FIELDNAMES)
+
+    def __enter__(self) -> FrameWriter:
+        return self
+
+    def __exit__(self, exc_type: type[BaseException] | None, *_: object) -> None:
+        self.close(complete=exc_type is None)
+
+    def write(self, frame: TelemetryFrame) -> None:
+        if self._csv is None:
+            self._columns["timestamp"].write(
+                frame.timestamps.astype(_COLUMN_DTYPES["timestamp"]).tobytes()
+            )
+            for name in CHANNELS:
+                self._columns[name].write(
+                    frame.channels[name].astype(_COLUMN_DTYPES[name]).tobytes()
+                )
+        else:
+            self._writer.writerows(_csv_rows(frame))
+        self.rows += len(frame)
+
+    def write_cells(self, cells: list[list[str]]) -> None:
+        if self._csv is None:
+            raise ValueError(f"{self.path}: CSV cells can only be copied to a CSV")
+        self._writer.writerows(cells)
+        self.rows += len(cells)
+
+    def close(self, complete: bool = True) -> None:
+        if self._csv is not None:
+            self._csv.close()
+        for name, handle in self._columns.items():
+            if complete:
+                handle.seek(0)
+                handle.write(_npy_header(_COLUMN_DTYPES[name], self.rows))
+            handle.close()
+
+
+def write_frames(path: Path, frames: Iterable[TelemetryFrame]) -> None:
+    """Write frames as they are produced (a column store if ``path`` ends in ``.cols``)."""
+    with FrameWriter(path) as writer:
+        for frame in frames:
+            writer.write(frame)
+
+
+def _csv_rows(frame: TelemetryFrame) -> Iterator[tuple[Any, ...]]:
+    return zip(
+        format_timestamps(frame.timestamps).tolist(),
+        *[frame.channels[name].tolist() for name in CHANNELS],
+    )
+
+
+def _write_csv(handle: TextIO, frames: Iterable[TelemetryFrame]) -> None:
+    writer = csv.writer(handle)
+    writer.writerow(FIELDNAMES)
+    for frame in frames:
+        writer.writerows(_csv_rows(frame))
+
+
+def write_frame(path: Path, frame: TelemetryFrame) -> None:
+    write_frames(path, [frame])
+
+
+def encode_csv(frame: TelemetryFrame) -> bytes:
+    """Render a frame as the same CSV bytes ``write_frame`` would put on disk."""
+    buffer = io.StringIO()
+    _write_csv(buffer, [frame])
+    return buffer.getvalue().encode("utf-8")
+
+
+def time_window(frame: TelemetryFrame, start: int | None, end: int | None) -> TelemetryFrame:
+    """Rows with ``start <= timestamp <= end`` (either bound optional), by binary search.
+
+    Timestamps must be sorted, which holds for every artifact the pipeline writes.
+    """
+    lo = 0 if start is None else int(np.searchsorted(frame.timestamps, start, side="left"))
+    hi = len(frame) if end is None else int(np.searchsorted(frame.timestamps, end, side="right"))
+    return frame.take(slice(lo, hi))
+
+
+def downsample(frame: TelemetryFrame, max_points: int) -> TelemetryFrame:
+    """Keep at most ``max_points`` rows, preserving every channel's extremes.
+
+    Rows are split into equal buckets; each bucket keeps the rows holding the
+    minimum and maximum of every channel, so spikes, dips and gaps survive.
+    Every pass is a reshape plus an arg-reduction, linear in the row count.
+    """
+    if max_points < MIN_DOWNSAMPLE_POINTS:
+        raise ValueError(f"max_points must be at least {MIN_DOWNSAMPLE_POINTS}")
+    rows = len(frame)
+    if rows <= max_points:
+        return frame
+    size = -(-rows // (max_points // MIN_DOWNSAMPLE_POINTS))
+    buckets = -(-rows // size)
+    base = np.arange(buckets) * size
+    keep: list[np.ndarray] = []
+    for name in CHANNELS:
+        # Missing values rank lowest, so a bucket with a gap keeps a missing row.
+        values = np.where(np.isnan(frame.channels[name]), -np.inf, frame.channels[name])
+        for fill, pick in ((np.inf, np.argmin), (-np.inf, np.argmax)):
+            padded = np.full(buckets * size, fill)
+            padded[:rows] = values
+            keep.append(base + pick(padded.reshape(buckets, size), axis=1))
+    return frame.take(np.unique(np.concatenate(keep)))
+
+
+def convert(source: Path, target: Path, chunk_rows: int = CHUNK_ROWS) -> None:
+    """Convert between CSV and column store; the direction follows the paths."""
+    write_frames(target, iter_frames(source, chunk_rows))
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Convert telemetry between CSV and the binary column store (.cols)."
+    )
+    parser.add_argument("--in", dest="input_path", required=True, help="Source CSV or .cols.")
+    parser.add_argument("--out", dest="output_path", required=True, help="Target CSV or .cols.")
+    parser.add_argument(
+        "--chunk-rows", type=int, default=CHUNK_ROWS, help="Rows converted per batch."
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    convert(Path(args.input_path), Path(args.output_path), args.chunk_rows)
+
+
+if __name__ == "__main__":
+    main()
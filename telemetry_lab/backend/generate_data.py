@@ -6,13 +6,25 @@ and has inline TODOs where future enhancements should go.
 
 from __future__ import annotations
 
+import argparse
 import csv
 import json
 from dataclasses import asdict, dataclass
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from random import Random
-from typing import Iterable
+from typing import Any, Iterable, Iterator, Mapping, Sequence
+
+import numpy as np
+
+from telemetry_lab.backend.frame import (
+    CHANNELS,
+    CHUNK_ROWS,
+    TelemetryFrame,
+    parse_timestamps,
+    write_frames,
+)
+from telemetry_lab.backend.metrics import stage_timer
 
 
 @dataclass
@@ -31,6 +43,39 @@ class InjectionEvent:
     description: str
 
 
+@dataclass
+class PlannedInjection(InjectionEvent):
+    channel: str
+    magnitude: float
+    start_time: str
+    end_time: str
+
+
+@dataclass
+class InjectionMagnitudes:
+    """Injection sizes in flow units; other channels use ``CHANNEL_SCALE``."""
+
+    spike: float = 50.0
+    drift: float = 4.0
+    leak: float = 3.5
+
+
+# Per-channel scale relative to flow, matching how jitter couples the channels.
+CHANNEL_SCALE = {"flow": 1.0, "pressure": 0.3, "temperature": 0.1}
+
+# The fixed demo injections reach sample 299, one sample per minute.
+DEMO_MIN_MINUTES = 300
+
+# Planned event kinds with their (min, max) length in samples.
+INJECTION_LENGTHS = {
+    "missing": (1, 10),
+    "flatline": (8, 30),
+    "spike": (1, 1),
+    "drift": (12, 40),
+    "leak": (30, 120),
+}
+
+
 def _base_profile(step: int) -> tuple[float, float, float]:
     """Return baseline flow/pressure/temperature for a time step."""
     flow = 100.0 + 2.5 * (step % 24)
@@ -62,6 +107,51 @@ def generate_points(
     return points
 
 
+def _base_profiles(steps: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Vectorized ``_base_profile`` over an array of time steps."""
+    flow = 100.0 + 2.5 * (steps % 24)
+    pressure = 50.0 + 0.4 * (steps % 48)
+    temperature = 20.0 + 0.1 * (steps % 72)
+    return flow, pressure, temperature
+
+
+def generate_frames(
+    *,
+    start_time: datetime,
+    samples: int,
+    interval: int = 60,
+    seed: int = 42,
+    tag: int = 0,
+    chunk_rows: int = CHUNK_ROWS,
+) -> Iterator[TelemetryFrame]:
+    """Generate a baseline series in chunks for scale runs.
+
+    Jitter is drawn from one generator per ``(seed, tag)``, so the output does
+    not depend on ``chunk_rows`` and each tag is an independent series.
+    """
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(tag,)))
+    origin = int(start_time.replace(tzinfo=start_time.tzinfo or timezone.utc).timestamp())
+    for start in range(0, samples, chunk_rows):
+        steps = np.arange(start, min(start + chunk_rows, samples), dtype=np.int64)
+        flow, pressure, temperature = _base_profiles(steps)
+        jitter = rng.uniform(-0.5, 0.5, len(steps))
+        yield TelemetryFrame.from_columns(
+            origin + steps * interval,
+            {
+                "flow": flow + jitter * CHANNEL_SCALE["flow"],
+                "pressure": pressure + jitter * CHANNEL_SCALE["pressure"],
+                "temperature": temperature + jitter * CHANNEL_SCALE["temperature"],
+            },
+        )
+
+
+def tag_paths(path: Path, tags: int) -> list[Path]:
+    """One output path per tag: ``path`` itself for a single tag, else numbered siblings."""
+    if tags == 1:
+        return [path]
+    return [path.with_name(f"{path.stem}-{tag:04d}{path.suffix}") for tag in range(tags)]
+
+
 def inject_quality_issues(points: list[TelemetryPoint]) -> list[InjectionEvent]:
     """Inject missing data, flatlines, spikes, and drift."""
     events: list[InjectionEvent] = []
@@ -131,6 +221,144 @@ def inject_small_leak(points: list[TelemetryPoint]) -> InjectionEvent:
     )
 
 
+def _plan_rng(seed: int, tag: int) -> np.random.Generator:
+    return np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(tag, 1)))
+
+
+def _draw_events(rng: np.random.Generator, events: int) -> tuple[np.ndarray, np.ndarray]:
+    """Kinds and lengths of ``events`` injections: the first draws of every plan."""
+    kinds = rng.choice(list(INJECTION_LENGTHS), size=events)
+    low, high = np.array([INJECTION_LENGTHS[str(kind)] for kind in kinds]).reshape(-1, 2).T
+    return kinds, rng.integers(low, high, endpoint=True)
+
+
+def _injection_slack(*, samples: int, events: int, seed: int, tag: int, spacing: int = 24) -> int:
+    """Samples left once a plan's events and their spacing are reserved (negative: no fit)."""
+    _, lengths = _draw_events(_plan_rng(seed, tag), events)
+    return samples - int(lengths.sum()) - spacing * events
+
+
+def plan_injections(
+    *,
+    start_time: datetime,
+    samples: int,
+    events: int,
+    interval: int = 60,
+    seed: int = 42,
+    tag: int = 0,
+    spacing: int = 24,
+    magnitudes: InjectionMagnitudes | None = None,
+) -> list[PlannedInjection]:
+    """Scatter ``events`` non-overlapping injections over a series of ``samples`` rows.
+
+    Kinds, channels and lengths are drawn first; the slack left after reserving
+    every event plus ``spacing`` quiet samples is then split at sorted random
+    points, which places the events uniformly without rejection sampling.
+    """
+    magnitudes = magnitudes or InjectionMagnitudes()
+    rng = _plan_rng(seed, tag)
+    kinds, lengths = _draw_events(rng, events)
+    slack = samples - int(lengths.sum()) - spacing * events
+    if slack < 0:
+        raise ValueError(f"{events} injections do not fit in {samples} samples")
+    cuts = np.sort(rng.integers(0, slack, size=events, endpoint=True))
+    starts = cuts + np.concatenate(([0], np.cumsum(lengths + spacing)[:-1])).astype(np.int64)
+    ends = starts + lengths - 1
+    channels = rng.choice(list(CHANNELS), size=events)
+    signs = rng.choice([-1.0, 1.0], size=events)
+
+    origin = np.datetime64(start_time.replace(tzinfo=None), "s")
+    start_times = np.datetime_as_string(origin + starts * interval, unit="s").tolist()
+    end_times = np.datetime_as_string(origin + ends * interval, unit="s").tolist()
+    planned: list[PlannedInjection] = []
+    for idx, kind in enumerate(kinds.tolist()):
+        channel = "flow" if kind == "leak" else str(channels[idx])
+        scale = CHANNEL_SCALE[channel]
+        if kind == "flatline":
+            magnitude = float(_base_profiles(starts[idx : idx + 1])[CHANNELS.index(channel)][0])
+        elif kind == "spike":
+            magnitude = float(signs[idx]) * magnitudes.spike * scale
+        elif kind == "drift":
+            magnitude = float(signs[idx]) * magnitudes.drift * scale
+        elif kind == "leak":
+            magnitude = magnitudes.leak
+        else:
+            magnitude = 0.0
+        planned.append(
+            PlannedInjection(
+                kind=kind,
+                start_index=int(starts[idx]),
+                end_index=int(ends[idx]),
+                description=_PLANNED_DESCRIPTIONS[kind].format(channel=channel.capitalize()),
+                channel=channel,
+                magnitude=magnitude,
+                start_time=start_times[idx],
+                end_time=end_times[idx],
+            )
+        )
+    return planned
+
+
+_PLANNED_DESCRIPTIONS = {
+    "missing": "{channel} telemetry missing",
+    "flatline": "{channel} sensor stuck (flatline)",
+    "spike": "{channel} spike outlier",
+    "drift": "{channel} sensor drift",
+    "leak": "Sustained drop in flow/pressure",
+}
+
+
+def apply_injections(
+    frame: TelemetryFrame, injections: Sequence[PlannedInjection], offset: int = 0
+) -> TelemetryFrame:
+    """Apply planned injections to a chunk whose first row has index ``offset``.
+
+    ``injections`` must be sorted by index, as ``plan_injections`` returns them;
+    only the events overlapping the chunk are touched, each as slice operations.
+    """
+    stop = offset + len(frame)
+    ends = np.array([event.end_index for event in injections], dtype=np.int64)
+    channels = {name: values.copy() for name, values in frame.channels.items()}
+    for event in injections[int(np.searchsorted(ends, offset)) :]:
+        if event.start_index >= stop:
+            break
+        lo = max(event.start_index, offset)
+        hi = min(event.end_index + 1, stop)
+        window = slice(lo - offset, hi - offset)
+        values = channels[event.channel]
+        if event.kind == "missing":
+            values[window] = np.nan
+        elif event.kind == "flatline":
+            values[window] = event.magnitude
+        elif event.kind == "spike":
+            values[window] += event.magnitude
+        elif event.kind == "drift":
+            values[window] += np.arange(lo - event.start_index, hi - event.start_index) * (
+                event.magnitude
+            )
+        elif event.kind == "leak":
+            channels["flow"][window] -= event.magnitude
+            channels["pressure"][window] -= event.magnitude * CHANNEL_SCALE["pressure"]
+    return TelemetryFrame.from_columns(frame.timestamps, channels)
+
+
+def query_injections(
+    injections: Sequence[Mapping[str, Any]], start: str, end: str
+) -> list[Mapping[str, Any]]:
+    """Return the injections overlapping the inclusive ISO-8601 range ``[start, end]``.
+
+    Planned injections are disjoint and sorted, so both bounds are binary searches.
+    """
+    if not injections:
+        return []
+    starts = parse_timestamps([event["start_time"] for event in injections])
+    ends = parse_timestamps([event["end_time"] for event in injections])
+    lo, hi = parse_timestamps([start, end]).tolist()
+    first = int(np.searchsorted(ends, lo, side="left"))
+    last = int(np.searchsorted(starts, hi, side="right"))
+    return list(injections[first:last])
+
+
 def write_csv(path: Path, points: Iterable[TelemetryPoint]) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
     with path.open("w", newline="") as handle:
@@ -140,21 +368,121 @@ def write_csv(path: Path, points: Iterable[TelemetryPoint]) -> None:
             writer.writerow(asdict(point))
 
 
-def write_json(path: Path, events: list[InjectionEvent]) -> None:
+def write_json(path: Path, events: Sequence[InjectionEvent]) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
     payload = [asdict(event) for event in events]
     path.write_text(json.dumps(payload, indent=2))
 
 
+def parse_args() -> argparse.Namespace:
+    data_dir = Path(__file__).resolve().parents[1] / "data"
+    parser = argparse.ArgumentParser(description="Generate synthetic pipeline telemetry.")
+    parser.add_argument(
+        "--out", dest="output_path", default=str(data_dir / "sample.csv"), help="CSV or .cols."
+    )
+    parser.add_argument(
+        "--injections-out",
+        dest="injections_path",
+        default=str(data_dir / "injections.json"),
+        help="Ground-truth injection index.",
+    )
+    parser.add_argument(
+        "--scale",
+        action="store_true",
+        help="Vectorized chunked generation instead of the fixed 360-minute demo run.",
+    )
+    parser.add_argument("--minutes", type=int, default=360, help="Duration of each series.")
+    parser.add_argument(
+        "--interval", type=int, default=60, help="Seconds between samples (1 / sample rate)."
+    )
+    parser.add_argument("--tags", type=int, default=1, help="Number of independent series.")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--events",
+        type=int,
+        default=None,
+        help="Injections planned per series in scale mode (default: one per 500 samples).",
+    )
+    parser.add_argument(
+        "--spike-magnitude", type=float, default=InjectionMagnitudes.spike, help="Flow units."
+    )
+    parser.add_argument(
+        "--drift-rate",
+        type=float,
+        default=InjectionMagnitudes.drift,
+        help="Drift per sample, flow units.",
+    )
+    parser.add_argument(
+        "--leak-drop", type=float, default=InjectionMagnitudes.leak, help="Leak flow drop."
+    )
+    parser.add_argument(
+        "--chunk-rows", type=int, default=CHUNK_ROWS, help="Rows generated per batch."
+    )
+    args = parser.parse_args()
+    if args.interval <= 0:
+        parser.error("--interval must be positive")
+    if not args.scale:
+        if args.minutes < DEMO_MIN_MINUTES:
+            parser.error(f"--minutes must be at least {DEMO_MIN_MINUTES} without --scale")
+        return args
+    samples = args.minutes * 60 // args.interval
+    args.events = samples // 500 if args.events is None else args.events
+    # Only the event lengths are drawn here; main plans each tag once.
+    for tag in range(args.tags):
+        if _injection_slack(samples=samples, events=args.events, seed=args.seed, tag=tag) < 0:
+            parser.error(f"{args.events} injections do not fit in {samples} samples")
+    return args
+
+
 def main() -> None:
     """Generate a full synthetic run and persist artifacts."""
-    output_dir = Path(__file__).resolve().parents[1] / "data"
-    points = generate_points(start_time=datetime(2024, 1, 1, 0, 0), minutes=360)
-    events = inject_quality_issues(points)
-    events.append(inject_small_leak(points))
+    args = parse_args()
+    start_time = datetime(2024, 1, 1, 0, 0)
+    output_path = Path(args.output_path)
+    with stage_timer(output_path.parent, "generate_data") as timer:
+        if not args.scale:
+            points = generate_points(start_time=start_time, minutes=args.minutes, seed=args.seed)
+            events = inject_quality_issues(points)
+            events.append(inject_small_leak(points))
+            write_csv(output_path, points)
+            write_json(Path(args.injections_path), events)
+            timer.rows = len(points)
+            return
 
-    write_csv(output_dir / "sample.csv", points)
-    write_json(output_dir / "injections.json", events)
+        samples = args.minutes * 60 // args.interval
+        magnitudes = InjectionMagnitudes(
+            spike=args.spike_magnitude, drift=args.drift_rate, leak=args.leak_drop
+        )
+        paths = zip(
+            tag_paths(output_path, args.tags), tag_paths(Path(args.injections_path), args.tags)
+        )
+        for tag, (path, injections_path) in enumerate(paths):
+            injections = plan_injections(
+                start_time=start_time,
+                samples=samples,
+                events=args.events,
+                interval=args.interval,
+                seed=args.seed,
+                tag=tag,
+                magnitudes=magnitudes,
+            )
+            frames = generate_frames(
+                start_time=start_time,
+                samples=samples,
+                interval=args.interval,
+                seed=args.seed,
+                tag=tag,
+                chunk_rows=args.chunk_rows,
+            )
+            write_frames(
+                path,
+                (
+                    apply_injections(frame, injections, offset)
+                    for frame, offset in zip(frames, range(0, samples, args.chunk_rows))
+                ),
+            )
+            write_json(injections_path, injections)
+            timer.rows += samples
 
 
 if __name__ == "__main__":
@@ -1,16 +1,49 @@
 """Label data quality issues in telemetry.
 
-This script scans the CSV and outputs labeled segments + a cleaned CSV.
+This script scans the CSV and outputs labeled segments + a cleaned CSV. The
+input is parsed once into a columnar ``TelemetryFrame`` and every detector runs
+as a vectorized pass over its arrays.
 """
 
 from __future__ import annotations
 
+import argparse
 import csv
 import json
-import math
+import os
+import sys
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
 from dataclasses import asdict, dataclass
 from pathlib import Path
-from typing import Iterable
+from typing import Any, Iterable, Iterator
+
+import numpy as np
+
+from telemetry_lab.backend import frame as frame_module
+from telemetry_lab.backend.frame import (
+    CHANNELS,
+    CHUNK_ROWS,
+    TelemetryFrame,
+    concat_frames,
+    csv_line_ranges,
+    frame_from_cells,
+    is_columnar,
+    iter_csv_cells,
+    iter_frames,
+    load_column,
+    read_column_rows,
+    read_csv_range_cells,
+    write_csv_cells,
+    write_frames,
+)
+from telemetry_lab.backend.metrics import stage_timer
+from telemetry_lab.backend.result_cache import (
+    DEFAULT_MAX_BYTES,
+    ResultCache,
+    cache_key,
+    code_version,
+)
 
 
 @dataclass
@@ -21,115 +54,577 @@ class QualityLabel:
     reason: str
 
 
-def _is_missing(value: str) -> bool:
-    try:
-        return math.isnan(float(value))
-    except ValueError:
-        return True
-
-
-def _row_has_missing(row: dict[str, str]) -> bool:
-    return any(_is_missing(row[key]) for key in ("flow", "pressure", "temperature"))
-
-
-def label_quality(rows: list[dict[str, str]]) -> list[QualityLabel]:
-    labels: list[QualityLabel] = []
-
-    # Missing data detection (any signal)
-    missing_indices = [i for i, row in enumerate(rows) if _row_has_missing(row)]
-    if missing_indices:
-        start_index = missing_indices[0]
-        previous_index = start_index
-        for index in missing_indices[1:]:
-            if index != previous_index + 1:
-                labels.append(
-                    QualityLabel(
-                        kind="missing",
-                        start_index=start_index,
-                        end_index=previous_index,
-                        reason="Missing telemetry value(s)",
-                    )
-                )
-                start_index = index
-            previous_index = index
-        labels.append(
-            QualityLabel(
-                kind="missing",
-                start_index=start_index,
-                end_index=previous_index,
-                reason="Missing telemetry value(s)",
-            )
+# Default detector settings. Drift thresholds are the least-squares rise across
+# one drift window; the flow and pressure limits sit above the normal ramps of
+# the synthetic profile so only injected drift trips them. Drift windows that
+# hold a repeated value (a flatline) are not scored.
+KINDS = ("missing", "flatline", "spike", "drift")
+FLATLINE_WINDOW = 8
+SPIKE_RADIUS = 1
+SPIKE_THRESHOLD = 10.0
+DRIFT_WINDOW = 12
+DRIFT_THRESHOLDS = {"flow": 40.0, "pressure": 15.0, "temperature": 2.0}
+
+
+def _group(positions: np.ndarray, gap: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Group sorted positions into runs whose neighbours are at most ``gap`` apart.
+
+    Returns the first position, last position and number of positions per run.
+    """
+    if not positions.size:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, empty
+    breaks = np.flatnonzero(np.diff(positions) > gap)
+    heads = np.concatenate(([0], breaks + 1))
+    tails = np.concatenate((breaks, [positions.size - 1]))
+    return positions[heads], positions[tails], tails - heads + 1
+
+
+def _window_counts(flags: np.ndarray, width: int) -> np.ndarray:
+    """Count set flags in every window of ``width`` consecutive elements."""
+    cumulative = np.concatenate(([0], np.cumsum(flags, dtype=np.int64)))
+    return cumulative[width:] - cumulative[:-width]
+
+
+def _rolling_max(values: np.ndarray, width: int) -> np.ndarray:
+    """Maximum of every ``width``-long window in O(n) (van Herk/Gil-Werman).
+
+    Each window spans at most two aligned blocks, so it is the max of one
+    block's suffix maximum and the next block's prefix maximum.
+    """
+    count = len(values) - width + 1
+    if count <= 0:
+        return np.empty(0, dtype=np.float64)
+    blocks = np.concatenate((values, np.full(-len(values) % width, -np.inf))).reshape(-1, width)
+    prefix = np.maximum.accumulate(blocks, axis=1).ravel()
+    suffix = np.maximum.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].ravel()
+    return np.maximum(suffix[:count], prefix[width - 1 : width - 1 + count])
+
+
+def _rolling_rise(values: np.ndarray, width: int) -> np.ndarray:
+    """Least-squares rise across every ``width``-long window in O(n).
+
+    ``values`` must not contain NaN. Like ``_rolling_max``, each window is the
+    suffix of one aligned block plus the prefix of the next, so the weighted
+    sums come from per-block running sums. Rounding therefore depends on where
+    the array starts; ``_drift_starts`` settles near-threshold windows with
+    ``_window_rises``, which does not.
+    """
+    count = len(values) - width + 1
+    if count <= 0 or width < 2:
+        return np.zeros(max(count, 0), dtype=np.float64)
+    blocks = np.concatenate((values, np.zeros(-len(values) % width + width))).reshape(-1, width)
+    weighted = blocks * np.arange(width)
+    suffix = np.cumsum(blocks[:, ::-1], axis=1)[:, ::-1].ravel()[:count]
+    suffix_weighted = np.cumsum(weighted[:, ::-1], axis=1)[:, ::-1].ravel()[:count]
+    # Exclusive prefix sums of the following block.
+    prefix = (np.cumsum(blocks, axis=1) - blocks).ravel()[width : width + count]
+    prefix_weighted = (np.cumsum(weighted, axis=1) - weighted).ravel()[width : width + count]
+    position = np.arange(count) % width
+    centre = (width - 1) / 2
+    numerator = (
+        suffix_weighted
+        - (position + centre) * suffix
+        + prefix_weighted
+        + (width - position - centre) * prefix
+    )
+    spread = width * (width * width - 1) / 12
+    return numerator / spread * (width - 1)
+
+
+def _rise_error(values: np.ndarray, width: int) -> np.ndarray:
+    """Bound on the rounding error of every ``_rolling_rise`` window."""
+    count = len(values) - width + 1
+    blocks = np.concatenate((np.abs(values), np.zeros(-len(values) % width + width)))
+    totals = blocks.reshape(-1, width).sum(axis=1)
+    block = np.arange(count) // width
+    magnitude = totals[block] + totals[block + 1]
+    spread = width * (width * width - 1) / 12
+    return 16 * width * width * np.finfo(np.float64).eps * magnitude / spread * (width - 1)
+
+
+def _window_rises(values: np.ndarray, starts: np.ndarray, width: int) -> np.ndarray:
+    """Rise of the windows at ``starts``, summed in a fixed order within each window."""
+    centre = (width - 1) / 2
+    spread = width * (width * width - 1) / 12
+    numerator = np.zeros(len(starts), dtype=np.float64)
+    for step in range(width):
+        numerator += (step - centre) * values[starts + step]
+    return numerator / spread * (width - 1)
+
+
+def _flatline_pairs(values: np.ndarray, missing: np.ndarray) -> np.ndarray:
+    """Rows that repeat the previous row's value (run-length tracking input)."""
+    same = (values[1:] == values[:-1]) & ~missing[1:] & ~missing[:-1]
+    return np.flatnonzero(same) + 1
+
+
+def _spike_centres(
+    values: np.ndarray, missing: np.ndarray, radius: int, threshold: float
+) -> np.ndarray:
+    """Rows that exceed (or undercut) every neighbour within ``radius`` by ``threshold``."""
+    span = 2 * radius + 1
+    if len(values) < span:
+        return np.empty(0, dtype=np.int64)
+    centre = values[radius : len(values) - radius]
+    highs = _rolling_max(np.where(missing, -np.inf, values), radius)
+    lows = -_rolling_max(np.where(missing, -np.inf, -values), radius)
+    left, right = slice(0, len(centre)), slice(radius + 1, radius + 1 + len(centre))
+    above = centre > np.maximum(highs[left], highs[right]) + threshold
+    below = centre < np.minimum(lows[left], lows[right]) - threshold
+    complete = _window_counts(missing, span) == 0
+    return np.flatnonzero(complete & (above | below)) + radius
+
+
+def _drift_starts(
+    values: np.ndarray, missing: np.ndarray, width: int, threshold: float
+) -> np.ndarray:
+    """Start rows of complete windows whose fitted rise exceeds ``threshold``.
+
+    Windows that hold a repeated value are skipped: a flatline followed by the
+    step back to live readings fits a steep rise that is not drift.
+
+    Windows whose fast rise is too close to call are recomputed in a fixed
+    order, so a window's verdict does not depend on where the batch starts and
+    streaming and sharded results match batch ones even at threshold ties.
+    """
+    complete = _window_counts(missing, width) == 0
+    if width >= 2:
+        held = np.zeros(len(values), dtype=bool)
+        held[_flatline_pairs(values, missing)] = True
+        # Repeats of the row before the window are outside it.
+        complete &= _window_counts(held[1:], width - 1) == 0
+    filled = np.where(missing, 0.0, values)
+    with np.errstate(over="ignore", invalid="ignore"):
+        rise = _rolling_rise(filled, width)
+        above = rise > threshold
+        if len(rise) and width >= 2:
+            # Overflowed windows (NaN distance) are recomputed too.
+            tolerance = _rise_error(filled, width) + 4 * np.finfo(np.float64).eps * abs(threshold)
+            close = np.flatnonzero(~(np.abs(rise - threshold) > tolerance))
+            above[close] = _window_rises(filled, close, width) > threshold
+    return np.flatnonzero(complete & above)
+
+
+def _as_frame(rows: TelemetryFrame | Iterable[dict[str, str]]) -> TelemetryFrame:
+    if isinstance(rows, TelemetryFrame):
+        return rows
+    return TelemetryFrame.from_rows(rows)
+
+
+@dataclass
+class LabelEvent:
+    event: str
+    channel: str
+    label: QualityLabel
+
+
+class _SegmentTracker:
+    """Open/close bookkeeping for one detector on one channel.
+
+    Detector hits arrive as sorted row positions. Hits at most ``gap`` apart
+    form one segment spanning ``[first + lead, last + trail]``, which is
+    reported once it holds ``min_hits`` hits. Only the open segment is kept.
+    """
+
+    def __init__(
+        self,
+        kind: str,
+        channel: str,
+        reason: str,
+        *,
+        gap: int,
+        lead: int = 0,
+        trail: int = 0,
+        min_hits: int = 1,
+    ) -> None:
+        self.kind = kind
+        self.channel = channel
+        self.reason = reason
+        self.gap = gap
+        self.lead = lead
+        self.trail = trail
+        self.min_hits = min_hits
+        self.next_position = 0
+        self.first: int | None = None
+        self.last = 0
+        self.hits = 0
+        self.opened = False
+
+    # Attributes that change as hits arrive; the rest is configuration.
+    STATE = ("next_position", "first", "last", "hits", "opened")
+
+    def _event(self, event: str, first: int, last: int) -> LabelEvent:
+        label = QualityLabel(
+            kind=self.kind,
+            start_index=first + self.lead,
+            end_index=last + self.trail,
+            reason=self.reason,
         )
+        return LabelEvent(event=event, channel=self.channel, label=label)
 
-    # Flatline detection (simple window, ignore windows with missing)
-    window = 8
-    for idx in range(len(rows) - window):
-        window_rows = rows[idx : idx + window]
-        if any(_row_has_missing(row) for row in window_rows):
-            continue
-        window_values = [float(row["flow"]) for row in window_rows]
-        if len(set(window_values)) == 1:
-            labels.append(
-                QualityLabel(
-                    kind="flatline",
-                    start_index=idx,
-                    end_index=idx + window - 1,
-                    reason="Flow sensor flatline",
-                )
-            )
-            break
-
-    # Spike detection (single point range for UI visibility)
-    for idx in range(1, len(rows) - 1):
-        if (
-            _row_has_missing(rows[idx - 1])
-            or _row_has_missing(rows[idx])
-            or _row_has_missing(rows[idx + 1])
-        ):
-            continue
-        prev_val = float(rows[idx - 1]["pressure"])
-        next_val = float(rows[idx + 1]["pressure"])
-        cur_val = float(rows[idx]["pressure"])
-        if cur_val > max(prev_val, next_val) + 10:
-            labels.append(
-                QualityLabel(
-                    kind="spike",
-                    start_index=idx,
-                    end_index=idx + 1,
-                    reason="Pressure spike outlier",
-                )
+    def _open(self) -> list[LabelEvent]:
+        if self.first is None or self.opened or self.hits < self.min_hits:
+            return []
+        self.opened = True
+        return [self._event("open", self.first, self.last)]
+
+    def close(self) -> list[LabelEvent]:
+        if self.first is None:
+            return []
+        events = self._open()
+        if self.opened:
+            events.append(self._event("close", self.first, self.last))
+        self.first = None
+        return events
+
+    def feed(self, positions: np.ndarray, evaluated_to: int) -> list[LabelEvent]:
+        """Consume hits found among the positions evaluated up to ``evaluated_to``."""
+        if evaluated_to < self.next_position:
+            return []
+        positions = positions[(positions >= self.next_position) & (positions <= evaluated_to)]
+        self.next_position = evaluated_to + 1
+        firsts, lasts, hits = _group(positions, self.gap)
+        events: list[LabelEvent] = []
+        if firsts.size and self.first is not None and firsts[0] - self.last <= self.gap:
+            self.last = int(lasts[0])
+            self.hits += int(hits[0])
+            firsts, lasts, hits = firsts[1:], lasts[1:], hits[1:]
+        if firsts.size:
+            events += self.close()
+            complete = hits[:-1] >= self.min_hits
+            for first, last in zip(
+                firsts[:-1][complete].tolist(), lasts[:-1][complete].tolist(), strict=True
+            ):
+                events += [self._event("open", first, last), self._event("close", first, last)]
+            self.first, self.last, self.hits = int(firsts[-1]), int(lasts[-1]), int(hits[-1])
+            self.opened = False
+        events += self._open()
+        if self.first is not None and evaluated_to - self.last >= self.gap:
+            events += self.close()
+        return events
+
+
+class QualityLabeler:
+    """Push-based quality labeler for live feeds.
+
+    Rows go in one at a time (``push``) or in small batches (``push_frame``)
+    and ``LabelEvent`` open/close events come out as segments start and end.
+    Only a window-sized tail of recent rows and one open segment per
+    detector are kept, so memory stays constant however long the feed runs.
+    Call ``finish`` at end of input to close whatever is still open; the
+    closed labels then match ``label_quality`` on the same rows.
+    ``to_json``/``from_json`` checkpoint that state, so a restarted process
+    continues the feed where it stopped.
+    """
+
+    def __init__(
+        self,
+        *,
+        window: int = FLATLINE_WINDOW,
+        drift_window: int = DRIFT_WINDOW,
+        spike_radius: int = SPIKE_RADIUS,
+        spike_threshold: float = SPIKE_THRESHOLD,
+        drift_thresholds: dict[str, float] | None = None,
+    ) -> None:
+        self.window = window
+        self.drift_window = drift_window
+        self.spike_radius = spike_radius
+        self.spike_threshold = spike_threshold
+        self.drift_thresholds = {**DRIFT_THRESHOLDS, **(drift_thresholds or {})}
+        self.halo = max(drift_window - 1, 2 * spike_radius, 1)
+        self.offset = 0
+        self._tail: TelemetryFrame | None = None
+        self._missing = _SegmentTracker("missing", "", "Missing telemetry value(s)", gap=1)
+        self._trackers: dict[str, list[_SegmentTracker]] = {}
+        for name in CHANNELS:
+            title = name.capitalize()
+            self._trackers[name] = [
+                _SegmentTracker(
+                    "flatline",
+                    name,
+                    f"{title} sensor flatline",
+                    gap=1,
+                    lead=-1,
+                    min_hits=window - 1,
+                ),
+                _SegmentTracker("spike", name, f"{title} spike outlier", gap=0, trail=1),
+                _SegmentTracker(
+                    "drift",
+                    name,
+                    f"{title} drift detected",
+                    gap=drift_window,
+                    trail=drift_window - 1,
+                ),
+            ]
+
+    def _all_trackers(self) -> list[_SegmentTracker]:
+        return [self._missing, *(t for name in CHANNELS for t in self._trackers[name])]
+
+    def to_json(self) -> str:
+        tail = None
+        if self._tail is not None:
+            tail = {
+                "timestamps": self._tail.timestamps.tolist(),
+                **{
+                    name: [None if np.isnan(value) else value for value in values.tolist()]
+                    for name, values in self._tail.channels.items()
+                },
+            }
+        return json.dumps(
+            {
+                "settings": {
+                    "window": self.window,
+                    "drift_window": self.drift_window,
+                    "spike_radius": self.spike_radius,
+                    "spike_threshold": self.spike_threshold,
+                    "drift_thresholds": self.drift_thresholds,
+                },
+                "offset": self.offset,
+                "tail": tail,
+                "trackers": [
+                    {name: getattr(tracker, name) for name in tracker.STATE}
+                    for tracker in self._all_trackers()
+                ],
+            }
+        )
+
+    @classmethod
+    def from_json(cls, blob: str) -> QualityLabeler:
+        state = json.loads(blob)
+        labeler = cls(**state["settings"])
+        labeler.offset = state["offset"]
+        tail = state["tail"]
+        if tail is not None:
+            labeler._tail = TelemetryFrame.from_columns(
+                np.array(tail["timestamps"], dtype=np.int64),
+                {name: np.array(tail[name], dtype=np.float64) for name in CHANNELS},
             )
-            break
-
-    # Drift detection (temperature slope)
-    drift_window = 12
-    for idx in range(len(rows) - drift_window):
-        window_rows = rows[idx : idx + drift_window]
-        if any(_row_has_missing(row) for row in window_rows):
-            continue
-        start_temp = float(window_rows[0]["temperature"])
-        end_temp = float(window_rows[-1]["temperature"])
-        if end_temp - start_temp > 2.0:
-            labels.append(
-                QualityLabel(
-                    kind="drift",
-                    start_index=idx,
-                    end_index=idx + drift_window - 1,
-                    reason="Temperature drift detected",
-                )
+        for tracker, values in zip(labeler._all_trackers(), state["trackers"], strict=True):
+            for name in tracker.STATE:
+                setattr(tracker, name, values[name])
+        return labeler
+
+    def push(self, row: dict[str, str]) -> list[LabelEvent]:
+        return self.push_frame(TelemetryFrame.from_rows([row]))
+
+    def push_frame(self, frame: TelemetryFrame) -> list[LabelEvent]:
+        """Label the next rows of the feed, returning the events they trigger."""
+        if not len(frame):
+            return []
+        extended = frame if self._tail is None else concat_frames([self._tail, frame])
+        base = self.offset - (len(extended) - len(frame))
+        events = self.feed_hits(self.detect(extended), base, len(frame))
+        self._tail = extended.take(slice(max(len(extended) - self.halo, 0), None))
+        return events
+
+    def detect(self, frame: TelemetryFrame) -> list[np.ndarray]:
+        """Detector hit positions within ``frame``, one array per tracker.
+
+        This is the vectorized part of labeling; it needs no tracker state, so
+        it can run on any slice of the input that carries ``halo`` rows of
+        context before the rows being labeled.
+        """
+        missing = frame.missing
+        hits = [np.flatnonzero(missing)]
+        for name in CHANNELS:
+            values = frame.channels[name]
+            hits.append(_flatline_pairs(values, missing))
+            hits.append(_spike_centres(values, missing, self.spike_radius, self.spike_threshold))
+            hits.append(
+                _drift_starts(values, missing, self.drift_window, self.drift_thresholds[name])
             )
-            break
+        return hits
+
+    def feed_hits(self, hits: list[np.ndarray], base: int, rows: int) -> list[LabelEvent]:
+        """Advance the trackers over the next ``rows`` rows given ``detect`` output.
+
+        ``base`` is the row index of position 0 in ``hits``; hits before the
+        first new row were already consumed and are ignored.
+        """
+        self.offset += rows
+        end = self.offset - 1
+        trackers = self._all_trackers()
+        lags = [0, *[0, self.spike_radius, self.drift_window - 1] * len(CHANNELS)]
+        events: list[LabelEvent] = []
+        for tracker, positions, lag in zip(trackers, hits, lags, strict=True):
+            events += tracker.feed(positions + base, end - lag)
+        return sorted(events, key=lambda event: event.label.start_index)
+
+    def finish(self) -> list[LabelEvent]:
+        """Close every open segment at end of input."""
+        events = self._missing.close()
+        for trackers in self._trackers.values():
+            for tracker in trackers:
+                events += tracker.close()
+        return events
+
+
+def _label_order(event: LabelEvent) -> tuple[int, int, int]:
+    channel = CHANNELS.index(event.channel) if event.channel else -1
+    return KINDS.index(event.label.kind), channel, event.label.start_index
+
+
+def label_quality(
+    rows: TelemetryFrame | list[dict[str, str]],
+    *,
+    window: int = FLATLINE_WINDOW,
+    drift_window: int = DRIFT_WINDOW,
+    spike_radius: int = SPIKE_RADIUS,
+    spike_threshold: float = SPIKE_THRESHOLD,
+    drift_thresholds: dict[str, float] | None = None,
+) -> list[QualityLabel]:
+    """Label every missing, flatline, spike and drift segment on every channel.
+
+    Each detector is a linear pass: run-length grouping for missing rows and
+    flatlines, rolling min/max for spikes and a rolling least-squares fit for
+    drift. Windows that touch a missing row are ignored, and so are drift
+    windows that hold a repeated value.
+    """
+    labeler = QualityLabeler(
+        window=window,
+        drift_window=drift_window,
+        spike_radius=spike_radius,
+        spike_threshold=spike_threshold,
+        drift_thresholds=drift_thresholds,
+    )
+    return closed_labels(labeler.push_frame(_as_frame(rows)) + labeler.finish())
+
+
+def closed_labels(events: Iterable[LabelEvent]) -> list[QualityLabel]:
+    """Collect the final labels from labeler events in ``label_quality`` order."""
+    closed = sorted((event for event in events if event.event == "close"), key=_label_order)
+    return [event.label for event in closed]
+
+
+def clean_frame(frame: TelemetryFrame) -> TelemetryFrame:
+    """Drop every row with a missing value in any channel."""
+    return frame.take(~frame.missing)
+
+
+def clean_cells(cells: list[list[str]], frame: TelemetryFrame) -> list[list[str]]:
+    """The rows of ``cells`` (parsed as ``frame``) with no missing value, untouched."""
+    return [cells[row] for row in np.flatnonzero(~frame.missing).tolist()]
 
-    return labels
+
+def _copies_rows(input_path: Path, cleaned_path: Path | None) -> bool:
+    """CSV to CSV cleaning copies kept rows verbatim instead of re-rendering them."""
+    return cleaned_path is not None and not (is_columnar(input_path) or is_columnar(cleaned_path))
+
+
+# Cleaned rows of a shard: a frame, the rows' original CSV cells, or nothing.
+_Cleaned = TelemetryFrame | list[list[str]] | None
+
+# Shard work item: input path, start/stop (rows for a column store, bytes for
+# CSV), labeler settings and which cleaned rows to return ("frame", "cells" or None).
+_ShardTask = tuple[Path, int, int, dict[str, Any], str | None]
+
+
+def _label_shard(task: _ShardTask) -> tuple[int, list[np.ndarray], _Cleaned]:
+    """Detector hits for one shard, relative to its first row, plus its cleaned rows."""
+    path, start, stop, settings, clean = task
+    labeler = QualityLabeler(**settings)
+    cells: list[list[str]] = []
+    if is_columnar(path):
+        first = max(start - labeler.halo, 0)
+        frame, halo = read_column_rows(path, first, stop), start - first
+    else:
+        cells, halo = read_csv_range_cells(path, start, stop, labeler.halo)
+        frame = frame_from_cells(cells)
+    hits = [positions - halo for positions in labeler.detect(frame)]
+    own = frame.take(slice(halo, None))
+    cleaned: _Cleaned = None
+    if clean == "cells":
+        cleaned = clean_cells(cells[halo:], own)
+    elif clean == "frame":
+        cleaned = clean_frame(own)
+    return len(frame) - halo, hits, cleaned
+
+
+def _in_order(pool: Executor, tasks: Iterable[_ShardTask], ahead: int) -> Iterator[Any]:
+    """``pool.map`` that keeps at most ``ahead`` shards in flight, bounding memory."""
+    pending: deque[Future[Any]] = deque()
+    for task in tasks:
+        pending.append(pool.submit(_label_shard, task))
+        if len(pending) >= ahead:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def _label_sharded(
+    path: Path,
+    workers: int,
+    shards: int | None,
+    cleaned_path: Path | None,
+    settings: dict[str, Any],
+) -> tuple[list[QualityLabel], int]:
+    labeler = QualityLabeler(**settings)
+    shards = shards or workers * 4
+    if is_columnar(path):
+        bounds = np.linspace(0, len(load_column(path, "timestamp")), shards + 1).astype(int)
+        ranges = list(zip(bounds[:-1].tolist(), bounds[1:].tolist()))
+    else:
+        ranges = csv_line_ranges(path, shards)
+    copies = _copies_rows(path, cleaned_path)
+    clean = None if cleaned_path is None else "cells" if copies else "frame"
+    tasks = ((path, start, stop, settings, clean) for start, stop in ranges if stop > start)
+    events: list[LabelEvent] = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = _in_order(pool, tasks, 2 * workers)
+
+        def cleaned_chunks() -> Iterator[Any]:
+            for rows, hits, cleaned in results:
+                events.extend(labeler.feed_hits(hits, labeler.offset, rows))
+                if cleaned is not None:
+                    yield cleaned
+
+        if cleaned_path is None:
+            for _ in cleaned_chunks():
+                pass
+        elif copies:
+            write_csv_cells(cleaned_path, cleaned_chunks())
+        else:
+            write_frames(cleaned_path, cleaned_chunks())
+    return closed_labels(events + labeler.finish()), labeler.offset
+
+
+def label_quality_parallel(
+    path: Path,
+    *,
+    workers: int | None = None,
+    shards: int | None = None,
+    cleaned_path: Path | None = None,
+    window: int = FLATLINE_WINDOW,
+    drift_window: int = DRIFT_WINDOW,
+    spike_radius: int = SPIKE_RADIUS,
+    spike_threshold: float = SPIKE_THRESHOLD,
+    drift_thresholds: dict[str, float] | None = None,
+) -> list[QualityLabel]:
+    """``label_quality`` over a CSV or column store, sharded across worker processes.
+
+    The input is split into ``shards`` row ranges (line-aligned byte ranges
+    for CSV). Each worker parses its shard plus ``halo`` rows before it and
+    runs the vectorized detectors; the parent feeds the hits to one labeler's
+    segment trackers in shard order, so segments that cross a shard boundary
+    are stitched exactly as in a serial run. With ``cleaned_path``, workers
+    also return their cleaned rows, which are written in order.
+    """
+    settings = {
+        "window": window,
+        "drift_window": drift_window,
+        "spike_radius": spike_radius,
+        "spike_threshold": spike_threshold,
+        "drift_thresholds": drift_thresholds,
+    }
+    workers = workers or os.cpu_count() or 1
+    return _label_sharded(path, workers, shards, cleaned_path, settings)[0]
 
 
 def clean_rows(rows: Iterable[dict[str, str]]) -> list[dict[str, str]]:
-    cleaned: list[dict[str, str]] = []
-    for row in rows:
-        if _row_has_missing(row):
-            continue
-        cleaned.append(row)
-    return cleaned
+    rows = list(rows)
+    keep = ~TelemetryFrame.from_rows(rows).missing
+    return [row for row, kept in zip(rows, keep.tolist(), strict=True) if kept]
 
 
 def write_csv(path: Path, rows: Iterable[dict[str, str]]) -> None:
@@ -144,21 +639,112 @@ def write_csv(path: Path, rows: Iterable[dict[str, str]]) -> None:
 def write_json(path: Path, labels: list[QualityLabel]) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
     payload = [asdict(label) for label in labels]
-    path.write_text(json.dumps(payload, indent=2))
+    path.write_text(json.dumps(payload, indent=2) + "\n")
 
 
-def main() -> None:
+def parse_args() -> argparse.Namespace:
     data_dir = Path(__file__).resolve().parents[1] / "data"
-    input_path = data_dir / "sample.csv"
+    parser = argparse.ArgumentParser(description="Label data quality issues in a CSV file.")
+    parser.add_argument(
+        "--in",
+        dest="input_path",
+        default=str(data_dir / "sample.csv"),
+        help="Input CSV file with raw telemetry.",
+    )
+    parser.add_argument(
+        "--cleaned-out",
+        dest="cleaned_path",
+        default=str(data_dir / "cleaned.csv"),
+        help="Output CSV file for cleaned telemetry.",
+    )
+    parser.add_argument(
+        "--labels-out",
+        dest="labels_path",
+        default=str(data_dir / "labels.json"),
+        help="Output JSON file for quality labels.",
+    )
+    parser.add_argument(
+        "--chunk-rows",
+        type=int,
+        default=CHUNK_ROWS,
+        help="Rows read per batch; labeler state carries across batches.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help="Label shards in this many processes; 0 labels serially.",
+    )
+    parser.add_argument(
+        "--shards", type=int, default=None, help="Shards for --workers (default: 4 per worker)."
+    )
+    parser.add_argument(
+        "--cache-dir",
+        dest="cache_dir",
+        default=None,
+        help="Reuse outputs cached here for unchanged input, parameters and code.",
+    )
+    parser.add_argument(
+        "--cache-max-bytes", type=int, default=DEFAULT_MAX_BYTES, help="Result cache size limit."
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    labeler = QualityLabeler()
+    events: list[LabelEvent] = []
+    input_path = Path(args.input_path)
+    cleaned_path = Path(args.cleaned_path)
+    labels_path = Path(args.labels_path)
+    # Artifact names inside a cache entry; the cleaned suffix keeps CSV and .cols apart.
+    outputs = {f"cleaned{cleaned_path.suffix}": cleaned_path, "labels.json": labels_path}
+    settings: dict[str, Any] = {
+        "window": FLATLINE_WINDOW,
+        "drift_window": DRIFT_WINDOW,
+        "spike_radius": SPIKE_RADIUS,
+        "spike_threshold": SPIKE_THRESHOLD,
+        "drift_thresholds": DRIFT_THRESHOLDS,
+    }
+    cache = key = None
+    if args.cache_dir:
+        cache = ResultCache(Path(args.cache_dir), args.cache_max_bytes)
+        params = {**settings, "outputs": sorted(outputs)}
+        code = code_version(sys.modules[__name__], frame_module)
+        key = cache_key("label_quality", input_path, params, code)
+
+    # A restored result is not a run: recording it would overwrite the stage's throughput.
+    if cache and key and cache.restore(key, outputs):
+        return
+    with stage_timer(labels_path.parent, "label_quality") as timer:
+        if args.workers:
+            labels, timer.rows = _label_sharded(
+                input_path, args.workers, args.shards, cleaned_path, settings
+            )
+        elif _copies_rows(input_path, cleaned_path):
+
+            def cleaned_cells() -> Iterator[list[list[str]]]:
+                for cells in iter_csv_cells(input_path, args.chunk_rows):
+                    chunk = frame_from_cells(cells)
+                    events.extend(labeler.push_frame(chunk))
+                    timer.rows += len(chunk)
+                    yield clean_cells(cells, chunk)
 
-    with input_path.open("r", newline="") as handle:
-        rows = list(csv.DictReader(handle))
+            write_csv_cells(cleaned_path, cleaned_cells())
+            labels = closed_labels(events + labeler.finish())
+        else:
 
-    labels = label_quality(rows)
-    cleaned = clean_rows(rows)
+            def cleaned_chunks() -> Iterator[TelemetryFrame]:
+                for chunk in iter_frames(input_path, args.chunk_rows):
+                    events.extend(labeler.push_frame(chunk))
+                    timer.rows += len(chunk)
+                    yield clean_frame(chunk)
 
-    write_csv(data_dir / "cleaned.csv", cleaned)
-    write_json(data_dir / "labels.json", labels)
+            write_frames(cleaned_path, cleaned_chunks())
+            labels = closed_labels(events + labeler.finish())
+        write_json(labels_path, labels)
+        if cache and key:
+            cache.store(key, outputs)
 
 
 if __name__ == "__main__":
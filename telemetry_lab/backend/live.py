@@ -0,0 +1,185 @@
+"""Live telemetry feed: tail a growing CSV and fan out deltas to subscribers.
+
+``LiveFeed`` polls the telemetry file for appended rows, runs them through
+``QualityLabeler`` and ``LeakDetector``, and hands every subscriber the new
+rows plus label and alert open/close events. Each subscriber has a bounded
+queue; one that falls behind is dropped instead of slowing the others down.
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+import time
+import traceback
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from telemetry_lab.backend.detect_leaks import LeakDetector
+from telemetry_lab.backend.frame import (
+    AppendCursor,
+    TelemetryFrame,
+    columnar_payload,
+    format_timestamps,
+    read_appended,
+)
+from telemetry_lab.backend.label_quality import QualityLabeler
+
+POLL_INTERVAL = 0.5
+QUEUE_SIZE = 256
+
+
+@dataclass
+class FeedMessage:
+    id: int
+    event: str
+    data: dict[str, Any]
+
+
+class Subscription:
+    def __init__(self, queue_size: int = QUEUE_SIZE) -> None:
+        self.messages: queue.Queue[FeedMessage] = queue.Queue(maxsize=queue_size)
+        self.dropped = False
+
+    def offer(self, message: FeedMessage) -> None:
+        """Queue a message, dropping the subscriber if its queue is full."""
+        if self.dropped:
+            return
+        try:
+            self.messages.put_nowait(message)
+        except queue.Full:
+            self.dropped = True
+
+    def get(self, timeout: float) -> FeedMessage | None:
+        try:
+            return self.messages.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class LiveFeed:
+    """Incremental detectors over a growing telemetry CSV, shared by all subscribers.
+
+    The existing file is replayed silently on the first subscription so the
+    detectors start from the same state a batch run would reach. If the file
+    is replaced or rewritten (see ``AppendCursor``), or a poll fails, the feed
+    replays it again and sends a ``reset`` event so clients can reload.
+    """
+
+    def __init__(
+        self, path: Path, *, poll_interval: float = POLL_INTERVAL, queue_size: int = QUEUE_SIZE
+    ) -> None:
+        self.path = path
+        self.poll_interval = poll_interval
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._subscribers: list[Subscription] = []
+        self._thread: threading.Thread | None = None
+        self._next_id = 0
+        self._cursor: AppendCursor | None = None
+        self._labeler = QualityLabeler()
+        self._detector = LeakDetector()
+
+    def subscribe(self) -> Subscription:
+        subscription = Subscription(self.queue_size)
+        with self._lock:
+            if self._cursor is None:
+                self._replay()
+            self._subscribers.append(subscription)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            if subscription in self._subscribers:
+                self._subscribers.remove(subscription)
+
+    def poll(self) -> list[FeedMessage]:
+        """Process rows appended since the last poll and publish what they produce."""
+        with self._lock:
+            if self._cursor is None:
+                self._replay()
+                return []
+            try:
+                if self._cursor.replaced(self.path):
+                    self._replay()
+                    return self._publish([("reset", {})])
+                messages = []
+                while True:
+                    frame, offset = read_appended(self.path, self._cursor.offset)
+                    if offset == self._cursor.offset:
+                        break
+                    self._cursor.advance(self.path, offset)
+                    messages += self._process(frame)
+            except FileNotFoundError:
+                return []
+            return self._publish(messages)
+
+    def _replay(self) -> None:
+        self._cursor = AppendCursor()
+        self._labeler = QualityLabeler()
+        self._detector = LeakDetector()
+        if not self.path.exists():
+            return
+        while True:
+            frame, offset = read_appended(self.path, self._cursor.offset)
+            if offset == self._cursor.offset:
+                return
+            self._cursor.advance(self.path, offset)
+            self._process(frame, quiet=True)
+
+    def _process(
+        self, frame: TelemetryFrame, quiet: bool = False
+    ) -> list[tuple[str, dict[str, Any]]]:
+        """Advance the detectors over new rows; ``quiet`` skips building messages."""
+        label_events = self._labeler.push_frame(frame)
+        alert_events = self._detector.update_batch(
+            frame.channels["flow"], frame.timestamps, frame.missing
+        )
+        if quiet:
+            return []
+        messages: list[tuple[str, dict[str, Any]]] = []
+        if len(frame):
+            messages.append(("telemetry", columnar_payload(frame)))
+        for label_event in label_events:
+            messages.append(("label", asdict(label_event)))
+        for alert_event in alert_events:
+            payload = {
+                "event": alert_event.event,
+                "timestamp": format_timestamps(np.array([alert_event.timestamp]))[0],
+                "alert": asdict(alert_event.timed_alert()),
+            }
+            messages.append(("alert", payload))
+        return messages
+
+    def _publish(self, messages: list[tuple[str, dict[str, Any]]]) -> list[FeedMessage]:
+        published = []
+        for event, data in messages:
+            self._next_id += 1
+            published.append(FeedMessage(id=self._next_id, event=event, data=data))
+        for subscription in self._subscribers:
+            for message in published:
+                subscription.offer(message)
+        self._subscribers = [sub for sub in self._subscribers if not sub.dropped]
+        return published
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.poll_interval)
+            with self._lock:
+                if not self._subscribers:
+                    self._thread = None
+                    return
+            try:
+                self.poll()
+            except Exception:
+                # Detector state may be half-updated; start over from the file.
+                traceback.print_exc()
+                with self._lock:
+                    self._cursor = None
+                    self._publish([("reset", {})])
@@ -0,0 +1,213 @@
+"""Prometheus-style metrics for the API server and the pipeline stages.
+
+Request metrics are kept in per-thread shards: each worker thread only ever
+touches its own counters, so recording a request takes no lock, and the
+shards are summed when ``/metrics`` is scraped. Pipeline stages run as
+separate processes, so they record their timings in ``stage_metrics.json``
+next to their outputs (under a lock file, so concurrent stages don't drop each
+other's rows), which the server exports as gauges.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Iterator
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = tuple(float(1 << shift) for shift in range(8, 30, 2))
+STAGE_METRICS_FILE = "stage_metrics.json"
+
+
+@dataclass
+class _Histogram:
+    buckets: tuple[float, ...]
+    counts: list[int] = field(default_factory=list)
+    total: float = 0.0
+
+    def __post_init__(self) -> None:
+        self.counts = self.counts or [0] * (len(self.buckets) + 1)
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+
+    def merge(self, other: _Histogram) -> None:
+        self.counts = [a + b for a, b in zip(self.counts, other.counts, strict=True)]
+        self.total += other.total
+
+
+@dataclass
+class _RouteStats:
+    statuses: dict[int, int] = field(default_factory=dict)
+    latency: _Histogram = field(default_factory=lambda: _Histogram(LATENCY_BUCKETS))
+    size: _Histogram = field(default_factory=lambda: _Histogram(SIZE_BUCKETS))
+
+
+@dataclass
+class _Shard:
+    routes: dict[str, _RouteStats] = field(default_factory=dict)
+    caches: dict[tuple[str, bool], int] = field(default_factory=dict)
+
+
+class ServerMetrics:
+    """Request and cache counters, sharded per thread so recording never locks."""
+
+    def __init__(self) -> None:
+        self._local = threading.local()
+        self._shards: list[_Shard] = []
+
+    def _shard(self) -> _Shard:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = _Shard()
+            self._shards.append(shard)
+        return shard
+
+    def observe_request(self, route: str, status: int, seconds: float, size: int) -> None:
+        routes = self._shard().routes
+        stats = routes.get(route)
+        if stats is None:
+            stats = routes[route] = _RouteStats()
+        stats.statuses[status] = stats.statuses.get(status, 0) + 1
+        stats.latency.observe(seconds)
+        stats.size.observe(size)
+
+    def count_cache(self, cache: str, hit: bool) -> None:
+        caches = self._shard().caches
+        caches[cache, hit] = caches.get((cache, hit), 0) + 1
+
+    def _merged(self) -> tuple[dict[str, _RouteStats], dict[tuple[str, bool], int]]:
+        routes: dict[str, _RouteStats] = {}
+        caches: dict[tuple[str, bool], int] = {}
+        for shard in list(self._shards):
+            for route, stats in list(shard.routes.items()):
+                merged = routes.setdefault(route, _RouteStats())
+                for status, count in list(stats.statuses.items()):
+                    merged.statuses[status] = merged.statuses.get(status, 0) + count
+                merged.latency.merge(stats.latency)
+                merged.size.merge(stats.size)
+            for key, count in list(shard.caches.items()):
+                caches[key] = caches.get(key, 0) + count
+        return routes, caches
+
+    def render(self, stages: dict[str, StageRun] | None = None) -> str:
+        """The Prometheus text exposition of every metric."""
+        routes, caches = self._merged()
+        lines = [
+            "# HELP telemetry_http_requests_total HTTP requests by route and status.",
+            "# TYPE telemetry_http_requests_total counter",
+        ]
+        for route, stats in sorted(routes.items()):
+            for status, count in sorted(stats.statuses.items()):
+                lines.append(
+                    f'telemetry_http_requests_total{{route="{route}",status="{status}"}} {count}'
+                )
+        for name, help_text, attribute in (
+            ("telemetry_http_request_duration_seconds", "Request latency.", "latency"),
+            ("telemetry_http_response_size_bytes", "Bytes written per response.", "size"),
+        ):
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+            for route, stats in sorted(routes.items()):
+                lines += _histogram_lines(name, f'route="{route}"', getattr(stats, attribute))
+
+        lines += [
+            "# HELP telemetry_cache_lookups_total Cache lookups by cache and result.",
+            "# TYPE telemetry_cache_lookups_total counter",
+        ]
+        names = sorted({cache for cache, _ in caches})
+        for cache in names:
+            for hit in (True, False):
+                result = "hit" if hit else "miss"
+                count = caches.get((cache, hit), 0)
+                lines.append(
+                    f'telemetry_cache_lookups_total{{cache="{cache}",result="{result}"}} {count}'
+                )
+        lines += [
+            "# HELP telemetry_cache_hit_ratio Fraction of cache lookups served from cache.",
+            "# TYPE telemetry_cache_hit_ratio gauge",
+        ]
+        for cache in names:
+            hits, misses = caches.get((cache, True), 0), caches.get((cache, False), 0)
+            lines.append(f'telemetry_cache_hit_ratio{{cache="{cache}"}} {hits / (hits + misses)}')
+
+        for name, help_text, attribute in (
+            ("telemetry_stage_duration_seconds", "Wall time of the last run.", "seconds"),
+            ("telemetry_stage_rows", "Rows processed by the last run.", "rows"),
+            ("telemetry_stage_rows_per_second", "Throughput of the last run.", "rows_per_second"),
+            ("telemetry_stage_last_run_timestamp_seconds", "When the last run ended.", "finished"),
+        ):
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+            for stage, run in sorted((stages or {}).items()):
+                lines.append(f'{name}{{stage="{stage}"}} {getattr(run, attribute)}')
+        return "\n".join(lines) + "\n"
+
+
+def _histogram_lines(name: str, labels: str, histogram: _Histogram) -> list[str]:
+    lines = []
+    cumulative = 0
+    bounds = [*(repr(bound) for bound in histogram.buckets), "+Inf"]
+    for bound, count in zip(bounds, histogram.counts, strict=True):
+        cumulative += count
+        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+    lines.append(f"{name}_sum{{{labels}}} {histogram.total}")
+    lines.append(f"{name}_count{{{labels}}} {cumulative}")
+    return lines
+
+
+@dataclass
+class StageRun:
+    seconds: float = 0.0
+    rows: int = 0
+    rows_per_second: float = 0.0
+    finished: float = 0.0
+
+
+def read_stage_metrics(path: Path) -> dict[str, StageRun]:
+    try:
+        payload = json.loads(path.read_text())
+    except FileNotFoundError:
+        return {}
+    return {stage: StageRun(**run) for stage, run in payload.items()}
+
+
+def record_stage(path: Path, stage: str, seconds: float, rows: int) -> StageRun:
+    """Store a stage's timing in ``path``, replacing its previous run."""
+    run = StageRun(
+        seconds=seconds,
+        rows=rows,
+        rows_per_second=rows / seconds if seconds > 0 else 0.0,
+        finished=time.time(),
+    )
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.with_name(f".{path.name}.lock").open("a") as lock:
+        # Readers see whole files via os.replace; the lock serialises writers.
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        runs = read_stage_metrics(path)
+        runs[stage] = run
+        scratch = path.with_suffix(f".{os.getpid()}.tmp")
+        payload = {name: asdict(item) for name, item in runs.items()}
+        scratch.write_text(json.dumps(payload, indent=2))
+        os.replace(scratch, path)
+    return run
+
+
+@dataclass
+class StageTimer:
+    rows: int = 0
+
+
+@contextmanager
+def stage_timer(directory: Path, stage: str) -> Iterator[StageTimer]:
+    """Time a stage; set ``rows`` on the yielded timer to record its throughput."""
+    timer = StageTimer()
+    started = time.perf_counter()
+    yield timer
+    record_stage(directory / STAGE_METRICS_FILE, stage, time.perf_counter() - started, timer.rows)
@@ -0,0 +1,233 @@
+"""Run generate/ingest → label → clean → detect → report in one process.
+
+The stage scripts hand each other CSV and JSON files; here they pass typed
+frames and label/alert lists directly, streaming each raw chunk through the
+labeler and the leak detector (which skips missing rows itself) in a single
+pass. The CLI writes raw and cleaned chunks as they go by, copying CSV rows
+verbatim when both ends are CSV, so only labels and alerts are kept in
+memory. Every artifact is optional and written only when its path is given.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from contextlib import ExitStack
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+import numpy as np
+
+from telemetry_lab.backend import detect_leaks, generate_data, label_quality
+from telemetry_lab.backend.detect_leaks import (
+    AlertEvent,
+    TimedLeakAlert,
+    add_detector_arguments,
+    detector_params,
+    make_detector,
+)
+from telemetry_lab.backend.frame import (
+    CHANNELS,
+    CHUNK_ROWS,
+    FrameWriter,
+    TelemetryFrame,
+    concat_frames,
+    frame_from_cells,
+    is_columnar,
+    iter_csv_cells,
+    iter_frames,
+    parse_timestamps,
+)
+from telemetry_lab.backend.generate_data import (
+    DEMO_MIN_MINUTES,
+    InjectionEvent,
+    generate_points,
+    inject_quality_issues,
+    inject_small_leak,
+)
+from telemetry_lab.backend.label_quality import (
+    LabelEvent,
+    QualityLabel,
+    QualityLabeler,
+    clean_cells,
+    clean_frame,
+    closed_labels,
+)
+from telemetry_lab.backend.report import build_report, write_report, write_report_csv
+
+
+@dataclass
+class PipelineResult:
+    labels: list[QualityLabel]
+    alerts: list[TimedLeakAlert]
+    report: dict[str, Any]
+    telemetry: TelemetryFrame | None = None
+    cleaned: TelemetryFrame | None = None
+
+
+def generate_demo(
+    *, start_time: datetime, minutes: int, seed: int = 42
+) -> tuple[TelemetryFrame, list[InjectionEvent]]:
+    """The ``generate_data`` demo run as a frame, without the CSV round trip."""
+    points = generate_points(start_time=start_time, minutes=minutes, seed=seed)
+    events = inject_quality_issues(points)
+    events.append(inject_small_leak(points))
+    frame = TelemetryFrame.from_columns(
+        parse_timestamps([point.timestamp for point in points]),
+        {name: np.array([getattr(point, name) for point in points]) for name in CHANNELS},
+    )
+    return frame, events
+
+
+def run_pipeline(
+    frames: Iterable[TelemetryFrame],
+    *,
+    detector: str = "ewma",
+    persistence: int | None = None,
+    detector_params: dict[str, float] | None = None,
+    generated_at: str | None = None,
+    keep_frames: bool = False,
+) -> PipelineResult:
+    """Label, detect and report over telemetry chunks in one pass.
+
+    The results match running the stage scripts one after another; leak
+    alerts index the raw rows, as labels do. ``detector`` names an entry of
+    ``detect_leaks.DETECTORS``, tuned by ``detector_params``. Chunks are
+    dropped once processed unless ``keep_frames`` asks for the whole raw and
+    cleaned frames in the result.
+    """
+    labeler = QualityLabeler()
+    leaks = make_detector(detector, persistence, **(detector_params or {}))
+    chunks: list[TelemetryFrame] = []
+    label_events: list[LabelEvent] = []
+    alert_events: list[AlertEvent] = []
+    last_timestamp = 0
+    for chunk in frames:
+        label_events += labeler.push_frame(chunk)
+        alert_events += leaks.update_batch(chunk.channels["flow"], chunk.timestamps, chunk.missing)
+        if len(chunk):
+            last_timestamp = int(chunk.timestamps[-1])
+        if keep_frames:
+            chunks.append(chunk)
+    alert_events += leaks.finish(last_timestamp)
+
+    labels = closed_labels(label_events + labeler.finish())
+    alerts = [event.timed_alert() for event in alert_events if event.event == "close"]
+    report = build_report(
+        [asdict(alert) for alert in alerts],
+        [asdict(label) for label in labels],
+        generated_at=generated_at,
+    )
+    result = PipelineResult(labels=labels, alerts=alerts, report=report)
+    if keep_frames:
+        empty = TelemetryFrame.from_columns(
+            np.zeros(0, dtype=np.int64), {name: np.zeros(0) for name in CHANNELS}
+        )
+        result.telemetry = concat_frames(chunks) if chunks else empty
+        result.cleaned = clean_frame(result.telemetry)
+    return result
+
+
+# A chunk of telemetry plus its original CSV cells when the input is a CSV.
+_Chunk = tuple[TelemetryFrame, list[list[str]] | None]
+
+
+def _written(
+    chunks: Iterable[_Chunk], sample: FrameWriter | None, cleaned: FrameWriter | None
+) -> Iterator[TelemetryFrame]:
+    """Pass chunks through to the pipeline, writing raw and cleaned rows on the way.
+
+    CSV rows are copied verbatim to CSV outputs; other outputs get the frames.
+    """
+    for frame, cells in chunks:
+        if sample is not None:
+            if cells is not None and not is_columnar(sample.path):
+                sample.write_cells(cells)
+            else:
+                sample.write(frame)
+        if cleaned is not None:
+            if cells is not None and not is_columnar(cleaned.path):
+                cleaned.write_cells(clean_cells(cells, frame))
+            else:
+                cleaned.write(clean_frame(frame))
+        yield frame
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Run the telemetry pipeline in one process; outputs are opt-in."
+    )
+    parser.add_argument(
+        "--in",
+        dest="input_path",
+        default=None,
+        help="Telemetry CSV or .cols to ingest (default: generate the demo run).",
+    )
+    parser.add_argument("--minutes", type=int, default=360, help="Length of the demo run.")
+    parser.add_argument("--seed", type=int, default=42)
+    add_detector_arguments(parser)
+    parser.add_argument(
+        "--chunk-rows", type=int, default=CHUNK_ROWS, help="Rows processed per batch."
+    )
+    parser.add_argument("--sample-out", dest="sample_path", help="Raw telemetry CSV or .cols.")
+    parser.add_argument("--injections-out", dest="injections_path", help="Demo injections JSON.")
+    parser.add_argument("--cleaned-out", dest="cleaned_path", help="Cleaned CSV or .cols.")
+    parser.add_argument("--labels-out", dest="labels_path", help="Quality labels JSON.")
+    parser.add_argument("--alerts-out", dest="alerts_path", help="Leak alerts JSON.")
+    parser.add_argument("--report-out", dest="report_path", help="Incident report JSON.")
+    parser.add_argument("--report-csv-out", dest="report_csv_path", help="Incident report CSV.")
+    args = parser.parse_args()
+    args.params = detector_params(parser, args)
+    if not args.input_path and args.minutes < DEMO_MIN_MINUTES:
+        parser.error(f"--minutes must be at least {DEMO_MIN_MINUTES} for the demo run")
+    return args
+
+
+def main() -> None:
+    args = parse_args()
+    injections: list[InjectionEvent] = []
+    chunks: Iterable[_Chunk]
+    if args.input_path and is_columnar(Path(args.input_path)):
+        chunks = ((frame, None) for frame in iter_frames(Path(args.input_path), args.chunk_rows))
+    elif args.input_path:
+        cells = iter_csv_cells(Path(args.input_path), args.chunk_rows)
+        chunks = ((frame_from_cells(chunk), chunk) for chunk in cells)
+    else:
+        demo, injections = generate_demo(
+            start_time=datetime(2024, 1, 1, 0, 0), minutes=args.minutes, seed=args.seed
+        )
+        chunks = [
+            (demo.take(slice(start, start + args.chunk_rows)), None)
+            for start in range(0, len(demo), args.chunk_rows)
+        ]
+    with ExitStack() as stack:
+        sample = (
+            stack.enter_context(FrameWriter(Path(args.sample_path))) if args.sample_path else None
+        )
+        cleaned = (
+            stack.enter_context(FrameWriter(Path(args.cleaned_path))) if args.cleaned_path else None
+        )
+        result = run_pipeline(
+            _written(chunks, sample, cleaned),
+            detector=args.detector,
+            persistence=args.persistence,
+            detector_params=args.params,
+        )
+
+    if args.injections_path:
+        generate_data.write_json(Path(args.injections_path), injections)
+    if args.labels_path:
+        label_quality.write_json(Path(args.labels_path), result.labels)
+    if args.alerts_path:
+        detect_leaks.write_json(Path(args.alerts_path), result.alerts)
+    if args.report_path:
+        write_report(Path(args.report_path), result.report)
+    if args.report_csv_path:
+        write_report_csv(Path(args.report_csv_path), result.report)
+    print(json.dumps(result.report["summary"]))
+
+
+if __name__ == "__main__":
+    main()
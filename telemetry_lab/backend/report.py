@@ -9,6 +9,8 @@ from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 
+from telemetry_lab.backend.metrics import stage_timer
+
 
 def build_report(
     alerts: list[dict[str, Any]],
@@ -131,16 +133,19 @@ def parse_args() -> argparse.Namespace:
 
 def main() -> None:
     args = parse_args()
-    alerts = _load_json(Path(args.alerts_path))
-    labels = _load_json(Path(args.labels_path))
-    report = build_report(alerts, labels)
-    write_report(Path(args.output_path), report)
-    if args.ui_output_path:
-        write_report(Path(args.ui_output_path), report)
-    if args.csv_output_path:
-        write_report_csv(Path(args.csv_output_path), report)
-    if args.ui_csv_output_path:
-        write_report_csv(Path(args.ui_csv_output_path), report)
+    output_path = Path(args.output_path)
+    with stage_timer(output_path.parent, "report") as timer:
+        alerts = _load_json(Path(args.alerts_path))
+        labels = _load_json(Path(args.labels_path))
+        timer.rows = len(alerts) + len(labels)
+        report = build_report(alerts, labels)
+        write_report(output_path, report)
+        if args.ui_output_path:
+            write_report(Path(args.ui_output_path), report)
+        if args.csv_output_path:
+            write_report_csv(Path(args.csv_output_path), report)
+        if args.ui_csv_output_path:
+            write_report_csv(Path(args.ui_csv_output_path), report)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,115 @@
+"""Content-addressed on-disk cache for stage outputs.
+
+An entry is keyed by a hash of the input's bytes, the stage parameters and
+the source of the modules that compute it, so editing a detector or changing
+a threshold misses instead of serving stale results. Entries are directories
+of output artifacts; a hit touches the entry, and the least recently used
+entries are evicted once the cache grows past its byte limit.
+"""
+
+from __future__ import annotations
+
+import filecmp
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Mapping
+
+from telemetry_lab.backend.frame import FIELDNAMES, is_columnar
+
+DEFAULT_MAX_BYTES = 1 << 30
+_READ_BLOCK = 1 << 20
+
+
+def _hash_file(digest: Any, path: Path) -> None:
+    with path.open("rb") as handle:
+        while block := handle.read(_READ_BLOCK):
+            digest.update(block)
+
+
+def code_version(*modules: ModuleType) -> str:
+    """Hash of the modules' source files."""
+    digest = hashlib.blake2b(digest_size=16)
+    for module in modules:
+        if module.__file__ is not None:
+            _hash_file(digest, Path(module.__file__))
+    return digest.hexdigest()
+
+
+def cache_key(stage: str, input_path: Path, params: Mapping[str, Any], code: str) -> str:
+    """Key for ``stage`` over the contents of ``input_path`` (CSV or column store)."""
+    digest = hashlib.blake2b(digest_size=20)
+    header = {"stage": stage, "params": params, "code": code}
+    digest.update(json.dumps(header, sort_keys=True).encode("utf-8"))
+    if is_columnar(input_path):
+        for name in FIELDNAMES:
+            digest.update(name.encode("utf-8"))
+            _hash_file(digest, input_path / f"{name}.npy")
+    else:
+        _hash_file(digest, input_path)
+    return digest.hexdigest()
+
+
+def _size(path: Path) -> int:
+    if path.is_dir():
+        return sum(item.stat().st_size for item in path.rglob("*") if item.is_file())
+    return path.stat().st_size
+
+
+def _copy(source: Path, target: Path) -> None:
+    if source.is_dir():
+        shutil.copytree(source, target, dirs_exist_ok=True)
+        return
+    if target.is_file() and filecmp.cmp(source, target, shallow=False):
+        return
+    target.parent.mkdir(parents=True, exist_ok=True)
+    shutil.copyfile(source, target)
+
+
+class ResultCache:
+    """Stage outputs stored under ``directory/<key>/<artifact>``."""
+
+    def __init__(self, directory: Path, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def restore(self, key: str, outputs: Mapping[str, Path]) -> bool:
+        """Copy a cached entry's artifacts to ``outputs``; ``False`` on a miss."""
+        entry = self.directory / key
+        if not all((entry / name).exists() for name in outputs):
+            return False
+        for name, path in outputs.items():
+            _copy(entry / name, path)
+        os.utime(entry)
+        return True
+
+    def store(self, key: str, outputs: Mapping[str, Path]) -> None:
+        """Copy freshly written artifacts into the cache, then evict down to the limit."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        scratch = Path(tempfile.mkdtemp(prefix=".tmp-", dir=self.directory))
+        for name, path in outputs.items():
+            _copy(path, scratch / name)
+        try:
+            os.replace(scratch, self.directory / key)
+        except OSError:
+            # Another process stored the same key first; its entry is identical.
+            shutil.rmtree(scratch, ignore_errors=True)
+        self.evict()
+
+    def evict(self) -> None:
+        """Remove least recently used entries until the cache fits in ``max_bytes``."""
+        entries = [
+            (entry.stat().st_mtime_ns, _size(entry), entry)
+            for entry in self.directory.iterdir()
+            if entry.is_dir() and not entry.name.startswith(".")
+        ]
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries, key=lambda item: item[0]):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
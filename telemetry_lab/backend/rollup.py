@@ -0,0 +1,351 @@
+"""Multi-resolution rollups of telemetry for zoomed-out views.
+
+Each level of the pyramid holds, per time bucket, the number of rows and the
+per-channel min, max, sum and count of present values; mean and missing
+fraction are derived when a level is served. Coarser levels are rebuilt from
+the next finer level, and appending rows only recomputes the buckets they touch.
+
+``state.json`` records how far into the input CSV the pyramid got and where the
+last day of buckets starts in each level CSV, so an incremental run reads only
+the new input bytes and rewrites only that last day of each level.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import io
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Sequence
+
+import numpy as np
+
+from telemetry_lab.backend.frame import (
+    CHANNELS,
+    CHUNK_ROWS,
+    AppendCursor,
+    TelemetryFrame,
+    format_timestamps,
+    is_columnar,
+    iter_frames,
+    nullable_floats,
+    parse_timestamps,
+    parse_values,
+    read_appended,
+)
+
+# Bucket width in seconds per level, finest first. Buckets align to the epoch (UTC).
+LEVELS = {"1min": 60, "10min": 600, "1h": 3600, "1day": 86400}
+STATS = ("min", "max", "sum", "count")
+COLUMNS = [f"{name}_{stat}" for name in CHANNELS for stat in STATS]
+# New rows can only change or rebuild buckets from the start of the last
+# coarsest bucket on, since every width divides the coarsest one.
+TAIL_WIDTH = max(LEVELS.values())
+
+
+@dataclass
+class Rollup:
+    width: int
+    buckets: np.ndarray
+    rows: np.ndarray
+    columns: dict[str, np.ndarray]
+
+    @classmethod
+    def empty(cls, width: int) -> Rollup:
+        return cls(
+            width=width,
+            buckets=np.zeros(0, dtype=np.int64),
+            rows=np.zeros(0, dtype=np.int64),
+            columns={
+                column: np.zeros(0, dtype=np.int64 if column.endswith("_count") else np.float64)
+                for column in COLUMNS
+            },
+        )
+
+    @classmethod
+    def from_frame(cls, frame: TelemetryFrame, width: int) -> Rollup:
+        """Aggregate raw rows (sorted by time) into buckets of ``width`` seconds."""
+        columns: dict[str, np.ndarray] = {}
+        for name in CHANNELS:
+            values = frame.channels[name]
+            present = ~np.isnan(values)
+            columns[f"{name}_min"] = values
+            columns[f"{name}_max"] = values
+            columns[f"{name}_sum"] = np.where(present, values, 0.0)
+            columns[f"{name}_count"] = present.astype(np.int64)
+        rows = np.ones(len(frame), dtype=np.int64)
+        return cls(width=1, buckets=frame.timestamps, rows=rows, columns=columns).coarsen(width)
+
+    def __len__(self) -> int:
+        return len(self.buckets)
+
+    def coarsen(self, width: int) -> Rollup:
+        """Merge buckets into buckets of ``width`` seconds (same width merges duplicates)."""
+        if not len(self):
+            return Rollup.empty(width)
+        keys = self.buckets // width * width
+        starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+        columns = {}
+        for column, values in self.columns.items():
+            # fmin/fmax skip NaN, so a bucket is NaN only when no value was present.
+            reduce = {"min": np.fmin, "max": np.fmax}.get(column.rsplit("_", 1)[1], np.add)
+            columns[column] = reduce.reduceat(values, starts)
+        return Rollup(
+            width=width,
+            buckets=keys[starts],
+            rows=np.add.reduceat(self.rows, starts),
+            columns=columns,
+        )
+
+    def take(self, selector: slice) -> Rollup:
+        return Rollup(
+            width=self.width,
+            buckets=self.buckets[selector],
+            rows=self.rows[selector],
+            columns={column: values[selector] for column, values in self.columns.items()},
+        )
+
+    def window(self, start: int | None, end: int | None) -> Rollup:
+        """Buckets overlapping ``[start, end]`` (either bound optional), by binary search."""
+        lo = 0 if start is None else int(np.searchsorted(self.buckets, start - self.width + 1))
+        hi = len(self) if end is None else int(np.searchsorted(self.buckets, end, side="right"))
+        return self.take(slice(lo, hi))
+
+    def append(self, other: Rollup) -> Rollup:
+        """Append later buckets, merging the bucket the two rollups share, if any."""
+        if len(self) and len(other) and other.buckets[0] <= self.buckets[-1]:
+            boundary = concat_rollups([self.take(slice(-1, None)), other]).coarsen(self.width)
+            return concat_rollups([self.take(slice(None, -1)), boundary])
+        return concat_rollups([self, other])
+
+    def to_payload(self) -> dict[str, Any]:
+        """Columnar JSON with per-channel min/max/mean/count/missing fraction."""
+        payload: dict[str, Any] = {
+            "width": self.width,
+            "timestamp": format_timestamps(self.buckets).tolist(),
+            "rows": self.rows.tolist(),
+        }
+        for name in CHANNELS:
+            count = self.columns[f"{name}_count"]
+            with np.errstate(invalid="ignore", divide="ignore"):
+                mean = self.columns[f"{name}_sum"] / count
+            payload[name] = {
+                "min": nullable_floats(self.columns[f"{name}_min"]),
+                "max": nullable_floats(self.columns[f"{name}_max"]),
+                "mean": nullable_floats(mean),
+                "count": count.tolist(),
+                "missing_fraction": (1.0 - count / self.rows).tolist(),
+            }
+        return payload
+
+
+def concat_rollups(rollups: Sequence[Rollup]) -> Rollup:
+    return Rollup(
+        width=rollups[0].width,
+        buckets=np.concatenate([rollup.buckets for rollup in rollups]),
+        rows=np.concatenate([rollup.rows for rollup in rollups]),
+        columns={
+            column: np.concatenate([rollup.columns[column] for rollup in rollups])
+            for column in COLUMNS
+        },
+    )
+
+
+@dataclass
+class RollupPyramid:
+    """Every level's buckets, or with ``offsets`` only those from a level CSV's byte offset on.
+
+    ``source`` is how far into the input CSV rows have been folded in.
+    """
+
+    levels: dict[str, Rollup] = field(
+        default_factory=lambda: {name: Rollup.empty(width) for name, width in LEVELS.items()}
+    )
+    last_timestamp: int | None = None
+    source: AppendCursor | None = None
+    offsets: dict[str, int] = field(default_factory=dict)
+
+    def update(self, frame: TelemetryFrame) -> None:
+        """Fold in rows newer than ``last_timestamp``; older rows are skipped.
+
+        Only the finest level sees raw rows. Each coarser level drops its
+        buckets from the first one the new rows touch and rebuilds them from
+        the level below, so the work is proportional to the new data.
+        """
+        if self.last_timestamp is not None:
+            first_new = np.searchsorted(frame.timestamps, self.last_timestamp, side="right")
+            frame = frame.take(slice(int(first_new), None))
+        if not len(frame):
+            return
+        names = list(LEVELS)
+        fresh = Rollup.from_frame(frame, LEVELS[names[0]])
+        self.levels[names[0]] = self.levels[names[0]].append(fresh)
+        for finer, name in zip(names, names[1:]):
+            width = LEVELS[name]
+            first = int(fresh.buckets[0]) // width * width
+            kept = self.levels[name].window(None, first - 1)
+            rebuilt = self.levels[finer].window(first, None).coarsen(width)
+            self.levels[name] = concat_rollups([kept, rebuilt])
+        self.last_timestamp = int(frame.timestamps[-1])
+
+
+def _csv_lines(rollup: Rollup, header: bool) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(["bucket", "rows", *COLUMNS])
+    writer.writerows(
+        zip(
+            format_timestamps(rollup.buckets).tolist(),
+            rollup.rows.tolist(),
+            *[rollup.columns[column].tolist() for column in COLUMNS],
+        )
+    )
+    return buffer.getvalue().encode("utf-8")
+
+
+def _write_level(path: Path, rollup: Rollup, offset: int, tail_start: int) -> int:
+    """Write ``rollup`` over ``path`` from byte ``offset`` (0 rewrites the file).
+
+    Returns the byte offset of the first bucket at or after ``tail_start``.
+    """
+    split = int(np.searchsorted(rollup.buckets, tail_start))
+    with path.open("r+b" if offset else "wb") as handle:
+        handle.seek(offset)
+        handle.truncate()
+        handle.write(_csv_lines(rollup.take(slice(None, split)), header=not offset))
+        tail = handle.tell()
+        handle.write(_csv_lines(rollup.take(slice(split, None)), header=False))
+    return tail
+
+
+def write_pyramid(directory: Path, pyramid: RollupPyramid) -> None:
+    """Write one CSV per level plus ``state.json`` recording the last row folded in.
+
+    Levels of a pyramid read with ``tail=True`` overwrite only their tail.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    last = pyramid.last_timestamp
+    tail_start = 0 if last is None else last // TAIL_WIDTH * TAIL_WIDTH
+    tails = {
+        name: _write_level(
+            directory / f"{name}.csv", rollup, pyramid.offsets.get(name, 0), tail_start
+        )
+        for name, rollup in pyramid.levels.items()
+    }
+    state = {
+        "last_timestamp": None if last is None else format_timestamps(np.array([last]))[0],
+        "source": None if pyramid.source is None else pyramid.source.to_dict(),
+        "tails": tails,
+    }
+    (directory / "state.json").write_text(json.dumps(state, indent=2))
+
+
+def read_rollup(path: Path, width: int, offset: int = 0) -> Rollup:
+    """Read a level CSV, or only its rows from byte ``offset`` on."""
+    with path.open("rb") as handle:
+        header = next(csv.reader([handle.readline().decode("utf-8")]))
+        handle.seek(max(offset, handle.tell()))
+        reader = csv.reader(handle.read().decode("utf-8").splitlines())
+        columns = list(zip(*reader)) or [() for _ in header]
+    values = dict(zip(header, columns, strict=True))
+    return Rollup(
+        width=width,
+        buckets=parse_timestamps(list(values["bucket"])),
+        rows=np.array(values["rows"], dtype=np.int64),
+        columns={
+            column: (
+                np.array(values[column], dtype=np.int64)
+                if column.endswith("_count")
+                else parse_values(list(values[column]))
+            )
+            for column in COLUMNS
+        },
+    )
+
+
+def read_pyramid(directory: Path, tail: bool = False) -> RollupPyramid:
+    """Read the pyramid ``write_pyramid`` left behind.
+
+    With ``tail``, each level holds only the buckets new rows can still touch,
+    which is all ``update`` and ``write_pyramid`` need to continue it.
+    """
+    state = json.loads((directory / "state.json").read_text())
+    last = state["last_timestamp"]
+    offsets = state.get("tails", {}) if tail else {}
+    return RollupPyramid(
+        levels={
+            name: read_rollup(directory / f"{name}.csv", width, offsets.get(name, 0))
+            for name, width in LEVELS.items()
+        },
+        last_timestamp=None if last is None else int(parse_timestamps([last])[0]),
+        source=AppendCursor.from_dict(state["source"]) if state.get("source") else None,
+        offsets=offsets,
+    )
+
+
+def parse_args() -> argparse.Namespace:
+    data_dir = Path(__file__).resolve().parents[1] / "data"
+    parser = argparse.ArgumentParser(description="Build the telemetry rollup pyramid.")
+    parser.add_argument(
+        "--in",
+        dest="input_path",
+        default=str(data_dir / "sample.csv"),
+        help="Telemetry CSV or .cols to aggregate.",
+    )
+    parser.add_argument(
+        "--out-dir",
+        dest="output_dir",
+        default=str(data_dir / "rollups"),
+        help="Directory for the per-level rollup CSVs.",
+    )
+    parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Ignore existing rollups instead of folding in only newer rows.",
+    )
+    parser.add_argument(
+        "--chunk-rows",
+        type=int,
+        default=CHUNK_ROWS,
+        help="Rows aggregated per batch from a column store.",
+    )
+    return parser.parse_args()
+
+
+def fold_csv(pyramid: RollupPyramid, path: Path) -> None:
+    """Fold in the rows appended to ``path`` since ``pyramid.source``.
+
+    A replaced or rewritten file is read from the start; rows it holds up to
+    ``last_timestamp`` are skipped by ``update`` as usual.
+    """
+    cursor = pyramid.source
+    if cursor is None or cursor.replaced(path):
+        cursor = AppendCursor()
+    while True:
+        frame, offset = read_appended(path, cursor.offset)
+        pyramid.update(frame)
+        if offset == cursor.offset:
+            break
+        cursor.advance(path, offset)
+    pyramid.source = cursor
+
+
+def main() -> None:
+    args = parse_args()
+    input_path, output_dir = Path(args.input_path), Path(args.output_dir)
+    existing = (output_dir / "state.json").exists() and not args.rebuild
+    pyramid = read_pyramid(output_dir, tail=True) if existing else RollupPyramid()
+    if is_columnar(input_path):
+        for chunk in iter_frames(input_path, args.chunk_rows):
+            pyramid.update(chunk)
+        pyramid.source = None
+    else:
+        fold_csv(pyramid, input_path)
+    write_pyramid(output_dir, pyramid)
+
+
+if __name__ == "__main__":
+    main()
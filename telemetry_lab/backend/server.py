@@ -6,16 +6,530 @@ or Flask if you want richer endpoints.
 
 from __future__ import annotations
 
+import argparse
+import glob
+import gzip
+import hashlib
+import io
 import json
+import os
+import select
+import signal
+import socket
+import tempfile
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from email.utils import formatdate, parsedate_to_datetime
 from http.server import BaseHTTPRequestHandler, HTTPServer
 from pathlib import Path
+from types import FrameType
+from typing import Any, BinaryIO, Callable, Iterator, Sequence, TypeVar, cast
+from urllib.parse import parse_qs, urlsplit
 
+import numpy as np
+
+from telemetry_lab.backend.frame import (
+    MIN_DOWNSAMPLE_POINTS,
+    TelemetryFrame,
+    columnar_payload,
+    downsample,
+    encode_csv,
+    parse_timestamps,
+    read_frame,
+    time_window,
+)
+from telemetry_lab.backend.live import LiveFeed, Subscription
+from telemetry_lab.backend.metrics import STAGE_METRICS_FILE, ServerMetrics, read_stage_metrics
 from telemetry_lab.backend.report import build_report
+from telemetry_lab.backend.rollup import LEVELS, Rollup, read_rollup
 
 DATA_DIR = Path(__file__).resolve().parents[1] / "data"
 
+_Request = socket.socket | tuple[bytes, socket.socket]
+T = TypeVar("T")
+
+# Worker threads in the concurrent server, and how long an idle keep-alive
+# connection may hold one of them.
+DEFAULT_WORKERS = 32
+KEEPALIVE_TIMEOUT = 5.0
+
+
+_JSON = "application/json"
+
+# Seconds between SSE comments that keep idle proxies from closing /stream.
+SSE_HEARTBEAT = 15.0
+
+# /stream clients are served by one thread outside the worker pool, up to
+# this many at once; each may have this many bytes waiting to be sent.
+DEFAULT_MAX_STREAMS = 256
+STREAM_BUFFER_BYTES = 1 << 20
+
+# Bytes per write when streaming bodies.
+WRITE_CHUNK = 1 << 16
+
+# Bodies smaller than this go out uncompressed; gzip gains little on them.
+GZIP_MIN_BYTES = 1024
+GZIP_LEVEL = 6
+
+# Memory held by cached responses (bodies plus their gzip variants). A body
+# larger than an eighth of it, such as a whole-file CSV window, is served
+# without being kept.
+RESPONSE_CACHE_BYTES = 64 << 20
+
+# Memory held by parsed CSV frames and rollup levels kept between requests.
+# Memory-mapped column stores are not counted.
+PARSED_CACHE_BYTES = 256 << 20
+
+# Request metrics are labelled by route; anything else is counted as "other".
+ROUTES = frozenset(
+    {
+        "/health",
+        "/metrics",
+        "/data/sample",
+        "/data/cleaned",
+        "/data/labels",
+        "/data/alerts",
+        "/data/assets",
+        "/stream",
+        "/data/rollup",
+        "/data/bundle",
+        "/data/report",
+    }
+)
+METRICS = ServerMetrics()
+
+
+def _encode_json(payload: Any) -> bytes:
+    return json.dumps(payload).encode("utf-8")
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    body: bytes
+    content_type: str
+    etag: str
+    mtime: float
+    version: tuple[tuple[int, int], ...]
+    variants: dict[str, bytes] = field(default_factory=dict, compare=False)
+
+    def encoded(self, encoding: str) -> bytes:
+        """Body in ``encoding``, compressed at most once per cached version."""
+        if encoding == "identity":
+            return self.body
+        variant = self.variants.get(encoding)
+        if variant is None:
+            variant = gzip.compress(self.body, compresslevel=GZIP_LEVEL, mtime=0)
+            self.variants[encoding] = variant
+        return variant
+
+    def etag_for(self, encoding: str) -> str:
+        return self.etag if encoding == "identity" else f'{self.etag[:-1]}-{encoding}"'
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + sum(len(variant) for variant in list(self.variants.values()))
+
+
+def negotiate_encoding(accept_encoding: str | None, size: int) -> str:
+    """Pick ``gzip`` when the client accepts it and the body is worth compressing."""
+    if not accept_encoding or size < GZIP_MIN_BYTES:
+        return "identity"
+    weights: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.partition(";")
+        weight = 1.0
+        name, _, value = params.strip().partition("=")
+        if name.strip().lower() == "q":
+            try:
+                weight = float(value)
+            except ValueError:
+                weight = 0.0
+        weights[coding.strip().lower()] = weight
+    return "gzip" if weights.get("gzip", weights.get("*", 0.0)) > 0 else "identity"
+
+
+class ResponseCache:
+    """Pre-encoded responses per route, rebuilt when a source file's mtime or size changes.
+
+    Dashboards poll far more often than the pipeline rewrites its artifacts, so
+    most requests are served from memory after a ``stat`` per source file.
+    Least recently used entries are evicted beyond ``max_entries`` or
+    ``max_bytes``; bodies over ``max_bytes // 8`` are never stored.
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = RESPONSE_CACHE_BYTES) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[tuple[str, tuple[Path, ...]], CachedResponse] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(
+        self, route: str, sources: Sequence[Path], build: Callable[[], tuple[bytes, str]]
+    ) -> CachedResponse:
+        """Return the cached response, building it first if any source changed.
+
+        Raises ``FileNotFoundError`` when a source file is missing.
+        """
+        key = (route, tuple(sources))
+        stats = [path.stat() for path in sources]
+        version = tuple((stat.st_mtime_ns, stat.st_size) for stat in stats)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.version == version:
+                self._entries.move_to_end(key)
+                METRICS.count_cache("response", hit=True)
+                return entry
+        METRICS.count_cache("response", hit=False)
+        body, content_type = build()
+        entry = CachedResponse(
+            body=body,
+            content_type=content_type,
+            etag=f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"',
+            mtime=max(stat.st_mtime for stat in stats),
+            version=version,
+        )
+        if len(body) > self.max_bytes // 8:
+            return entry
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self._evict()
+        return entry
+
+    def encoded(self, entry: CachedResponse, encoding: str) -> bytes:
+        """``entry``'s body in ``encoding``; a new variant counts against ``max_bytes``."""
+        known = encoding == "identity" or encoding in entry.variants
+        body = entry.encoded(encoding)
+        if not known:
+            with self._lock:
+                self._evict()
+        return body
+
+    def _evict(self) -> None:
+        while len(self._entries) > self.max_entries or self.size > self.max_bytes:
+            self._entries.popitem(last=False)
+
+    @property
+    def size(self) -> int:
+        """Bytes held by cached bodies and their encoded variants."""
+        return sum(entry.size for entry in list(self._entries.values()))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+RESPONSE_CACHE = ResponseCache()
+
+_FEEDS: dict[Path, LiveFeed] = {}
+_FEEDS_LOCK = threading.Lock()
+
+
+def live_feed(path: Path) -> LiveFeed:
+    """The shared live feed for a telemetry file, created on first use."""
+    with _FEEDS_LOCK:
+        if path not in _FEEDS:
+            _FEEDS[path] = LiveFeed(path)
+        return _FEEDS[path]
+
+
+@dataclass
+class _Stream:
+    feed: LiveFeed
+    subscription: Subscription
+    pending: bytearray = field(default_factory=bytearray)
+    last_write: float = field(default_factory=time.monotonic)
+
+
+class StreamHub:
+    """Serves ``/stream`` subscribers from one thread, outside the request pool.
+
+    A handler sends the response headers and hands over the socket, which
+    frees its worker for other requests. The hub forwards feed messages and
+    heartbeats with non-blocking writes, and drops clients that disconnect,
+    fall a queue behind, or leave more than ``STREAM_BUFFER_BYTES`` unsent.
+    """
+
+    def __init__(self, max_streams: int = DEFAULT_MAX_STREAMS) -> None:
+        self.max_streams = max_streams
+        self._lock = threading.Lock()
+        self._streams: dict[socket.socket, _Stream] = {}
+        self._thread: threading.Thread | None = None
+        self._closed = False
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._streams)
+
+    def owns(self, connection: Any) -> bool:
+        with self._lock:
+            return connection in self._streams
+
+    def add(self, connection: socket.socket, feed: LiveFeed, subscription: Subscription) -> bool:
+        """Take over ``connection``; ``False`` if the hub is full or closed."""
+        with self._lock:
+            if self._closed or len(self._streams) >= self.max_streams:
+                return False
+            connection.setblocking(False)
+            self._streams[connection] = _Stream(feed, subscription)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="telemetry-streams", daemon=True
+                )
+                self._thread.start()
+        return True
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout=5)
+        with self._lock:
+            for connection in list(self._streams):
+                self._drop(connection)
+
+    def _drop(self, connection: socket.socket) -> None:
+        stream = self._streams.pop(connection)
+        stream.feed.unsubscribe(stream.subscription)
+        try:
+            connection.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        connection.close()
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                if self._closed or not self._streams:
+                    self._thread = None
+                    return
+                connections = list(self._streams)
+            # Clients never send on an event stream, so readable means closed.
+            readable, _, _ = select.select(connections, [], [], 0.1)
+            with self._lock:
+                for connection in connections:
+                    if not self._pump(
+                        connection, self._streams[connection], connection in readable
+                    ):
+                        self._drop(connection)
+
+    def _pump(self, connection: socket.socket, stream: _Stream, readable: bool) -> bool:
+        """Queue and send what is due; ``False`` once the client should be dropped."""
+        if readable:
+            try:
+                if not connection.recv(1024):
+                    return False
+            except BlockingIOError:
+                pass
+            except OSError:
+                return False
+        while (message := stream.subscription.get(timeout=0)) is not None:
+            data = json.dumps(message.data)
+            stream.pending += f"id: {message.id}\nevent: {message.event}\ndata: {data}\n\n".encode()
+        if stream.subscription.dropped or len(stream.pending) > STREAM_BUFFER_BYTES:
+            return False
+        now = time.monotonic()
+        if not stream.pending and now - stream.last_write >= SSE_HEARTBEAT:
+            stream.pending += b": heartbeat\n\n"
+        if stream.pending:
+            try:
+                sent = connection.send(stream.pending)
+            except BlockingIOError:
+                return True
+            except OSError:
+                return False
+            del stream.pending[:sent]
+            stream.last_write = now
+        return True
+
+
+def _gzip_variant_path(path: Path, stat: os.stat_result) -> Path:
+    """Where the gzip encoding of this version of ``path`` is kept, beside it."""
+    return path.with_name(f".{path.name}.{stat.st_mtime_ns:x}-{stat.st_size:x}.gz")
+
+
+def _gzip_chunks(handle: BinaryIO, source: Path, target: Path) -> Iterator[bytes]:
+    """Yield a file's gzip encoding block by block, saving it as ``target``.
+
+    The output is spooled to a temporary file that replaces ``target`` only
+    once compression completes, so readers never see a partial variant, and
+    older variants of ``source`` are then removed. If the directory is not
+    writable the encoding is only yielded.
+    """
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+    try:
+        spool = tempfile.NamedTemporaryFile(
+            dir=target.parent, prefix=f"{target.name}.", suffix=".tmp", delete=False
+        )
+    except OSError:
+        spool = None
+    done = False
+    try:
+        while block := handle.read(WRITE_CHUNK):
+            data = compressor.compress(block)
+            if spool:
+                spool.write(data)
+            yield data
+        data = compressor.flush()
+        if spool:
+            spool.write(data)
+            spool.close()
+            os.replace(spool.name, target)
+            done = True
+            for stale in target.parent.glob(f".{glob.escape(source.name)}.*.gz"):
+                if stale != target:
+                    stale.unlink(missing_ok=True)
+        yield data
+    finally:
+        if spool and not done:
+            spool.close()
+            Path(spool.name).unlink(missing_ok=True)
+
+
+def parse_byte_range(header: str | None, size: int) -> tuple[int, int] | None:
+    """Parse a single ``bytes=`` range into an inclusive ``(first, last)`` pair.
+
+    Returns ``None`` when there is nothing to honour (no header, several
+    ranges, other units, malformed values), so the full body is sent. Raises
+    ``ValueError`` when the range lies outside a ``size``-byte body.
+    """
+    if not header:
+        return None
+    unit, _, spec = header.partition("=")
+    first_text, dash, last_text = spec.strip().partition("-")
+    if unit.strip().lower() != "bytes" or "," in spec or not dash:
+        return None
+    try:
+        first = int(first_text) if first_text else None
+        last = int(last_text) if last_text else None
+    except ValueError:
+        return None
+    if first is None:
+        if last is None or last < 0:
+            return None
+        if last == 0 or size == 0:
+            raise ValueError("empty suffix range")
+        return max(size - last, 0), size - 1
+    if last is not None and last < first:
+        return None
+    if first >= size:
+        raise ValueError(f"range starts past the end of a {size}-byte body")
+    return first, size - 1 if last is None else min(last, size - 1)
+
+
+_PARSED: OrderedDict[Path, tuple[tuple[int, int], Any, int]] = OrderedDict()
+_PARSED_LOCK = threading.Lock()
+
+
+def _resident_bytes(parsed: Any) -> int:
+    """Bytes of the arrays a parsed frame or rollup holds in memory.
+
+    Arrays backed by a memory-mapped column store cost nothing here; the page
+    cache holds their data.
+    """
+    total = 0
+    for value in vars(parsed).values():
+        for array in value.values() if isinstance(value, dict) else [value]:
+            base = array
+            while isinstance(base, np.ndarray) and not isinstance(base, np.memmap):
+                base = base.base
+            if isinstance(array, np.ndarray) and not isinstance(base, np.memmap):
+                total += array.nbytes
+    return total
+
+
+def _load_parsed(path: Path, parse: Callable[[Path], T]) -> T:
+    """``parse(path)``, re-run only when the file's mtime or size changes.
+
+    Only the latest version of each path is kept, and least recently used
+    paths are dropped beyond ``PARSED_CACHE_BYTES``; a result larger than
+    that is returned without being kept.
+    """
+    stat = path.stat()
+    version = (stat.st_mtime_ns, stat.st_size)
+    with _PARSED_LOCK:
+        cached = _PARSED.get(path)
+        if cached is not None and cached[0] == version:
+            _PARSED.move_to_end(path)
+    METRICS.count_cache("parsed", hit=cached is not None and cached[0] == version)
+    if cached is not None and cached[0] == version:
+        return cast(T, cached[1])
+    parsed = parse(path)
+    size = _resident_bytes(parsed)
+    with _PARSED_LOCK:
+        _PARSED.pop(path, None)
+        if size <= PARSED_CACHE_BYTES:
+            _PARSED[path] = (version, parsed, size)
+            while sum(entry[2] for entry in _PARSED.values()) > PARSED_CACHE_BYTES:
+                _PARSED.popitem(last=False)
+    return parsed
+
+
+def load_frame(path: Path) -> TelemetryFrame:
+    """Parsed telemetry for ``path``, re-read only when its mtime or size changes."""
+    return _load_parsed(path, read_frame)
+
+
+def load_rollup(directory: Path, level: str) -> Rollup:
+    return _load_parsed(directory / f"{level}.csv", lambda path: read_rollup(path, LEVELS[level]))
+
+
+def _parse_window(query: str) -> tuple[int | None, int | None, int | None]:
+    """Parse ``start``/``end`` (ISO-8601) and ``max_points``; raises ``ValueError``."""
+    params = {name: values[-1] for name, values in parse_qs(query).items()}
+    start, end = (
+        int(parse_timestamps([params[name]])[0]) if name in params else None
+        for name in ("start", "end")
+    )
+    max_points = int(params["max_points"]) if "max_points" in params else None
+    if max_points is not None and max_points < MIN_DOWNSAMPLE_POINTS:
+        raise ValueError(f"max_points must be at least {MIN_DOWNSAMPLE_POINTS}")
+    return start, end, max_points
+
+
+class _CountingWriter(io.BufferedIOBase):
+    """Wraps the socket writer to count the bytes each response puts on the wire."""
+
+    def __init__(self, raw: io.BufferedIOBase) -> None:
+        super().__init__()
+        self._raw = raw
+        self.sent = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: Any) -> int:
+        written = self._raw.write(data)
+        self.sent += written
+        return written
+
+    def flush(self) -> None:
+        self._raw.flush()
+
+    def close(self) -> None:
+        super().close()
+        self._raw.close()
+
 
 class TelemetryHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    timeout = KEEPALIVE_TIMEOUT
+
+    def setup(self) -> None:
+        super().setup()
+        self._output = _CountingWriter(self.wfile)
+        self.wfile = self._output
+        self._status = 0
+
+    def send_response(self, code: int, message: str | None = None) -> None:
+        self._status = code
+        super().send_response(code, message)
+
     def _send_json(self, payload: dict, status: int = 200) -> None:
         encoded = json.dumps(payload).encode("utf-8")
         self.send_response(status)
@@ -32,65 +546,442 @@ class TelemetryHandler(BaseHTTPRequestHandler):
         self.end_headers()
         self.wfile.write(encoded)
 
-    def _send_json_file(self, path: Path) -> None:
+    def _not_modified(self, mtime: float, etag: str) -> bool:
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match is not None:
+            tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+            return "*" in tags or etag in tags
+        if_modified_since = self.headers.get("If-Modified-Since")
+        if if_modified_since is None:
+            return False
         try:
-            payload = json.loads(path.read_text())
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return int(mtime) <= since
+
+    def _send_validators(self, etag: str, mtime: float) -> None:
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", formatdate(mtime, usegmt=True))
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Vary", "Accept-Encoding")
+
+    def _send_not_modified(self, etag: str, mtime: float) -> None:
+        self.send_response(304)
+        self._send_validators(etag, mtime)
+        self.end_headers()
+
+    def _start_body(
+        self, size: int, etag: str, mtime: float, content_type: str, encoding: str
+    ) -> tuple[int, int] | None:
+        """Send the status line and headers for a ``size``-byte representation.
+
+        Handles conditional and ``Range`` requests. Returns the ``(offset, count)``
+        span to write next, or ``None`` when the response is already complete
+        (304 or 416).
+        """
+        if self._not_modified(mtime, etag):
+            self._send_not_modified(etag, mtime)
+            return None
+        try:
+            span = None
+            if self.headers.get("If-Range", etag).strip() == etag:
+                span = parse_byte_range(self.headers.get("Range"), size)
+        except ValueError:
+            self.send_response(416)
+            self.send_header("Content-Range", f"bytes */{size}")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return None
+        first, last = span or (0, size - 1)
+        self.send_response(206 if span else 200)
+        self._send_validators(etag, mtime)
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Type", content_type)
+        if encoding != "identity":
+            self.send_header("Content-Encoding", encoding)
+        if span:
+            self.send_header("Content-Range", f"bytes {first}-{last}/{size}")
+        self.send_header("Content-Length", str(last - first + 1))
+        self.end_headers()
+        return first, last - first + 1
+
+    def _write_bytes(self, body: bytes, offset: int, count: int) -> None:
+        view = memoryview(body)[offset : offset + count]
+        for start in range(0, count, WRITE_CHUNK):
+            self.wfile.write(view[start : start + WRITE_CHUNK])
+
+    def _write_chunk(self, data: bytes) -> None:
+        if data:
+            self.wfile.write(b"%x\r\n%b\r\n" % (len(data), data))
+
+    def _send_cached(self, sources: Sequence[Path], build: Callable[[], tuple[bytes, str]]) -> None:
+        try:
+            entry = RESPONSE_CACHE.get(self.path, sources, build)
         except FileNotFoundError:
             self._send_json({"error": "Not found"}, status=404)
             return
-        self._send_json(payload)
+        encoding = negotiate_encoding(self.headers.get("Accept-Encoding"), len(entry.body))
+        body = RESPONSE_CACHE.encoded(entry, encoding)
+        etag = entry.etag_for(encoding)
+        span = self._start_body(len(body), etag, entry.mtime, entry.content_type, encoding)
+        if span:
+            self._write_bytes(body, *span)
 
-    def _send_csv_file(self, path: Path) -> None:
+    def _send_file(self, path: Path, content_type: str) -> None:
+        """Stream a file from disk with ``sendfile``, never holding it in memory.
+
+        The gzip variant is compressed once per file version into a hidden
+        file beside the original and sent from there. The first request for it
+        streams the output with chunked encoding while it is produced.
+        """
         try:
-            payload = path.read_text()
+            handle = path.open("rb")
         except FileNotFoundError:
             self._send_json({"error": "Not found"}, status=404)
             return
-        self._send_text(payload, "text/csv")
+        with handle:
+            stat = os.fstat(handle.fileno())
+            etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+            encoding = negotiate_encoding(self.headers.get("Accept-Encoding"), stat.st_size)
+            if encoding == "identity":
+                self._sendfile(handle, etag, stat.st_mtime, content_type, encoding)
+                return
+            etag = f'{etag[:-1]}-{encoding}"'
+            if self._not_modified(stat.st_mtime, etag):
+                self._send_not_modified(etag, stat.st_mtime)
+                return
+            target = _gzip_variant_path(path, stat)
+            variant = self._open_variant(handle, path, target)
+            if variant is None:
+                self._stream_gzip(handle, path, target, etag, stat.st_mtime, content_type)
+                return
+        with variant:
+            self._sendfile(variant, etag, stat.st_mtime, content_type, encoding)
+
+    def _sendfile(
+        self, handle: BinaryIO, etag: str, mtime: float, content_type: str, encoding: str
+    ) -> None:
+        span = self._start_body(
+            os.fstat(handle.fileno()).st_size, etag, mtime, content_type, encoding
+        )
+        if span:
+            self._output.sent += self.connection.sendfile(handle, *span)
+
+    def _open_variant(self, handle: BinaryIO, source: Path, target: Path) -> BinaryIO | None:
+        """The stored gzip variant, or ``None`` when it is to be streamed as it is built.
+
+        HTTP/1.0 clients cannot take a chunked body, so the variant is built
+        first for them (and, if it cannot be stored, streamed to them anyway).
+        """
+        try:
+            variant = target.open("rb")
+        except FileNotFoundError:
+            METRICS.count_cache("file_gzip", hit=False)
+        else:
+            METRICS.count_cache("file_gzip", hit=True)
+            return variant
+        if self.request_version != "HTTP/1.0":
+            return None
+        for _ in _gzip_chunks(handle, source, target):
+            pass
+        handle.seek(0)
+        try:
+            return target.open("rb")
+        except FileNotFoundError:
+            return None
+
+    def _stream_gzip(
+        self,
+        handle: BinaryIO,
+        source: Path,
+        target: Path,
+        etag: str,
+        mtime: float,
+        content_type: str,
+    ) -> None:
+        chunked = self.request_version != "HTTP/1.0"
+        self.send_response(200)
+        self._send_validators(etag, mtime)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Encoding", "gzip")
+        if chunked:
+            self.send_header("Transfer-Encoding", "chunked")
+        else:
+            self.close_connection = True
+        self.end_headers()
+        for data in _gzip_chunks(handle, source, target):
+            if chunked:
+                self._write_chunk(data)
+            elif data:
+                self.wfile.write(data)
+        if chunked:
+            self.wfile.write(b"0\r\n\r\n")
+
+    def _send_json_file(self, path: Path) -> None:
+        self._send_cached([path], lambda: (_encode_json(json.loads(path.read_text())), _JSON))
+
+    def _send_csv_file(self, path: Path) -> None:
+        query = urlsplit(self.path).query
+        if not query:
+            self._send_file(path, "text/csv")
+            return
+        try:
+            start, end, max_points = _parse_window(query)
+        except ValueError as exc:
+            self._send_json({"error": f"Invalid query: {exc}"}, status=400)
+            return
+
+        def build() -> tuple[bytes, str]:
+            frame = time_window(load_frame(path), start, end)
+            if max_points is not None:
+                frame = downsample(frame, max_points)
+            return encode_csv(frame), "text/csv"
+
+        self._send_cached([path], build)
+
+    def _send_rollup(self, directory: Path) -> None:
+        query = urlsplit(self.path).query
+        level = parse_qs(query).get("level", [None])[-1]
+        try:
+            start, end, max_points = _parse_window(query)
+            if level is not None and level not in LEVELS:
+                raise ValueError(f"level must be one of {', '.join(LEVELS)}")
+        except ValueError as exc:
+            self._send_json({"error": f"Invalid query: {exc}"}, status=400)
+            return
+
+        def build() -> tuple[bytes, str]:
+            # Without an explicit level, serve the finest one that fits in max_points.
+            for name in [level] if level else LEVELS:
+                rollup = load_rollup(directory, name).window(start, end)
+                if max_points is None or len(rollup) <= max_points:
+                    break
+            return _encode_json({"level": name, **rollup.to_payload()}), _JSON
+
+        levels = [level] if level else list(LEVELS)
+        self._send_cached([directory / f"{name}.csv" for name in levels], build)
+
+    def _send_stream(self, path: Path) -> None:
+        """Server-sent events: new rows plus label/alert open and close events.
+
+        The response has no length, so the connection closes when the stream
+        ends: on shutdown, on a write error, or when the client falls more than
+        a queue's worth of messages behind and is dropped. The connection is
+        handed to the pooled server's ``StreamHub`` so no worker is held; a
+        server without one (``--workers 0``) answers 503, since a stream would
+        block its only thread and shutdown with it.
+        """
+        hub: StreamHub | None = getattr(self.server, "streams", None)
+        if hub is None:
+            self._send_json({"error": "Streaming needs the pooled server"}, status=503)
+            return
+        if len(hub) >= hub.max_streams:
+            self._send_json({"error": "Too many streams"}, status=503)
+            return
+        feed = live_feed(path)
+        subscription = feed.subscribe()
+        self.close_connection = True
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.flush()
+        if not hub.add(self.connection, feed, subscription):
+            # Filled or closed since the check: end the stream straight away.
+            feed.unsubscribe(subscription)
+
+    def _send_bundle(self, data_dir: Path) -> None:
+        """Everything the dashboard loads, in one response cached per data version.
+
+        Telemetry is sent once, column by column; the cleaned view is implied
+        by ``missing_rows`` (the rows cleaning drops) instead of a second copy.
+        """
+        sample_path = data_dir / "sample.csv"
+        labels_path = data_dir / "labels.json"
+        alerts_path = data_dir / "alerts.json"
+        assets_path = data_dir / "asset_comms.json"
+
+        def build() -> tuple[bytes, str]:
+            frame = load_frame(sample_path)
+            labels = json.loads(labels_path.read_text())
+            alerts = json.loads(alerts_path.read_text())
+            report = build_report(alerts, labels)
+            payload = {
+                "generated_at": report["generated_at"],
+                "telemetry": {
+                    **columnar_payload(frame),
+                    "missing_rows": np.flatnonzero(frame.missing).tolist(),
+                },
+                "labels": labels,
+                "alerts": alerts,
+                "assets": json.loads(assets_path.read_text()),
+                "summary": report["summary"],
+            }
+            return _encode_json(payload), _JSON
+
+        self._send_cached([sample_path, labels_path, alerts_path, assets_path], build)
+
+    def _send_report(self, alerts_path: Path, labels_path: Path) -> None:
+        def build() -> tuple[bytes, str]:
+            alerts = json.loads(alerts_path.read_text())
+            labels = json.loads(labels_path.read_text())
+            return _encode_json(build_report(alerts, labels)), _JSON
+
+        self._send_cached([alerts_path, labels_path], build)
+
+    def _send_metrics(self) -> None:
+        stages = read_stage_metrics(DATA_DIR / STAGE_METRICS_FILE)
+        self._send_text(METRICS.render(stages), "text/plain; version=0.0.4; charset=utf-8")
 
     def do_GET(self) -> None:  # noqa: N802 - standard lib signature
-        if self.path == "/health":
+        if getattr(self.server, "draining", False):
+            self.close_connection = True
+
+        route = urlsplit(self.path).path
+        started = time.perf_counter()
+        sent = self._output.sent
+        self._status = 0
+        try:
+            self._dispatch(route)
+        finally:
+            METRICS.observe_request(
+                route if route in ROUTES else "other",
+                self._status or 500,
+                time.perf_counter() - started,
+                self._output.sent - sent,
+            )
+
+    def _dispatch(self, route: str) -> None:
+        if route == "/health":
             self._send_json({"status": "ok"})
             return
 
-        if self.path == "/data/sample":
+        if route == "/metrics":
+            self._send_metrics()
+            return
+
+        if route == "/data/sample":
             self._send_csv_file(DATA_DIR / "sample.csv")
             return
 
-        if self.path == "/data/cleaned":
+        if route == "/data/cleaned":
             self._send_csv_file(DATA_DIR / "cleaned.csv")
             return
 
-        if self.path == "/data/labels":
+        if route == "/data/labels":
             self._send_json_file(DATA_DIR / "labels.json")
             return
 
-        if self.path == "/data/alerts":
+        if route == "/data/alerts":
             self._send_json_file(DATA_DIR / "alerts.json")
             return
 
-        if self.path == "/data/assets":
+        if route == "/data/assets":
             self._send_json_file(DATA_DIR / "asset_comms.json")
             return
 
-        if self.path == "/data/report":
-            try:
-                alerts = json.loads((DATA_DIR / "alerts.json").read_text())
-                labels = json.loads((DATA_DIR / "labels.json").read_text())
-            except FileNotFoundError:
-                self._send_json({"error": "Not found"}, status=404)
-                return
-            report = build_report(alerts, labels)
-            self._send_json(report)
+        if route == "/stream":
+            self._send_stream(DATA_DIR / "sample.csv")
+            return
+
+        if route == "/data/rollup":
+            self._send_rollup(DATA_DIR / "rollups")
+            return
+
+        if route == "/data/bundle":
+            self._send_bundle(DATA_DIR)
+            return
+
+        if route == "/data/report":
+            self._send_report(DATA_DIR / "alerts.json", DATA_DIR / "labels.json")
             return
 
         self._send_json({"error": "Not found"}, status=404)
 
 
+class PooledHTTPServer(HTTPServer):
+    """HTTP server that hands each connection to a fixed pool of worker threads.
+
+    Connections are kept alive between requests (HTTP/1.1), so a worker stays
+    with its client until the client closes or idles for ``KEEPALIVE_TIMEOUT``.
+    ``/stream`` connections are handed to ``streams`` instead, so live
+    dashboards never occupy workers. ``shutdown`` stops accepting;
+    ``server_close`` then lets in-flight requests finish, closing each
+    connection after its current response, and ends the streams.
+    """
+
+    def __init__(
+        self,
+        server_address: tuple[str, int],
+        handler: type[BaseHTTPRequestHandler],
+        workers: int = DEFAULT_WORKERS,
+        max_streams: int = DEFAULT_MAX_STREAMS,
+    ) -> None:
+        super().__init__(server_address, handler)
+        self.draining = False
+        self.streams = StreamHub(max_streams)
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="telemetry-http")
+
+    def process_request(self, request: _Request, client_address: Any) -> None:
+        self._pool.submit(self._process, request, client_address)
+
+    def _process(self, request: _Request, client_address: Any) -> None:
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            if not self.streams.owns(request):
+                self.shutdown_request(request)
+
+    def server_close(self) -> None:
+        self.draining = True
+        super().server_close()
+        self._pool.shutdown(wait=True)
+        self.streams.close()
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Serve telemetry artifacts over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help="Worker threads; 0 serves one request at a time and refuses /stream.",
+    )
+    parser.add_argument(
+        "--max-streams",
+        type=int,
+        default=DEFAULT_MAX_STREAMS,
+        help="Concurrent /stream clients, served outside the worker pool.",
+    )
+    return parser.parse_args()
+
+
 def main() -> None:
-    server = HTTPServer(("127.0.0.1", 8000), TelemetryHandler)
-    print("Serving telemetry API on http://localhost:8000")
+    args = parse_args()
+    address = (args.host, args.port)
+    server = (
+        PooledHTTPServer(
+            address, TelemetryHandler, workers=args.workers, max_streams=args.max_streams
+        )
+        if args.workers > 0
+        else HTTPServer(address, TelemetryHandler)
+    )
+
+    def stop(signum: int, frame: FrameType | None) -> None:
+        # shutdown() blocks until serve_forever returns, so call it off the main thread.
+        threading.Thread(target=server.shutdown).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    print(f"Serving telemetry API on http://{args.host}:{args.port}")
     server.serve_forever()
+    server.server_close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,316 @@
+"""Parameter sweeps for the leak detectors.
+
+Every distinct ``alpha`` baseline is computed once and shared by all
+threshold/persistence combinations (and, for CUSUM, all slacks), which are
+then scored against the injected leaks in ``injections.json``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+from dataclasses import asdict, dataclass, fields
+from pathlib import Path
+from typing import Any, Sequence
+
+import numpy as np
+
+from telemetry_lab.backend.detect_leaks import cusum, ewma_filter, persistent_runs
+from telemetry_lab.backend.frame import read_frame
+
+
+@dataclass
+class SweepResult:
+    alpha: float
+    drop_threshold: float
+    persistence: int
+    alert_count: int
+    true_positives: int
+    detected_leaks: int
+    precision: float
+    recall: float
+
+
+@dataclass
+class CusumSweepResult:
+    alpha: float
+    slack: float
+    threshold: float
+    persistence: int
+    alert_count: int
+    true_positives: int
+    detected_leaks: int
+    flagged_samples: int
+    precision: float
+    recall: float
+
+
+def leak_windows(injections: list[dict[str, Any]]) -> np.ndarray:
+    """Return the (start, end) raw index ranges of injected leaks."""
+    windows = [
+        (event["start_index"], event["end_index"])
+        for event in injections
+        if event["kind"].endswith("leak")
+    ]
+    return np.array(windows, dtype=np.int64).reshape(-1, 2)
+
+
+def _overlapped_leaks(
+    starts: np.ndarray, ends: np.ndarray, leaks: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """The leaks each run overlaps, as ``[first, last)`` positions in ``leaks``.
+
+    ``leaks`` must be disjoint and sorted by start, so both bounds are sorted
+    and each run's overlap is one contiguous range found by binary search.
+    """
+    first = np.searchsorted(leaks[:, 1], starts, side="left")
+    last = np.searchsorted(leaks[:, 0], ends, side="right")
+    return first, np.maximum(last, first)
+
+
+def _score(
+    rows: np.ndarray,
+    starts: np.ndarray,
+    ends: np.ndarray,
+    leaks: np.ndarray,
+    shape: int,
+    persistence: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Alert, true positive and detected leak counts per (row, persistence).
+
+    Memory is linear in the number of runs plus ``shape`` x leaks per
+    persistence value; runs are never compared with every leak.
+    """
+    lengths = ends - starts + 1
+    first, last = _overlapped_leaks(starts, ends, leaks)
+    hit = last > first
+    alerts = np.zeros((shape, len(persistence)), dtype=np.int64)
+    true_positives = np.zeros_like(alerts)
+    detected = np.zeros_like(alerts)
+    for column, required in enumerate(persistence.tolist()):
+        kept = lengths >= required
+        alerts[:, column] = np.bincount(rows[kept], minlength=shape)
+        true_positives[:, column] = np.bincount(rows[kept & hit], minlength=shape)
+        # Each kept run covers one leak range; count the leaks any of them covers.
+        covering = kept & hit
+        coverage = np.zeros((shape, len(leaks) + 1), dtype=np.int64)
+        np.add.at(coverage, (rows[covering], first[covering]), 1)
+        np.add.at(coverage, (rows[covering], last[covering]), -1)
+        detected[:, column] = (np.cumsum(coverage[:, :-1], axis=1) > 0).sum(axis=1)
+    return alerts, true_positives, detected
+
+
+def sweep_parameters(
+    flow_values: np.ndarray,
+    leaks: np.ndarray,
+    *,
+    alphas: Sequence[float],
+    drop_thresholds: Sequence[float],
+    persistences: Sequence[int],
+    raw_index: np.ndarray | None = None,
+) -> list[SweepResult]:
+    """Score every (alpha, drop threshold, persistence) combination.
+
+    ``raw_index`` maps positions in ``flow_values`` back to the index space of
+    ``leaks`` (for example the rows of ``sample.csv`` kept by cleaning). An
+    alert is a true positive when it overlaps a leak window; a leak counts as
+    detected when at least one alert overlaps it. Leak windows must not overlap.
+    """
+    flows = np.asarray(flow_values, dtype=np.float64)
+    thresholds = np.asarray(drop_thresholds, dtype=np.float64)
+    persistence = np.asarray(persistences, dtype=np.int64)
+    mapping = np.arange(len(flows)) if raw_index is None else np.asarray(raw_index)
+    leaks = leaks[np.argsort(leaks[:, 0], kind="stable")]
+    results: list[SweepResult] = []
+    for alpha in alphas:
+        baseline = ewma_filter(flows, alpha)
+        below = flows[None, :] < baseline[None, :] - thresholds[:, None]
+        rows, starts, ends = persistent_runs(below)
+        alerts, true_positives, detected = _score(
+            rows, mapping[starts], mapping[ends], leaks, len(thresholds), persistence
+        )
+        precision = np.divide(true_positives, alerts, out=np.zeros(alerts.shape), where=alerts > 0)
+        recall = detected / len(leaks) if len(leaks) else np.zeros(detected.shape)
+        for row, threshold in enumerate(thresholds.tolist()):
+            for column, required in enumerate(persistence.tolist()):
+                results.append(
+                    SweepResult(
+                        alpha=float(alpha),
+                        drop_threshold=threshold,
+                        persistence=required,
+                        alert_count=int(alerts[row, column]),
+                        true_positives=int(true_positives[row, column]),
+                        detected_leaks=int(detected[row, column]),
+                        precision=float(precision[row, column]),
+                        recall=float(recall[row, column]),
+                    )
+                )
+    return results
+
+
+def sweep_cusum(
+    flow_values: np.ndarray,
+    leaks: np.ndarray,
+    *,
+    alphas: Sequence[float],
+    slacks: Sequence[float],
+    thresholds: Sequence[float],
+    persistences: Sequence[int],
+    raw_index: np.ndarray | None = None,
+) -> list[CusumSweepResult]:
+    """Score every (alpha, slack, threshold, persistence) CUSUM combination.
+
+    Scoring matches ``sweep_parameters``. ``flagged_samples`` counts the
+    samples inside kept alerts, which shows how much of the run a setting
+    flags; on the sawtooth demo flow every setting also fires at some cycle
+    resets, so precision alone does not separate them.
+    """
+    flows = np.asarray(flow_values, dtype=np.float64)
+    slack = np.asarray(slacks, dtype=np.float64)
+    limits = np.asarray(thresholds, dtype=np.float64)
+    persistence = np.asarray(persistences, dtype=np.int64)
+    mapping = np.arange(len(flows)) if raw_index is None else np.asarray(raw_index)
+    leaks = leaks[np.argsort(leaks[:, 0], kind="stable")]
+    shape = len(slack) * len(limits)
+    results: list[CusumSweepResult] = []
+    for alpha in alphas:
+        residual = flows - ewma_filter(flows, alpha)
+        low = cusum(-residual[None, :] - slack[:, None])
+        above = (low[:, None, :] > limits[None, :, None]).reshape(shape, len(flows))
+        rows, starts, ends = persistent_runs(above)
+        alerts, true_positives, detected = _score(
+            rows, mapping[starts], mapping[ends], leaks, shape, persistence
+        )
+        lengths = ends - starts + 1
+        flagged = np.zeros_like(alerts)
+        for column, required in enumerate(persistence.tolist()):
+            kept = lengths >= required
+            flagged[:, column] = np.bincount(rows[kept], lengths[kept], minlength=shape)
+        precision = np.divide(true_positives, alerts, out=np.zeros(alerts.shape), where=alerts > 0)
+        recall = detected / len(leaks) if len(leaks) else np.zeros(detected.shape)
+        for row in range(shape):
+            for column, required in enumerate(persistence.tolist()):
+                results.append(
+                    CusumSweepResult(
+                        alpha=float(alpha),
+                        slack=float(slack[row // len(limits)]),
+                        threshold=float(limits[row % len(limits)]),
+                        persistence=required,
+                        alert_count=int(alerts[row, column]),
+                        true_positives=int(true_positives[row, column]),
+                        detected_leaks=int(detected[row, column]),
+                        flagged_samples=int(flagged[row, column]),
+                        precision=float(precision[row, column]),
+                        recall=float(recall[row, column]),
+                    )
+                )
+    return results
+
+
+def write_csv(path: Path, results: Sequence[SweepResult | CusumSweepResult]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    columns = fields(type(results[0]) if results else SweepResult)
+    with path.open("w", newline="") as handle:
+        writer = csv.DictWriter(handle, fieldnames=[field.name for field in columns])
+        writer.writeheader()
+        writer.writerows(asdict(result) for result in results)
+
+
+def _floats(text: str) -> list[float]:
+    return [float(value) for value in text.split(",")]
+
+
+def _ints(text: str) -> list[int]:
+    return [int(value) for value in text.split(",")]
+
+
+SWEEP_DEFAULTS: dict[str, dict[str, list[Any]]] = {
+    "ewma": {
+        "alphas": [0.02, 0.05, 0.1, 0.2],
+        "thresholds": [1.5, 2.0, 2.5, 3.0, 3.5],
+        "persistence": [3, 4, 6, 8, 10, 12],
+    },
+    "cusum": {
+        "alphas": [0.05, 0.1, 0.2, 0.3],
+        "slacks": [1.0, 2.0, 5.0, 10.0],
+        "thresholds": [10.0, 20.0, 40.0, 60.0],
+        "persistence": [1, 3],
+    },
+}
+
+
+def parse_args() -> argparse.Namespace:
+    data_dir = Path(__file__).resolve().parents[1] / "data"
+    parser = argparse.ArgumentParser(description="Sweep leak detector parameters.")
+    parser.add_argument(
+        "--in",
+        dest="input_path",
+        default=str(data_dir / "sample.csv"),
+        help="Raw telemetry CSV (rows with missing values are skipped).",
+    )
+    parser.add_argument(
+        "--injections",
+        dest="injections_path",
+        default=str(data_dir / "injections.json"),
+        help="Ground-truth injections JSON.",
+    )
+    parser.add_argument(
+        "--out",
+        dest="output_path",
+        default=str(data_dir / "sweep.csv"),
+        help="Output CSV table with one row per parameter combination.",
+    )
+    parser.add_argument(
+        "--detector", choices=["cusum", "ewma"], default="ewma", help="Detector to sweep."
+    )
+    parser.add_argument("--alphas", type=_floats, default=None)
+    parser.add_argument(
+        "--thresholds",
+        type=_floats,
+        default=None,
+        help="EWMA drop thresholds, or CUSUM low-side sum thresholds.",
+    )
+    parser.add_argument("--slacks", type=_floats, default=None, help="CUSUM slacks.")
+    parser.add_argument("--persistence", type=_ints, default=None)
+    args = parser.parse_args()
+    defaults = SWEEP_DEFAULTS[args.detector]
+    for name, values in defaults.items():
+        if getattr(args, name) is None:
+            setattr(args, name, values)
+    if args.slacks is not None and "slacks" not in defaults:
+        parser.error(f"--slacks does not apply to the {args.detector} detector")
+    return args
+
+
+def main() -> None:
+    args = parse_args()
+    frame = read_frame(Path(args.input_path))
+    raw_index = np.flatnonzero(~frame.missing)
+    leaks = leak_windows(json.loads(Path(args.injections_path).read_text()))
+    flows = frame.channels["flow"][raw_index]
+    results: Sequence[SweepResult | CusumSweepResult]
+    if args.detector == "cusum":
+        results = sweep_cusum(
+            flows,
+            leaks,
+            alphas=args.alphas,
+            slacks=args.slacks,
+            thresholds=args.thresholds,
+            persistences=args.persistence,
+            raw_index=raw_index,
+        )
+    else:
+        results = sweep_parameters(
+            flows,
+            leaks,
+            alphas=args.alphas,
+            drop_thresholds=args.thresholds,
+            persistences=args.persistence,
+            raw_index=raw_index,
+        )
+    write_csv(Path(args.output_path), results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,385 @@
+"""Watch mode: keep labels, alerts and the report current as telemetry grows.
+
+One long-running process replaces re-running ``label_quality``,
+``detect_leaks`` and ``report`` on a schedule. For each watched CSV it keeps
+the byte offset already read plus the labeler and detector state, so a pass
+parses only the rows appended since the previous one. After every pass that
+read rows, outputs whose contents changed are rewritten (atomically) to match
+what the batch scripts would produce for the file as it stands, and that state
+is checkpointed so a restarted watcher resumes where it stopped instead of
+re-reading every file from the start.
+
+Inputs are files or directories; directories are rescanned every pass, so
+CSVs that appear later are picked up.
+"""
+
+from __future__ import annotations
+
+import argparse
+import copy
+import json
+import os
+import signal
+import threading
+import time
+from dataclasses import asdict, dataclass, replace
+from pathlib import Path
+from types import FrameType
+from typing import Any, Callable, Sequence
+
+from telemetry_lab.backend import label_quality
+from telemetry_lab.backend.detect_leaks import LeakDetector
+from telemetry_lab.backend.frame import (
+    FIELDNAMES,
+    AppendCursor,
+    TelemetryFrame,
+    read_appended,
+)
+from telemetry_lab.backend.label_quality import (
+    LabelEvent,
+    QualityLabel,
+    QualityLabeler,
+    closed_labels,
+)
+from telemetry_lab.backend.metrics import STAGE_METRICS_FILE, record_stage
+from telemetry_lab.backend.report import build_report, write_report
+
+POLL_INTERVAL = 5.0
+# Checkpoints live in this hidden directory beside the outputs.
+STATE_DIR = ".watch"
+
+
+@dataclass
+class WatchTargets:
+    input_path: Path
+    labels_path: Path
+    alerts_path: Path
+    report_path: Path
+    state_path: Path | None = None
+
+    @classmethod
+    def in_directory(cls, input_path: Path, out_dir: Path) -> WatchTargets:
+        """Outputs named after the input (``<stem>.labels.json`` and so on) in ``out_dir``."""
+        stem = input_path.stem
+        return cls(
+            input_path=input_path,
+            labels_path=out_dir / f"{stem}.labels.json",
+            alerts_path=out_dir / f"{stem}.alerts.json",
+            report_path=out_dir / f"{stem}.report.json",
+            state_path=out_dir / STATE_DIR / f"{stem}.json",
+        )
+
+
+def _replace(path: Path, write: Callable[[Path], object]) -> None:
+    """Write to a sibling file and rename it over ``path`` so readers never see half a file."""
+    scratch = path.with_name(f".{path.name}.tmp")
+    write(scratch)
+    os.replace(scratch, path)
+
+
+def _write_payload(path: Path, payload: list[dict[str, Any]]) -> None:
+    """``detect_leaks.write_json`` for alerts already converted to dicts."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(payload, indent=2))
+
+
+def _is_telemetry(path: Path) -> bool:
+    """Whether ``path`` starts with a complete telemetry CSV header."""
+    try:
+        with path.open("rb") as handle:
+            header = handle.readline()
+    except OSError:
+        return False
+    if not header.endswith(b"\n"):
+        return False
+    return set(FIELDNAMES) <= set(header.decode("utf-8", "replace").strip().split(","))
+
+
+class TelemetryWatch:
+    """Incremental label/detect/report state for one growing telemetry CSV.
+
+    If the file is replaced, truncated or rewritten in place (see
+    ``AppendCursor``), the state is reset and the file is read again from the
+    start. With ``targets.state_path`` set, the cursor, labeler, detector and
+    closed events are saved after every pass that wrote outputs and restored
+    on construction; a checkpoint that is unreadable or was taken with another
+    ``persistence`` is ignored.
+    """
+
+    def __init__(self, targets: WatchTargets, *, persistence: int = 6) -> None:
+        self.targets = targets
+        self.persistence = persistence
+        self._reset()
+        self._restore()
+
+    def _reset(self) -> None:
+        self.cursor = AppendCursor()
+        self._labeler = QualityLabeler()
+        self._detector = LeakDetector(persistence=self.persistence)
+        self._label_events: list[LabelEvent] = []
+        # Closed alerts only ever append, so each is converted to a dict once.
+        self._alerts: list[dict[str, Any]] = []
+        self._last_timestamp = 0
+        self._written: tuple[Any, ...] | None = None
+
+    def poll(self) -> int:
+        """Process rows appended since the last poll; returns how many were read."""
+        path = self.targets.input_path
+        try:
+            fresh = self.cursor.inode is None
+            rewritten = fresh or self.cursor.replaced(path)
+            if rewritten:
+                self._reset()
+                self.cursor.advance(path, 0)
+            rows = 0
+            while True:
+                frame, offset = read_appended(path, self.cursor.offset)
+                if offset == self.cursor.offset:
+                    break
+                self.cursor.advance(path, offset)
+                rows += len(frame)
+                self._process(frame)
+        except FileNotFoundError:
+            return 0
+        if rows or rewritten:
+            self._write()
+            self._save()
+        return rows
+
+    def _process(self, frame: TelemetryFrame) -> None:
+        events = self._labeler.push_frame(frame)
+        self._label_events += [event for event in events if event.event == "close"]
+        alert_events = self._detector.update_batch(
+            frame.channels["flow"], frame.timestamps, frame.missing
+        )
+        self._alerts += [
+            asdict(event.timed_alert()) for event in alert_events if event.event == "close"
+        ]
+        if len(frame):
+            self._last_timestamp = int(frame.timestamps[-1])
+
+    def _write(self) -> None:
+        """Rewrite the outputs whose contents changed since the last write."""
+        # Segments still open are closed on copies, as a batch run closes them at end of input.
+        pending_labels = copy.deepcopy(self._labeler).finish()
+        pending_alerts = replace(self._detector).finish(self._last_timestamp)
+        label_state = (len(self._label_events), [event.label for event in pending_labels])
+        alert_state = (len(self._alerts), [event.timed_alert() for event in pending_alerts])
+        written = self._written or (None, None)
+        if (label_state, alert_state) == written:
+            return
+        labels = closed_labels(self._label_events + pending_labels)
+        alerts = self._alerts + [asdict(alert) for alert in alert_state[1]]
+        if label_state != written[0]:
+            _replace(self.targets.labels_path, lambda path: label_quality.write_json(path, labels))
+        if alert_state != written[1]:
+            _replace(self.targets.alerts_path, lambda path: _write_payload(path, alerts))
+        report = build_report(alerts, [asdict(label) for label in labels])
+        _replace(self.targets.report_path, lambda path: write_report(path, report))
+        self._written = (label_state, alert_state)
+
+    def _save(self) -> None:
+        """Checkpoint the state; written after the outputs, so a crash in between only re-reads."""
+        if self.targets.state_path is None:
+            return
+        state = {
+            "cursor": self.cursor.to_dict(),
+            "labeler": json.loads(self._labeler.to_json()),
+            "detector": json.loads(self._detector.to_json()),
+            "label_events": [asdict(event) for event in self._label_events],
+            "alerts": self._alerts,
+            "last_timestamp": self._last_timestamp,
+        }
+        self.targets.state_path.parent.mkdir(parents=True, exist_ok=True)
+        _replace(self.targets.state_path, lambda path: path.write_text(json.dumps(state)))
+
+    def _restore(self) -> None:
+        if self.targets.state_path is None:
+            return
+        try:
+            state = json.loads(self.targets.state_path.read_text())
+            detector = LeakDetector.from_json(json.dumps(state["detector"]))
+            if detector.persistence != self.persistence:
+                return
+            labeler = QualityLabeler.from_json(json.dumps(state["labeler"]))
+            cursor = AppendCursor.from_dict(state["cursor"])
+            label_events = [
+                LabelEvent(event["event"], event["channel"], QualityLabel(**event["label"]))
+                for event in state["label_events"]
+            ]
+        except (OSError, ValueError, KeyError, TypeError):
+            return
+        self.cursor, self._labeler, self._detector = cursor, labeler, detector
+        self._label_events = label_events
+        self._alerts = list(state["alerts"])
+        self._last_timestamp = int(state["last_timestamp"])
+
+
+class WatchPool:
+    """The watched files: fixed ones plus every telemetry CSV in ``directories``.
+
+    Directories are rescanned on each ``scan``; files matching ``pattern`` are
+    picked up once they have a telemetry header (hidden files and other CSVs
+    are skipped). Their outputs go to ``out_dir``, or beside them when unset.
+    """
+
+    def __init__(
+        self,
+        watches: Sequence[TelemetryWatch] = (),
+        directories: Sequence[Path] = (),
+        *,
+        out_dir: Path | None = None,
+        pattern: str = "*.csv",
+        persistence: int = 6,
+    ) -> None:
+        self._watches = {item.targets.input_path: item for item in watches}
+        self.directories = list(directories)
+        self.out_dir = out_dir
+        self.pattern = pattern
+        self.persistence = persistence
+
+    def scan(self) -> list[TelemetryWatch]:
+        for directory in self.directories:
+            for path in sorted(directory.glob(self.pattern)):
+                if path in self._watches or path.name.startswith("."):
+                    continue
+                if not _is_telemetry(path):
+                    continue
+                targets = WatchTargets.in_directory(path, self.out_dir or directory)
+                self._watches[path] = TelemetryWatch(targets, persistence=self.persistence)
+        return list(self._watches.values())
+
+
+def watch(
+    pool: WatchPool,
+    *,
+    interval: float = POLL_INTERVAL,
+    stop: threading.Event | None = None,
+) -> None:
+    """Poll every watched file each ``interval`` seconds until ``stop`` is set."""
+    stop = stop or threading.Event()
+    while True:
+        for item in pool.scan():
+            started = time.perf_counter()
+            rows = item.poll()
+            if rows:
+                metrics_path = item.targets.labels_path.parent / STAGE_METRICS_FILE
+                record_stage(metrics_path, "watch", time.perf_counter() - started, rows)
+        if stop.wait(interval):
+            return
+
+
+def parse_args() -> argparse.Namespace:
+    data_dir = Path(__file__).resolve().parents[1] / "data"
+    parser = argparse.ArgumentParser(
+        description="Keep labels, alerts and the report current as telemetry CSVs grow."
+    )
+    parser.add_argument(
+        "--in",
+        dest="input_paths",
+        action="append",
+        help="Telemetry CSV, or directory of them, to watch; repeat for several "
+        "(default: data/sample.csv).",
+    )
+    parser.add_argument(
+        "--pattern", default="*.csv", help="Files to watch inside directory inputs."
+    )
+    parser.add_argument(
+        "--out-dir",
+        dest="output_dir",
+        default=None,
+        help="Write <stem>.labels.json, <stem>.alerts.json and <stem>.report.json for "
+        "each input here (default: beside the input).",
+    )
+    parser.add_argument(
+        "--labels-out",
+        dest="labels_path",
+        default=None,
+        help="Output JSON file for quality labels (single input file only).",
+    )
+    parser.add_argument(
+        "--alerts-out",
+        dest="alerts_path",
+        default=None,
+        help="Output JSON file for alerts (single input file only).",
+    )
+    parser.add_argument(
+        "--report-out",
+        dest="report_path",
+        default=None,
+        help="Output JSON file for the report (single input file only).",
+    )
+    parser.add_argument(
+        "--persistence",
+        type=int,
+        default=6,
+        help="Number of consecutive points required to trigger an alert.",
+    )
+    parser.add_argument(
+        "--interval", type=float, default=POLL_INTERVAL, help="Seconds between passes."
+    )
+    parser.add_argument("--once", action="store_true", help="Run a single pass and exit.")
+    args = parser.parse_args()
+    args.input_paths = [Path(path) for path in args.input_paths or [data_dir / "sample.csv"]]
+    args.single = (
+        len(args.input_paths) == 1 and not args.input_paths[0].is_dir() and args.output_dir is None
+    )
+    named = (args.labels_path, args.alerts_path, args.report_path)
+    if not args.single and any(path is not None for path in named):
+        parser.error(
+            "--labels-out, --alerts-out and --report-out need one input file and no --out-dir"
+        )
+    if args.single:
+        # One file keeps the batch scripts' output names.
+        args.labels_path = Path(args.labels_path or data_dir / "labels.json")
+        args.alerts_path = Path(args.alerts_path or data_dir / "alerts.json")
+        args.report_path = Path(args.report_path or data_dir / "report.json")
+    return args
+
+
+def build_pool(args: argparse.Namespace) -> WatchPool:
+    out_dir = None if args.output_dir is None else Path(args.output_dir)
+    if args.single:
+        input_path = args.input_paths[0]
+        targets = WatchTargets(
+            input_path=input_path,
+            labels_path=args.labels_path,
+            alerts_path=args.alerts_path,
+            report_path=args.report_path,
+            state_path=args.labels_path.parent / STATE_DIR / f"{input_path.stem}.json",
+        )
+        return WatchPool([TelemetryWatch(targets, persistence=args.persistence)])
+    files = [path for path in args.input_paths if not path.is_dir()]
+    watches = [
+        TelemetryWatch(
+            WatchTargets.in_directory(path, out_dir or path.parent),
+            persistence=args.persistence,
+        )
+        for path in files
+    ]
+    return WatchPool(
+        watches,
+        [path for path in args.input_paths if path.is_dir()],
+        out_dir=out_dir,
+        pattern=args.pattern,
+        persistence=args.persistence,
+    )
+
+
+def main() -> None:
+    args = parse_args()
+    pool = build_pool(args)
+    stop = threading.Event()
+    if args.once:
+        stop.set()
+
+    def handle_signal(signum: int, frame: FrameType | None) -> None:
+        stop.set()
+
+    signal.signal(signal.SIGTERM, handle_signal)
+    signal.signal(signal.SIGINT, handle_signal)
+    watch(pool, interval=args.interval, stop=stop)
+
+
+if __name__ == "__main__":
+    main()
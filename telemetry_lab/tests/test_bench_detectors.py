@@ -0,0 +1,14 @@
+import numpy as np
+
+from telemetry_lab.backend.bench_detectors import benchmark
+from telemetry_lab.backend.detect_leaks import DETECTORS
+
+
+def test_benchmark_reports_every_registered_detector() -> None:
+    flows = 100.0 + np.random.default_rng(0).uniform(-0.5, 0.5, size=(3, 1000))
+    results = benchmark(flows, np.arange(1000) * 60, chunk_rows=128)
+
+    assert [result.detector for result in results] == sorted(DETECTORS)
+    assert all(result.rows == 1000 and result.series == 3 for result in results)
+    assert all(result.streaming_rows_per_second > 0 for result in results)
+    assert all(result.batch_rows_per_second > 0 for result in results)
@@ -0,0 +1,83 @@
+from pathlib import Path
+
+import numpy as np
+
+from telemetry_lab.backend.frame import (
+    TelemetryFrame,
+    concat_frames,
+    convert,
+    downsample,
+    iter_frames,
+    load_column,
+    read_frame,
+    time_window,
+    write_frame,
+)
+
+
+def test_frame_parses_columns_and_missing_mask() -> None:
+    rows = [
+        {"timestamp": "2024-01-01T00:00:00", "flow": "100", "pressure": "50", "temperature": "20"},
+        {"timestamp": "2024-01-01T00:01:00", "flow": "nan", "pressure": "50", "temperature": "20"},
+        {"timestamp": "2024-01-01T00:02:00+00:00", "flow": "1", "pressure": "", "temperature": "2"},
+    ]
+    frame = TelemetryFrame.from_rows(rows)
+
+    assert frame.timestamps.dtype == np.int64
+    assert frame.timestamps.tolist() == [1704067200, 1704067260, 1704067320]
+    assert frame.channels["flow"].dtype == np.float64
+    assert frame.missing.tolist() == [False, True, True]
+
+
+def test_frame_csv_round_trip(tmp_path: Path) -> None:
+    source = Path(__file__).resolve().parents[1] / "data" / "cleaned.csv"
+    output_path = tmp_path / "cleaned.csv"
+
+    write_frame(output_path, read_frame(source))
+
+    assert output_path.read_text() == source.read_text()
+
+
+def test_iter_frames_yields_fixed_size_typed_chunks() -> None:
+    source = Path(__file__).resolve().parents[1] / "data" / "sample.csv"
+    chunks = list(iter_frames(source, chunk_rows=100))
+    whole = read_frame(source)
+
+    assert [len(chunk) for chunk in chunks] == [100, 100, 100, 60]
+    assert np.array_equal(concat_frames(chunks).timestamps, whole.timestamps)
+    assert np.array_equal(concat_frames(chunks).missing, whole.missing)
+
+
+def test_column_store_round_trip_is_memory_mapped(tmp_path: Path) -> None:
+    source = Path(__file__).resolve().parents[1] / "data" / "sample.csv"
+    store = tmp_path / "sample.cols"
+    output_path = tmp_path / "sample.csv"
+
+    convert(source, store, chunk_rows=7)
+    convert(store, output_path)
+
+    assert output_path.read_text() == source.read_text()
+    assert isinstance(load_column(store, "flow"), np.memmap)
+    chunks = list(iter_frames(store, chunk_rows=100))
+    assert [len(chunk) for chunk in chunks] == [100, 100, 100, 60]
+    assert not any(chunk.channels["flow"].flags.owndata for chunk in chunks)
+    assert np.array_equal(concat_frames(chunks).missing, read_frame(source).missing)
+    assert np.array_equal(read_frame(store).missing, read_frame(source).missing)
+
+
+def test_time_window_and_downsample_keep_extremes() -> None:
+    frame = read_frame(Path(__file__).resolve().parents[1] / "data" / "sample.csv")
+    start, end = int(frame.timestamps[100]), int(frame.timestamps[199])
+
+    window = time_window(frame, start, end)
+    assert window.timestamps[0] == start and window.timestamps[-1] == end
+    assert len(time_window(frame, None, start)) == 101
+
+    reduced = downsample(window, 30)
+    assert 0 < len(reduced) <= 30
+    assert np.all(np.diff(reduced.timestamps) > 0)
+    for name in ("flow", "pressure", "temperature"):
+        assert np.nanmax(reduced.channels[name]) == np.nanmax(window.channels[name])
+        assert np.nanmin(reduced.channels[name]) == np.nanmin(window.channels[name])
+    gappy = downsample(frame, 60)
+    assert gappy.missing.any()
@@ -2,10 +2,16 @@ from __future__ import annotations
 
 import csv
 import json
+import subprocess
+import sys
+from dataclasses import asdict
 from datetime import datetime
 from pathlib import Path
 
+import numpy as np
+
 from telemetry_lab.backend import generate_data
+from telemetry_lab.backend.frame import TelemetryFrame, concat_frames
 
 
 def test_generate_and_write_artifacts(tmp_path: Path) -> None:
@@ -24,3 +30,86 @@ def test_generate_and_write_artifacts(tmp_path: Path) -> None:
         rows = list(csv.DictReader(handle))
     assert len(rows) == 360
     assert json.loads(json_path.read_text())
+
+
+def test_generate_frames_is_chunk_independent_per_seed_and_tag() -> None:
+    start = datetime(2024, 1, 1)
+    whole = concat_frames(list(generate_data.generate_frames(start_time=start, samples=500)))
+    chunked = concat_frames(
+        list(generate_data.generate_frames(start_time=start, samples=500, chunk_rows=33))
+    )
+    other_tag = next(generate_data.generate_frames(start_time=start, samples=500, tag=1))
+
+    assert len(whole) == 500
+    assert np.array_equal(whole.timestamps, chunked.timestamps)
+    assert np.array_equal(whole.channels["flow"], chunked.channels["flow"])
+    assert not np.array_equal(whole.channels["flow"], other_tag.channels["flow"])
+    assert np.all(np.diff(whole.timestamps) == 60)
+    assert not whole.missing.any()
+
+
+def test_planned_injections_are_disjoint_chunk_independent_and_queryable() -> None:
+    start = datetime(2024, 1, 1)
+    plan = generate_data.plan_injections(start_time=start, samples=20_000, events=300, seed=7)
+    again = generate_data.plan_injections(start_time=start, samples=20_000, events=300, seed=7)
+
+    assert plan == again
+    assert all(a.end_index < b.start_index for a, b in zip(plan, plan[1:]))
+    assert {event.kind for event in plan} == set(generate_data.INJECTION_LENGTHS)
+
+    def injected(chunk_rows: int) -> TelemetryFrame:
+        frames = generate_data.generate_frames(
+            start_time=start, samples=20_000, seed=7, chunk_rows=chunk_rows
+        )
+        return concat_frames(
+            [
+                generate_data.apply_injections(frame, plan, offset)
+                for frame, offset in zip(frames, range(0, 20_000, chunk_rows))
+            ]
+        )
+
+    whole, chunked = injected(20_000), injected(97)
+    for name in ("flow", "pressure", "temperature"):
+        assert np.array_equal(whole.channels[name], chunked.channels[name], equal_nan=True)
+    missing = [event for event in plan if event.kind == "missing"]
+    assert whole.missing.sum() == sum(e.end_index - e.start_index + 1 for e in missing)
+
+    payload = [asdict(event) for event in plan]
+    hits = generate_data.query_injections(payload, "2024-01-02T00:00:00", "2024-01-03T00:00:00")
+    assert hits == [
+        event
+        for event in payload
+        if event["end_time"] >= "2024-01-02T00:00:00"
+        and event["start_time"] <= "2024-01-03T00:00:00"
+    ]
+    assert hits
+
+
+def test_cli_rejects_runs_the_injections_do_not_fit(tmp_path: Path) -> None:
+    def run(*options: str) -> subprocess.CompletedProcess[str]:
+        return subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "telemetry_lab.backend.generate_data",
+                "--out",
+                str(tmp_path / "sample.csv"),
+                "--injections-out",
+                str(tmp_path / "injections.json"),
+                *options,
+            ],
+            capture_output=True,
+            text=True,
+            cwd=Path(__file__).resolve().parents[2],
+        )
+
+    short = run("--minutes", "120")
+    assert short.returncode == 2
+    assert "--minutes must be at least 300 without --scale" in short.stderr
+    stalled = run("--scale", "--interval", "0")
+    assert stalled.returncode == 2
+    assert "--interval must be positive" in stalled.stderr
+    crowded = run("--scale", "--minutes", "60", "--events", "20")
+    assert crowded.returncode == 2
+    assert "20 injections do not fit in 60 samples" in crowded.stderr
+    assert not (tmp_path / "sample.csv").exists()
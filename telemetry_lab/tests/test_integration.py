@@ -1,6 +1,7 @@
 import csv
 import json
 import subprocess
+import sys
 from pathlib import Path
 
 import jsonschema
@@ -18,19 +19,22 @@ def test_detect_leaks_cli_output(tmp_path: Path) -> None:
         for idx in range(20, 30):
             writer.writerow([f"2024-01-01T00:{idx:02d}:00", "96", "48", "20"])
 
-    script_path = Path(__file__).resolve().parents[1] / "backend" / "detect_leaks.py"
     subprocess.run(
         [
-            "python",
-            str(script_path),
+            sys.executable,
+            "-m",
+            "telemetry_lab.backend.detect_leaks",
             "--in",
             str(input_path),
             "--out",
             str(output_path),
             "--persistence",
             "3",
+            "--chunk-rows",
+            "4",
         ],
         check=True,
+        cwd=Path(__file__).resolve().parents[2],
     )
 
     assert output_path.exists()
@@ -39,3 +43,5 @@ def test_detect_leaks_cli_output(tmp_path: Path) -> None:
     schema = json.loads(schema_path.read_text())
     jsonschema.validate(alerts, schema)
     assert alerts, "Expected CLI integration test to produce at least one alert"
+    stages = json.loads((tmp_path / "stage_metrics.json").read_text())
+    assert stages["detect_leaks"]["rows"] == 30
@@ -1,4 +1,19 @@
-from telemetry_lab.backend.detect_leaks import detect_leaks
+import numpy as np
+import pytest
+
+from telemetry_lab.backend.detect_leaks import (
+    CUSUM_REASON,
+    DETECTORS,
+    CusumDetector,
+    LeakDetector,
+    RunDetector,
+    cusum,
+    detect_leaks,
+    detect_leaks_batch,
+    ewma,
+    ewma_filter,
+    make_detector,
+)
 
 
 def test_leak_detector_triggers_on_known_leak() -> None:
@@ -15,3 +30,212 @@ def test_leak_detector_not_triggered_on_noise() -> None:
     flow_values = [100.0 + (i % 5) * 0.1 for i in range(60)]
     alerts = detect_leaks(flow_values, persistence=6)
     assert alerts == []
+
+
+def test_incremental_detector_resumes_from_checkpoint() -> None:
+    flow_values = [100.0] * 20 + [96.0] * 10 + [100.0] * 5 + [95.0] * 8
+    expected = detect_leaks(flow_values, persistence=6)
+
+    detector = LeakDetector(persistence=6)
+    events = []
+    for index, value in enumerate(flow_values[:24]):
+        events += detector.update(value, 60 * index)
+    blob = detector.to_json()
+    assert len(blob) < 256
+
+    resumed = LeakDetector.from_json(blob)
+    for index, value in enumerate(flow_values[24:], start=24):
+        events += resumed.update(value, 60 * index)
+    events += resumed.finish(60 * len(flow_values))
+
+    assert [event.alert for event in events if event.event == "close"] == expected
+    opened = [event for event in events if event.event == "open"]
+    assert [event.alert.start_index for event in opened] == [
+        alert.start_index for alert in expected
+    ]
+    assert opened[0].timestamp == 60 * (expected[0].start_index + 5)
+
+
+def test_batch_detection_matches_per_segment_detection() -> None:
+    rng = np.random.default_rng(7)
+    flows = 100.0 + rng.normal(0.0, 0.5, size=(5, 300))
+    flows[1, 100:140] -= 4.0
+    flows[3, 20:30] -= 6.0
+    flows[3, 250:290] -= 3.5
+
+    assert np.allclose(ewma_filter(flows[3]), ewma(flows[3].tolist()))
+
+    alerts = detect_leaks_batch(flows, persistence=6, segment_ids=list("abcde"))
+    expected = [
+        (segment_id, alert.start_index, alert.end_index, alert.confidence)
+        for segment_id, series in zip("abcde", flows, strict=True)
+        for alert in detect_leaks(series.tolist(), persistence=6)
+    ]
+    assert {alert.segment_id for alert in alerts} == {"b", "d"}
+    assert [
+        (alert.segment_id, alert.start_index, alert.end_index, alert.confidence) for alert in alerts
+    ] == expected
+
+
+def test_batched_updates_match_per_sample_updates() -> None:
+    flow_values = [100.0] * 20 + [96.0] * 10 + [100.0] * 5 + [95.0] * 8 + [100.0] * 3
+    timestamps = np.arange(len(flow_values)) * 60
+
+    single = LeakDetector(persistence=4)
+    expected = [
+        event
+        for value, ts in zip(flow_values, timestamps)
+        for event in single.update(value, int(ts))
+    ]
+
+    batched = LeakDetector(persistence=4)
+    events = []
+    for start in range(0, len(flow_values), 7):
+        events += batched.update_batch(
+            np.array(flow_values[start : start + 7]), timestamps[start : start + 7]
+        )
+
+    assert [(e.event, e.timestamp, e.alert) for e in events] == [
+        (e.event, e.timestamp, e.alert) for e in expected
+    ]
+    assert batched.run_length == single.run_length
+
+
+def test_detector_skips_gaps_and_reports_raw_indices() -> None:
+    flow_values = np.array([100.0] * 20 + [96.0] * 4 + [np.nan] * 5 + [96.0] * 4 + [100.0] * 5)
+    timestamps = np.arange(len(flow_values)) * 60
+    missing = np.isnan(flow_values)
+
+    detector = LeakDetector(persistence=6)
+    events = detector.update_batch(np.nan_to_num(flow_values), timestamps, missing)
+    events += detector.finish(int(timestamps[-1]))
+    closed = [event for event in events if event.event == "close"]
+
+    present = detect_leaks(flow_values[~missing], persistence=6)
+    assert len(closed) == len(present) == 1
+    alert = closed[0].timed_alert()
+    assert (alert.start_index, alert.end_index) == (20, 32)
+    assert alert.confidence == present[0].confidence
+    assert (alert.start_time, alert.end_time) == ("1970-01-01T00:20:00", "1970-01-01T00:32:00")
+    assert detect_leaks(flow_values, persistence=6) == [closed[0].alert]
+
+    single = LeakDetector(persistence=6)
+    expected = [
+        event
+        for value, ts, gap in zip(flow_values.tolist(), timestamps.tolist(), missing.tolist())
+        for event in single.update(value, ts, gap)
+    ]
+    assert [e.alert for e in expected if e.event == "open"] == [
+        e.alert for e in events if e.event == "open"
+    ]
+
+
+def step_detector() -> CusumDetector:
+    """CUSUM sensitive enough for the 3-unit steps on level flow used below."""
+    return CusumDetector(alpha=0.05, slack=0.5, threshold=5.0)
+
+
+def test_cusum_detector_streams_like_its_batch_form() -> None:
+    rng = np.random.default_rng(3)
+    increments = rng.normal(-0.2, 1.0, size=(3, 5000))
+    expected = np.empty_like(increments)
+    sums = np.array([1.0, 0.0, 4.0])
+    for step in range(increments.shape[1]):
+        sums = np.maximum(0.0, sums + increments[:, step])
+        expected[:, step] = sums
+    assert np.allclose(cusum(increments, np.array([1.0, 0.0, 4.0])), expected)
+
+    flows = 100.0 + rng.uniform(-0.5, 0.5, size=(2, 600))
+    flows[0, 200:260] -= 3.0
+    flows[1, 300:500] -= np.minimum(np.arange(200) * 0.05, 3.0)
+    timestamps = np.arange(flows.shape[1]) * 60
+
+    assert detect_leaks(flows[0], persistence=6) == []
+    assert sorted(DETECTORS) == ["cusum", "ewma"]
+    assert make_detector("cusum", 2, alpha=None, slack=0.5, threshold=5.0) == CusumDetector(
+        persistence=2, slack=0.5, threshold=5.0
+    )
+
+    alerts = step_detector().detect_batch(flows, segment_ids=["step", "ramp"])
+    assert {alert.segment_id for alert in alerts} == {"step", "ramp"}
+    assert alerts[0].start_index in range(200, 205)
+
+    for row, segment_id in enumerate(["step", "ramp"]):
+        single = step_detector()
+        expected_events = [
+            event
+            for value, ts in zip(flows[row].tolist(), timestamps.tolist())
+            for event in single.update(value, ts)
+        ]
+        batched = step_detector()
+        events = []
+        for start in range(0, flows.shape[1], 64):
+            events += batched.update_batch(
+                flows[row, start : start + 64], timestamps[start : start + 64]
+            )
+        assert [(e.event, e.timestamp, e.alert) for e in events] == [
+            (e.event, e.timestamp, e.alert) for e in expected_events
+        ]
+        resumed = CusumDetector.from_json(batched.to_json())
+        closed = [e.alert for e in events + resumed.finish(0) if e.event == "close"]
+        assert [(a.start_index, a.end_index) for a in closed] == [
+            (a.start_index, a.end_index) for a in alerts if a.segment_id == segment_id
+        ]
+
+
+def test_cusum_alerts_only_on_drops_and_reports_surges_separately() -> None:
+    flows = np.full((2, 130), 100.0)
+    flows[0, 100:] += 3.0
+    flows[1, 100:] -= 3.0
+    timestamps = np.arange(flows.shape[1]) * 60
+
+    rising, falling = step_detector(), step_detector()
+    assert rising.update_batch(flows[0], timestamps) == []
+    assert rising.surging
+    assert [event.event for event in falling.update_batch(flows[1], timestamps)] == ["open"]
+    assert not falling.surging
+
+    alerts = step_detector().detect_batch(flows)
+    assert [alert.segment_id for alert in alerts] == ["1"]
+    assert alerts[0].start_index in range(100, 105)
+    assert alerts[0].reason == CUSUM_REASON
+
+
+def test_detectors_must_implement_the_flag_hooks() -> None:
+    class Incomplete(RunDetector):
+        def _flag(self, value: float) -> bool:
+            return False
+
+    with pytest.raises(TypeError, match="_flags"):
+        Incomplete()  # type: ignore[abstract]
+
+
+def test_batches_cut_anywhere_match_per_sample_updates() -> None:
+    rng = np.random.default_rng(11)
+    repro = np.array([100.0] * 20 + [90, 90, 100, 100, 90, 90, 100] + [100] * 5)
+    cases = [(repro, 3, [0, 21, 24, len(repro)])]
+    for _ in range(1000):
+        flows = np.r_[[100.0] * 20, np.where(rng.random(40) < 0.5, 90.0, 100.0)]
+        flows[20:][rng.random(40) < 0.1] = np.nan
+        cuts = sorted(rng.choice(np.arange(21, 60), size=8, replace=False))
+        cases.append((flows, int(rng.integers(2, 6)), [0, *cuts, 60]))
+
+    for flows, persistence, cuts in cases:
+        timestamps = np.arange(len(flows)) * 60
+
+        single = LeakDetector(persistence=persistence)
+        expected = [
+            event
+            for value, ts in zip(flows.tolist(), timestamps.tolist())
+            for event in single.update(value, ts)
+        ]
+        expected += single.finish(0)
+        batched = LeakDetector(persistence=persistence)
+        events = []
+        for start, stop in zip(cuts, cuts[1:]):
+            events += batched.update_batch(flows[start:stop], timestamps[start:stop])
+        events += batched.finish(0)
+
+        assert [(e.event, e.timestamp, e.alert) for e in events] == [
+            (e.event, e.timestamp, e.alert) for e in expected
+        ]
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import time
+from pathlib import Path
+
+import pytest
+
+from telemetry_lab.backend.frame import read_frame
+from telemetry_lab.backend.label_quality import label_quality
+from telemetry_lab.backend.live import LiveFeed
+
+SAMPLE = Path(__file__).resolve().parents[1] / "data" / "sample.csv"
+
+
+def test_live_feed_publishes_appended_rows_and_events(tmp_path: Path) -> None:
+    lines = SAMPLE.read_text().splitlines(keepends=True)
+    path = tmp_path / "sample.csv"
+    path.write_text(lines[0])
+    feed = LiveFeed(path)
+    assert feed.poll() == []
+
+    messages = []
+    for start in range(1, len(lines), 45):
+        with path.open("a") as handle:
+            handle.write("".join(lines[start : start + 45]))
+            handle.write("2024-01-01T09:00:00,1")  # a partial row stays unread
+        messages += feed.poll()
+        path.write_text("".join(lines[: start + 45]))  # the writer finishes the row later
+
+    rows = [m.data for m in messages if m.event == "telemetry"]
+    assert sum(len(batch["timestamp"]) for batch in rows) == len(lines) - 1
+    assert rows[1]["flow"][60 - 45] is None
+
+    closed = [
+        m.data["label"] for m in messages if m.event == "label" and m.data["event"] == "close"
+    ]
+    batch = [label.__dict__ for label in label_quality(read_frame(SAMPLE))]
+    assert closed and all(label in batch for label in closed)
+    alerts = [m.data for m in messages if m.event == "alert"]
+    assert alerts[0]["event"] == "open"
+    assert alerts[0]["timestamp"].startswith("2024-01-01T")
+    assert [m.id for m in messages] == list(range(1, len(messages) + 1))
+
+
+def test_slow_subscribers_are_dropped_and_rewrites_reset(tmp_path: Path) -> None:
+    lines = SAMPLE.read_text().splitlines(keepends=True)
+    path = tmp_path / "sample.csv"
+    path.write_text("".join(lines[:50]))
+    feed = LiveFeed(path, poll_interval=60.0, queue_size=1)
+    slow = feed.subscribe()
+    assert feed.poll() == []
+
+    with path.open("a") as handle:
+        handle.write("".join(lines[50:80]))
+    assert len(feed.poll()) > 1
+    assert slow.dropped
+    assert slow.get(timeout=0.01) is not None
+
+    fresh = feed.subscribe()
+    path.write_text("".join(lines[:10]))
+    assert [message.event for message in feed.poll()] == ["reset"]
+    assert fresh.get(timeout=0.01) is not None
+    feed.unsubscribe(fresh)
+
+
+def test_rewrites_in_place_reset_even_when_the_file_grows(tmp_path: Path) -> None:
+    lines = SAMPLE.read_text().splitlines(keepends=True)
+    path = tmp_path / "sample.csv"
+    path.write_text("".join(lines[:50]))
+    feed = LiveFeed(path, poll_interval=60.0)
+    subscription = feed.subscribe()
+
+    shifted = [line.replace("2024-01-01", "2024-02-01") for line in lines[1:81]]
+    with path.open("r+") as handle:  # same inode, new contents, larger than before
+        handle.write(lines[0] + "".join(shifted))
+    assert [message.event for message in feed.poll()] == ["reset"]
+    with path.open("a") as handle:
+        handle.write(lines[81])
+    telemetry = [m.data for m in feed.poll() if m.event == "telemetry"]
+    assert telemetry[0]["timestamp"] == [lines[81].split(",")[0]]
+    feed.unsubscribe(subscription)
+
+
+def test_poller_survives_errors(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    path = tmp_path / "sample.csv"
+    path.write_text(SAMPLE.read_text())
+    feed = LiveFeed(path, poll_interval=0.01)
+    subscription = feed.subscribe()
+    calls = []
+
+    def failing_poll() -> list:
+        calls.append(1)
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(feed, "poll", failing_poll)
+    deadline = time.monotonic() + 5
+    while len(calls) < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(calls) >= 3
+    assert feed._thread is not None and feed._thread.is_alive()
+    message = subscription.get(timeout=1)
+    assert message is not None and message.event == "reset"
+    feed.unsubscribe(subscription)
@@ -0,0 +1,51 @@
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from telemetry_lab.backend.metrics import (
+    STAGE_METRICS_FILE,
+    ServerMetrics,
+    read_stage_metrics,
+    record_stage,
+)
+
+
+def test_server_metrics_merge_per_thread_shards() -> None:
+    metrics = ServerMetrics()
+
+    def record() -> None:
+        for _ in range(100):
+            metrics.observe_request("/health", 200, 0.002, 300)
+            metrics.count_cache("response", hit=True)
+        metrics.count_cache("response", hit=False)
+
+    threads = [threading.Thread(target=record) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    lines = metrics.render().splitlines()
+    assert 'telemetry_http_requests_total{route="/health",status="200"} 400' in lines
+    prefix = "telemetry_http_request_duration_seconds_bucket"
+    assert f'{prefix}{{route="/health",le="0.001"}} 0' in lines
+    assert f'{prefix}{{route="/health",le="0.0025"}} 400' in lines
+    assert f'{prefix}{{route="/health",le="+Inf"}} 400' in lines
+    assert 'telemetry_http_response_size_bytes_count{route="/health"} 400' in lines
+    assert 'telemetry_cache_lookups_total{cache="response",result="miss"} 4' in lines
+    assert 'telemetry_cache_hit_ratio{cache="response"} 0.9900990099009901' in lines
+
+
+def _record_stages(path: Path, worker: int) -> None:
+    for repeat in range(20):
+        record_stage(path, f"stage_{worker}", 1.0, repeat)
+
+
+def test_record_stage_keeps_rows_from_concurrent_processes(tmp_path: Path) -> None:
+    path = tmp_path / STAGE_METRICS_FILE
+    with ProcessPoolExecutor(4) as pool:
+        list(pool.map(_record_stages, [path] * 8, range(8)))
+
+    runs = read_stage_metrics(path)
+    assert sorted(runs) == [f"stage_{worker}" for worker in range(8)]
+    assert {run.rows for run in runs.values()} == {19}
@@ -0,0 +1,102 @@
+import json
+import subprocess
+import sys
+from dataclasses import asdict
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from telemetry_lab.backend.detect_leaks import CUSUM_REASON, TimedLeakAlert
+from telemetry_lab.backend.frame import iter_frames, read_frame
+from telemetry_lab.backend.pipeline import generate_demo, run_pipeline
+from telemetry_lab.backend.tune_leaks import leak_windows
+
+DATA_DIR = Path(__file__).resolve().parents[1] / "data"
+
+
+def test_pipeline_matches_the_stage_artifacts() -> None:
+    demo, injections = generate_demo(start_time=datetime(2024, 1, 1), minutes=360)
+    sample = read_frame(DATA_DIR / "sample.csv")
+    assert np.array_equal(demo.timestamps, sample.timestamps)
+    assert np.array_equal(demo.channels["flow"], sample.channels["flow"], equal_nan=True)
+    assert [asdict(event) for event in injections] == json.loads(
+        (DATA_DIR / "injections.json").read_text()
+    )
+
+    result = run_pipeline(iter_frames(DATA_DIR / "sample.csv", chunk_rows=70), keep_frames=True)
+
+    cleaned = read_frame(DATA_DIR / "cleaned.csv")
+    assert result.cleaned is not None
+    assert np.array_equal(result.cleaned.timestamps, cleaned.timestamps)
+    assert [asdict(label) for label in result.labels] == json.loads(
+        (DATA_DIR / "labels.json").read_text()
+    )
+    assert [asdict(alert) for alert in result.alerts] == json.loads(
+        (DATA_DIR / "alerts.json").read_text()
+    )
+    assert result.report["summary"] == {
+        "alert_count": len(result.alerts),
+        "label_count": len(result.labels),
+    }
+
+
+def test_pipeline_runs_a_registered_detector() -> None:
+    result = run_pipeline(iter_frames(DATA_DIR / "sample.csv"), detector="cusum")
+    ewma = run_pipeline(iter_frames(DATA_DIR / "sample.csv"))
+
+    assert {alert.reason for alert in result.alerts} == {CUSUM_REASON}
+    leaks = leak_windows(json.loads((DATA_DIR / "injections.json").read_text()))
+    for start, end in leaks:
+        assert any(a.start_index <= end and a.end_index >= start for a in result.alerts)
+
+    def flagged(alerts: list[TimedLeakAlert]) -> int:
+        return sum(alert.end_index - alert.start_index + 1 for alert in alerts)
+
+    # The calibrated defaults hit the leak without flagging most of the sawtooth.
+    assert flagged(result.alerts) < 360 // 4
+    assert flagged(result.alerts) < flagged(ewma.alerts) // 2
+
+
+def test_detector_flags_must_match_the_detector() -> None:
+    run = subprocess.run(
+        [sys.executable, "-m", "telemetry_lab.backend.pipeline", "--slack", "2"],
+        capture_output=True,
+        text=True,
+        cwd=Path(__file__).resolve().parents[2],
+    )
+
+    assert run.returncode == 2
+    assert "--slack does not apply to the ewma detector" in run.stderr
+
+
+def test_pipeline_cli_streams_outputs_and_copies_csv_rows(tmp_path: Path) -> None:
+    subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "telemetry_lab.backend.pipeline",
+            "--in",
+            str(DATA_DIR / "sample.csv"),
+            "--chunk-rows",
+            "50",
+            "--sample-out",
+            str(tmp_path / "sample.csv"),
+            "--cleaned-out",
+            str(tmp_path / "cleaned.cols"),
+            "--labels-out",
+            str(tmp_path / "labels.json"),
+        ],
+        check=True,
+        capture_output=True,
+        cwd=Path(__file__).resolve().parents[2],
+    )
+
+    assert (tmp_path / "sample.csv").read_bytes() == (DATA_DIR / "sample.csv").read_bytes()
+    cleaned = read_frame(tmp_path / "cleaned.cols")
+    expected = read_frame(DATA_DIR / "cleaned.csv")
+    assert np.array_equal(cleaned.timestamps, expected.timestamps)
+    assert np.array_equal(cleaned.channels["flow"], expected.channels["flow"])
+    assert json.loads((tmp_path / "labels.json").read_text()) == json.loads(
+        (DATA_DIR / "labels.json").read_text()
+    )
@@ -1,10 +1,18 @@
 import math
 
+import numpy as np
 from hypothesis import given
 from hypothesis import strategies as st
 
 from telemetry_lab.backend.detect_leaks import detect_leaks
-from telemetry_lab.backend.label_quality import clean_rows, label_quality
+from telemetry_lab.backend.label_quality import (
+    _drift_starts,
+    _rolling_max,
+    _rolling_rise,
+    _window_rises,
+    clean_rows,
+    label_quality,
+)
 
 
 @given(
@@ -66,3 +74,46 @@ def test_detector_alert_indices_within_bounds(flow_values: list[float]) -> None:
     alerts = detect_leaks(flow_values, persistence=3)
     for alert in alerts:
         assert 0 <= alert.start_index <= alert.end_index < len(flow_values)
+
+
+@given(
+    st.lists(
+        st.floats(min_value=-1e3, max_value=1e3, allow_nan=False, allow_infinity=False),
+        min_size=1,
+        max_size=60,
+    ),
+    st.integers(min_value=1, max_value=12),
+)
+def test_rolling_kernels_match_brute_force(values: list[float], width: int) -> None:
+    array = np.array(values)
+    count = max(len(values) - width + 1, 0)
+    expected_max = [max(values[i : i + width]) for i in range(count)]
+    assert _rolling_max(array, width).tolist() == expected_max
+    if width > 1:
+        steps = np.arange(width)
+        expected_rise = [
+            np.polyfit(steps, array[i : i + width], 1)[0] * (width - 1) for i in range(count)
+        ]
+        assert np.allclose(_rolling_rise(array, width), expected_rise, atol=1e-6)
+
+
+@given(
+    st.lists(st.integers(min_value=-3, max_value=3), min_size=2, max_size=80),
+    st.integers(min_value=2, max_value=12),
+    st.integers(min_value=0, max_value=20),
+    st.floats(min_value=1e3, max_value=1e9),
+)
+def test_drift_verdicts_do_not_depend_on_the_batch_start(
+    steps: list[int], width: int, skip: int, level: float
+) -> None:
+    # Small integer steps on a large level put many windows exactly on the threshold.
+    values = level + np.cumsum(np.array(steps, dtype=np.float64)) * 0.1
+    missing = np.zeros(len(values), dtype=bool)
+    threshold = 0.1 * (width - 1)
+    starts = np.arange(max(len(values) - width + 1, 0))
+    # Windows holding a repeated value (a zero step) are never drift.
+    steady = np.array([np.all(np.diff(values[s : s + width]) != 0) for s in starts], dtype=bool)
+    expected = starts[(_window_rises(values, starts, width) > threshold) & steady]
+    assert _drift_starts(values, missing, width, threshold).tolist() == expected.tolist()
+    shifted = _drift_starts(values[skip:], missing[skip:], width, threshold) + skip
+    assert shifted.tolist() == expected[expected >= skip].tolist()
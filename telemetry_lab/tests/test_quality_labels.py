@@ -1,8 +1,25 @@
 import csv
 import json
+import subprocess
+import sys
+from datetime import datetime
 from pathlib import Path
 
-from telemetry_lab.backend.label_quality import label_quality
+import numpy as np
+import pytest
+
+from telemetry_lab.backend import generate_data
+from telemetry_lab.backend.frame import TelemetryFrame, read_frame, write_frame
+from telemetry_lab.backend.label_quality import (
+    QualityLabel,
+    QualityLabeler,
+    label_quality,
+    label_quality_parallel,
+)
+
+
+def _key(label: QualityLabel) -> tuple[int, int, str, str]:
+    return label.start_index, label.end_index, label.kind, label.reason
 
 
 def _load_csv(path: Path) -> list[dict[str, str]]:
@@ -20,3 +37,158 @@ def test_quality_labels_missing_flatline_spike_drift() -> None:
 
     expected = json.loads(expected_path.read_text())
     assert [label.__dict__ for label in labels] == expected
+
+
+def _synthetic_frame(count: int) -> TelemetryFrame:
+    steps = np.arange(count, dtype=np.float64)
+    channels = {
+        "flow": 100.0 + 0.5 * np.sin(steps),
+        "pressure": 50.0 + 0.2 * np.cos(steps),
+        "temperature": 20.0 + 0.01 * np.sin(steps / 3),
+    }
+    return TelemetryFrame.from_columns(np.arange(count) * 60, channels)
+
+
+def test_quality_labels_report_every_event_on_every_channel() -> None:
+    frame = _synthetic_frame(400)
+    frame.channels["flow"][20:30] = 101.0
+    frame.channels["flow"][200:212] = 99.0
+    frame.channels["temperature"][300:310] = 21.0
+    frame.channels["pressure"][50] += 25.0
+    frame.channels["flow"][150] -= 30.0
+    frame.channels["pressure"][250:270] += np.arange(20) * 1.5
+
+    labels = {
+        (label.kind, label.start_index, label.end_index, label.reason)
+        for label in label_quality(frame)
+    }
+
+    assert ("flatline", 20, 29, "Flow sensor flatline") in labels
+    assert ("flatline", 200, 211, "Flow sensor flatline") in labels
+    assert ("flatline", 300, 309, "Temperature sensor flatline") in labels
+    assert ("spike", 50, 51, "Pressure spike outlier") in labels
+    assert ("spike", 150, 151, "Flow spike outlier") in labels
+    assert any(kind == "drift" and reason.startswith("Pressure") for kind, _, _, reason in labels)
+
+
+def test_recovery_from_a_flatline_is_not_drift() -> None:
+    frame = _synthetic_frame(200)
+    frame.channels["flow"][60:75] = 40.0
+    frame.channels["flow"][120:140] += np.arange(20) * 5.0
+    frame.channels["flow"][140:] += 100.0
+
+    drift = [label for label in label_quality(frame) if label.kind == "drift"]
+
+    assert [(label.start_index, label.reason) for label in drift] == [(117, "Flow drift detected")]
+
+
+def test_streaming_labeler_matches_batch_labels() -> None:
+    data_dir = Path(__file__).resolve().parents[1] / "data"
+    frame = read_frame(data_dir / "sample.csv")
+    expected = label_quality(frame)
+
+    for batch_size in (1, 7, 50):
+        labeler = QualityLabeler()
+        events = []
+        for start in range(0, len(frame), batch_size):
+            events += labeler.push_frame(frame.take(slice(start, start + batch_size)))
+        events += labeler.finish()
+
+        closed = [event.label for event in events if event.event == "close"]
+        opened = [event.label.start_index for event in events if event.event == "open"]
+        assert sorted(closed, key=_key) == sorted(expected, key=_key)
+        assert sorted(opened) == sorted(label.start_index for label in expected)
+
+
+def test_streaming_labeler_emits_open_and_close_as_rows_arrive() -> None:
+    rows = _load_csv(Path(__file__).resolve().parents[1] / "data" / "golden" / "quality_input.csv")
+    labeler = QualityLabeler()
+    seen = {
+        (event.event, event.label.kind, event.label.start_index): index
+        for index, row in enumerate(rows)
+        for event in labeler.push(row)
+    }
+
+    # The eighth repeated flow value opens the flatline; the next change closes it.
+    assert seen[("open", "flatline", 10)] == 17
+    assert seen[("close", "flatline", 10)] == 18
+    assert seen[("open", "missing", 5)] == 5
+    assert seen[("close", "missing", 5)] == 7
+
+
+def test_labeler_checkpoints_resume_mid_segment() -> None:
+    frame = read_frame(Path(__file__).resolve().parents[1] / "data" / "sample.csv")
+    expected = sorted(label_quality(frame), key=_key)
+
+    # Splits inside the missing run, the flatline and the temperature drift.
+    for split in (65, 125, 230):
+        labeler = QualityLabeler()
+        events = labeler.push_frame(frame.take(slice(0, split)))
+        resumed = QualityLabeler.from_json(labeler.to_json())
+        events += resumed.push_frame(frame.take(slice(split, None))) + resumed.finish()
+        closed = [event.label for event in events if event.event == "close"]
+        assert sorted(closed, key=_key) == expected
+
+
+def test_parallel_labels_stitch_shards_exactly_like_a_serial_run(tmp_path: Path) -> None:
+    start = datetime(2024, 1, 1)
+    plan = generate_data.plan_injections(start_time=start, samples=20_000, events=300, seed=3)
+    frames = generate_data.generate_frames(start_time=start, samples=20_000, seed=3)
+    frame = generate_data.apply_injections(next(frames), plan, 0)
+    write_frame(tmp_path / "input.csv", frame)
+    write_frame(tmp_path / "input.cols", frame)
+    serial = label_quality(frame)
+    assert {label.kind for label in serial} == {"missing", "flatline", "spike", "drift"}
+
+    for source in ("input.csv", "input.cols"):
+        cleaned_path = tmp_path / f"cleaned-{source}"
+        labels = label_quality_parallel(
+            tmp_path / source, workers=2, shards=37, cleaned_path=cleaned_path
+        )
+        assert labels == serial
+        cleaned = read_frame(cleaned_path)
+        assert np.array_equal(cleaned.timestamps, frame.timestamps[~frame.missing])
+
+
+def test_cleaned_csv_keeps_rows_as_written(tmp_path: Path) -> None:
+    rows = [
+        ["temperature", "timestamp", "flow", "pressure"],
+        *[[f"20.{i}0", f"2024-01-01T0{i}:00:00+02:00", "1.10", "50.0"] for i in range(8)],
+    ]
+    rows[3][3] = ""
+    with (tmp_path / "input.csv").open("w", newline="") as handle:
+        csv.writer(handle).writerows(rows)
+    expected = [
+        {"timestamp": row[1], "flow": row[2], "pressure": row[3], "temperature": row[0]}
+        for row in rows[1:]
+        if row[3]
+    ]
+
+    subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "telemetry_lab.backend.label_quality",
+            "--in",
+            str(tmp_path / "input.csv"),
+            "--cleaned-out",
+            str(tmp_path / "cleaned.csv"),
+            "--labels-out",
+            str(tmp_path / "labels.json"),
+        ],
+        check=True,
+        cwd=Path(__file__).resolve().parents[2],
+    )
+    assert _load_csv(tmp_path / "cleaned.csv") == expected
+
+    label_quality_parallel(
+        tmp_path / "input.csv", workers=2, shards=3, cleaned_path=tmp_path / "parallel.csv"
+    )
+    assert _load_csv(tmp_path / "parallel.csv") == expected
+
+
+def test_sub_second_timestamps_are_rejected() -> None:
+    row = {"timestamp": "", "flow": "1", "pressure": "2", "temperature": "3"}
+    for stamp in ("2024-01-01T00:00:00.250+02:00", "2024-01-01T00:00:00.250"):
+        with pytest.raises(ValueError, match="sub-second"):
+            TelemetryFrame.from_rows([{**row, "timestamp": stamp}])
@@ -1,5 +1,6 @@
 import json
 import subprocess
+import sys
 from pathlib import Path
 
 import jsonschema
@@ -43,11 +44,11 @@ def test_report_cli_output_matches_schema(tmp_path: Path) -> None:
     alerts_path.write_text(json.dumps(alerts_payload))
     labels_path.write_text(json.dumps(labels_payload))
 
-    script_path = Path(__file__).resolve().parents[1] / "backend" / "report.py"
     subprocess.run(
         [
-            "python",
-            str(script_path),
+            sys.executable,
+            "-m",
+            "telemetry_lab.backend.report",
             "--alerts",
             str(alerts_path),
             "--labels",
@@ -56,6 +57,7 @@ def test_report_cli_output_matches_schema(tmp_path: Path) -> None:
             str(report_path),
         ],
         check=True,
+        cwd=Path(__file__).resolve().parents[2],
     )
 
     assert report_path.exists()
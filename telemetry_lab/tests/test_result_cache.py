@@ -0,0 +1,67 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from telemetry_lab.backend.result_cache import ResultCache
+
+DATA_DIR = Path(__file__).resolve().parents[1] / "data"
+
+
+def _label(tmp_path: Path, input_path: Path) -> None:
+    subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "telemetry_lab.backend.label_quality",
+            "--in",
+            str(input_path),
+            "--cleaned-out",
+            str(tmp_path / "cleaned.csv"),
+            "--labels-out",
+            str(tmp_path / "labels.json"),
+            "--cache-dir",
+            str(tmp_path / "cache"),
+        ],
+        check=True,
+        cwd=Path(__file__).resolve().parents[2],
+    )
+
+
+def test_label_quality_reuses_cached_outputs_for_unchanged_input(tmp_path: Path) -> None:
+    input_path = tmp_path / "sample.csv"
+    input_path.write_bytes((DATA_DIR / "sample.csv").read_bytes())
+
+    _label(tmp_path, input_path)
+    first_run = json.loads((tmp_path / "stage_metrics.json").read_text())
+    (tmp_path / "labels.json").unlink()
+    _label(tmp_path, input_path)
+
+    # The cache hit leaves the recorded run (and its throughput) alone.
+    assert json.loads((tmp_path / "stage_metrics.json").read_text()) == first_run
+    assert (tmp_path / "labels.json").read_text() == (DATA_DIR / "labels.json").read_text()
+    assert (tmp_path / "cleaned.csv").read_text() == (DATA_DIR / "cleaned.csv").read_text()
+
+    input_path.write_text("\n".join(input_path.read_text().splitlines()[:200]) + "\n")
+    _label(tmp_path, input_path)
+    assert json.loads((tmp_path / "stage_metrics.json").read_text())["label_quality"]["rows"] == 199
+    assert len(list((tmp_path / "cache").iterdir())) == 2
+
+
+def test_result_cache_evicts_least_recently_used_entries(tmp_path: Path) -> None:
+    cache = ResultCache(tmp_path / "cache", max_bytes=250)
+    output = tmp_path / "alerts.json"
+    for age, key in enumerate(("a", "b")):
+        output.write_text(key * 100)
+        cache.store(key, {"alerts.json": output})
+        os.utime(tmp_path / "cache" / key, (1000 + age, 1000 + age))
+    assert cache.restore("a", {"alerts.json": output})
+
+    output.write_text("c" * 100)
+    cache.store("c", {"alerts.json": output})
+
+    assert sorted(entry.name for entry in (tmp_path / "cache").iterdir()) == ["a", "c"]
+    assert not cache.restore("b", {"alerts.json": output})
+    assert cache.restore("a", {"alerts.json": output})
+    assert output.read_text() == "a" * 100
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from telemetry_lab.backend import frame, rollup
+from telemetry_lab.backend.frame import iter_frames, read_frame
+from telemetry_lab.backend.rollup import (
+    LEVELS,
+    RollupPyramid,
+    fold_csv,
+    read_pyramid,
+    write_pyramid,
+)
+
+SAMPLE = Path(__file__).resolve().parents[1] / "data" / "sample.csv"
+
+
+def test_incremental_updates_match_a_single_pass(tmp_path: Path) -> None:
+    whole = RollupPyramid()
+    whole.update(read_frame(SAMPLE))
+
+    incremental = RollupPyramid()
+    for index, chunk in enumerate(iter_frames(SAMPLE, chunk_rows=37)):
+        incremental.update(chunk)
+        if index % 3 == 0:
+            write_pyramid(tmp_path, incremental)
+            incremental = read_pyramid(tmp_path, tail=True)
+    incremental.update(read_frame(SAMPLE))  # already folded in, so skipped
+    write_pyramid(tmp_path, incremental)
+    incremental = read_pyramid(tmp_path)
+
+    for name in LEVELS:
+        expected, actual = whole.levels[name], incremental.levels[name]
+        assert np.array_equal(expected.buckets, actual.buckets)
+        assert np.array_equal(expected.rows, actual.rows)
+        for column, values in expected.columns.items():
+            assert np.allclose(values, actual.columns[column], equal_nan=True), (name, column)
+
+
+def test_csv_input_is_resumed_from_its_byte_offset(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    lines = SAMPLE.read_bytes().splitlines(keepends=True)
+    source = tmp_path / "sample.csv"
+    source.write_bytes(b"".join(lines[:200]))
+    pyramid = RollupPyramid()
+    fold_csv(pyramid, source)
+    write_pyramid(tmp_path / "rollups", pyramid)
+    assert pyramid.source is not None and pyramid.source.offset == source.stat().st_size
+
+    with source.open("ab") as handle:
+        handle.write(b"".join(lines[200:]))
+    offsets = []
+
+    def read_appended(path: Path, offset: int = 0) -> tuple[frame.TelemetryFrame, int]:
+        offsets.append(offset)
+        return frame.read_appended(path, offset)
+
+    monkeypatch.setattr(rollup, "read_appended", read_appended)
+    resumed = read_pyramid(tmp_path / "rollups", tail=True)
+    assert len(resumed.levels["1min"]) < 200
+    fold_csv(resumed, source)
+    write_pyramid(tmp_path / "rollups", resumed)
+    assert offsets[0] == len(b"".join(lines[:200]))
+
+    whole = RollupPyramid()
+    whole.update(read_frame(SAMPLE))
+    written = read_pyramid(tmp_path / "rollups")
+    for name in LEVELS:
+        assert np.array_equal(whole.levels[name].buckets, written.levels[name].buckets)
+        assert np.array_equal(whole.levels[name].rows, written.levels[name].rows)
+
+
+def test_append_run_reads_only_the_new_bytes(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    lines = SAMPLE.read_bytes().splitlines(keepends=True)
+    source, output = tmp_path / "sample.csv", tmp_path / "rollups"
+    source.write_bytes(b"".join(lines[:300]))
+    argv = ["rollup", "--in", str(source), "--out-dir", str(output)]
+    monkeypatch.setattr(sys, "argv", argv)
+    rollup.main()
+
+    appended = b"".join(lines[300:])
+    with source.open("ab") as handle:
+        handle.write(appended)
+    reads = []
+
+    def read_appended(path: Path, offset: int = 0) -> tuple[frame.TelemetryFrame, int]:
+        result = frame.read_appended(path, offset)
+        reads.append((offset, result[1]))
+        return result
+
+    monkeypatch.setattr(rollup, "read_appended", read_appended)
+    rollup.main()
+
+    old_size = source.stat().st_size - len(appended)
+    assert reads[0][0] == old_size
+    assert sum(end - start for start, end in reads) == len(appended)
+    state = json.loads((output / "state.json").read_text())
+    assert state["source"]["offset"] == source.stat().st_size
+
+    # The shipped rollups carry the same cursor, so appends to sample.csv resume too.
+    shipped = read_pyramid(SAMPLE.parent / "rollups")
+    assert shipped.source is not None and shipped.source.offset == SAMPLE.stat().st_size
+
+
+def test_levels_aggregate_min_max_mean_and_missing_fraction() -> None:
+    frame = read_frame(SAMPLE)
+    pyramid = RollupPyramid()
+    pyramid.update(frame)
+
+    assert [len(pyramid.levels[name]) for name in LEVELS] == [360, 36, 6, 1]
+    hour = pyramid.levels["1h"].to_payload()
+    flow = frame.channels["flow"][60:120]
+    assert hour["timestamp"][1] == "2024-01-01T01:00:00"
+    assert hour["flow"]["min"][1] == np.nanmin(flow)
+    assert hour["flow"]["max"][1] == np.nanmax(flow)
+    assert np.isclose(hour["flow"]["mean"][1], np.nanmean(flow))
+    assert hour["flow"]["count"][1] == 50
+    assert np.isclose(hour["flow"]["missing_fraction"][1], 10 / 60)
+    assert hour["temperature"]["missing_fraction"][1] == 0.0
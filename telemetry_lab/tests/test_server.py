@@ -1,15 +1,29 @@
 from __future__ import annotations
 
+import gzip
+import http.client
 import json
+import random
+import socket
 import threading
+import urllib.error
 import urllib.request
+from collections import OrderedDict
 from http.server import HTTPServer
 from pathlib import Path
+from typing import Any
+
+import pytest
 
 from telemetry_lab.backend import server
+from telemetry_lab.backend.frame import read_frame, write_frame
+from telemetry_lab.backend.metrics import STAGE_METRICS_FILE, ServerMetrics, record_stage
+from telemetry_lab.backend.rollup import RollupPyramid, write_pyramid
 
 
-def _start_server(tmp_path: Path) -> tuple[HTTPServer, threading.Thread]:
+def _start_server(
+    tmp_path: Path, server_class: type[HTTPServer] = HTTPServer, **options: Any
+) -> tuple[HTTPServer, threading.Thread]:
     (tmp_path / "sample.csv").write_text(
         "timestamp,flow,pressure,temperature\n2024-01-01T00:00:00,100,50,20\n"
     )
@@ -32,7 +46,7 @@ def _start_server(tmp_path: Path) -> tuple[HTTPServer, threading.Thread]:
         )
     )
     server.DATA_DIR = tmp_path
-    httpd = HTTPServer(("127.0.0.1", 0), server.TelemetryHandler)
+    httpd = server_class(("127.0.0.1", 0), server.TelemetryHandler, **options)
     thread = threading.Thread(target=httpd.serve_forever, daemon=True)
     thread.start()
     return httpd, thread
@@ -79,3 +93,436 @@ def test_server_health_and_alerts(tmp_path: Path) -> None:
     finally:
         httpd.shutdown()
         thread.join(timeout=1)
+
+
+def test_pooled_server_keeps_alive_and_is_not_blocked_by_slow_clients(tmp_path: Path) -> None:
+    httpd, thread = _start_server(tmp_path, server.PooledHTTPServer)
+    try:
+        stalled = socket.create_connection(("127.0.0.1", httpd.server_port))
+        stalled.sendall(b"GET /data/sample HTTP/1.1\r\n")  # never finishes its headers
+
+        connection = http.client.HTTPConnection("127.0.0.1", httpd.server_port, timeout=2)
+        for route in ("/health", "/data/alerts", "/health"):
+            connection.request("GET", route)
+            response = connection.getresponse()
+            assert response.status == 200
+            assert json.loads(response.read())
+        connection.close()
+        stalled.close()
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+        thread.join(timeout=1)
+    assert not thread.is_alive()
+
+
+def test_cached_responses_revalidate_and_track_file_changes(tmp_path: Path) -> None:
+    httpd, thread = _start_server(tmp_path)
+    try:
+        url = f"http://127.0.0.1:{httpd.server_port}/data/alerts"
+        with urllib.request.urlopen(url) as response:
+            etag = response.headers["ETag"]
+            last_modified = response.headers["Last-Modified"]
+            assert json.loads(response.read())[0]["confidence"] == 0.7
+
+        for header, value in (("If-None-Match", etag), ("If-Modified-Since", last_modified)):
+            request = urllib.request.Request(url, headers={header: value})
+            try:
+                urllib.request.urlopen(request)
+            except urllib.error.HTTPError as exc:
+                assert exc.code == 304
+                assert exc.headers["ETag"] == etag
+            else:
+                raise AssertionError(f"Expected 304 for {header}")
+
+        (tmp_path / "alerts.json").write_text(
+            json.dumps([{"start_index": 3, "end_index": 9, "confidence": 0.95, "reason": "New"}])
+        )
+        request = urllib.request.Request(url, headers={"If-None-Match": etag})
+        with urllib.request.urlopen(request) as response:
+            assert response.headers["ETag"] != etag
+            assert json.loads(response.read())[0]["confidence"] == 0.95
+    finally:
+        httpd.shutdown()
+        thread.join(timeout=1)
+
+
+def test_response_cache_is_bounded_by_bytes(tmp_path: Path) -> None:
+    cache = server.ResponseCache(max_bytes=8000)
+    source = tmp_path / "alerts.json"
+    source.write_text("[]")
+
+    for index in range(10):
+        entry = cache.get(f"/route/{index}", [source], lambda: (b"x" * 900, "text/plain"))
+        assert entry.body == b"x" * 900
+    assert cache.size <= 8000
+    assert len(cache._entries) == 8
+
+    entry = cache.get("/whole-file", [source], lambda: (b"x" * 1001, "text/plain"))
+    assert len(entry.body) == 1001
+    assert ("/whole-file", (source,)) not in cache._entries
+
+    # Gzip variants added after admission count too; random bytes do not shrink.
+    noise = random.Random(0).randbytes(900 * 8)
+    for index in range(8):
+        body = noise[index * 900 : (index + 1) * 900]
+
+        def build(body: bytes = body) -> tuple[bytes, str]:
+            return body, "text/plain"
+
+        entry = cache.get(f"/noise/{index}", [source], build)
+        assert gzip.decompress(cache.encoded(entry, "gzip")) == body
+        assert cache.size <= 8000
+    assert len(cache._entries) < 8
+
+
+def test_parsed_frames_keep_one_version_per_path_within_a_byte_budget(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(server, "_PARSED", OrderedDict())
+    header = "timestamp,flow,pressure,temperature\n"
+    paths = [tmp_path / f"{name}.csv" for name in ("a", "b", "c")]
+    for path in paths:
+        path.write_text(header + "".join(f"2024-01-01T00:{m:02d}:00,1,2,3\n" for m in range(50)))
+    frame_bytes = server._resident_bytes(server.load_frame(paths[0]))
+    monkeypatch.setattr(server, "PARSED_CACHE_BYTES", 2 * frame_bytes)
+
+    for path in paths:
+        server.load_frame(path)
+    assert list(server._PARSED) == paths[1:]
+
+    with paths[2].open("a") as handle:
+        handle.write("2024-01-01T00:50:00,1,2,3\n")
+    assert len(server.load_frame(paths[2])) == 51
+    assert list(server._PARSED) == [paths[2]]  # replaced in place; the larger version evicts b
+
+    monkeypatch.setattr(server, "PARSED_CACHE_BYTES", frame_bytes // 2)
+    assert len(server.load_frame(paths[0])) == 50
+    assert paths[0] not in server._PARSED
+
+    store = tmp_path / "a.cols"
+    write_frame(store, server.load_frame(paths[0]))
+    assert server._resident_bytes(server.load_frame(store)) == 50  # only the missing mask
+
+
+def test_gzip_is_negotiated_and_compressed_once_per_version(tmp_path: Path) -> None:
+    httpd, thread = _start_server(tmp_path)
+    rows = "".join(f"2024-01-01T00:{minute:02d}:00,100.25,50.5,20.125\n" for minute in range(60))
+    (tmp_path / "sample.csv").write_text("timestamp,flow,pressure,temperature\n" + rows)
+    try:
+        url = f"http://127.0.0.1:{httpd.server_port}/data/sample"
+        with urllib.request.urlopen(url) as response:
+            plain = response.read()
+            assert response.headers["Content-Encoding"] is None
+
+        bodies = []
+        for _ in range(2):
+            request = urllib.request.Request(url, headers={"Accept-Encoding": "br;q=1, gzip"})
+            with urllib.request.urlopen(request) as response:
+                assert response.headers["Content-Encoding"] == "gzip"
+                assert response.headers["Vary"] == "Accept-Encoding"
+                bodies.append(response.read())
+        assert bodies[0] == bodies[1]
+        assert gzip.decompress(bodies[0]) == plain
+        assert len(bodies[0]) < len(plain) / 3
+        (variant,) = tmp_path.glob(".sample.csv.*.gz")
+        assert variant.read_bytes() == bodies[0]
+
+        # A new version replaces the stored variant instead of adding one.
+        with (tmp_path / "sample.csv").open("a") as handle:
+            handle.write("2024-01-01T01:00:00,100.25,50.5,20.125\n")
+        with urllib.request.urlopen(request) as response:
+            assert gzip.decompress(response.read()).endswith(b"01:00:00,100.25,50.5,20.125\n")
+        assert [path.name for path in tmp_path.glob(".sample.csv.*")] == [
+            server._gzip_variant_path(
+                tmp_path / "sample.csv", (tmp_path / "sample.csv").stat()
+            ).name
+        ]
+
+        assert server.negotiate_encoding("gzip;q=0, *", 4096) == "identity"
+        assert server.negotiate_encoding("*", 4096) == "gzip"
+        assert server.negotiate_encoding("gzip", 10) == "identity"
+    finally:
+        httpd.shutdown()
+        thread.join(timeout=1)
+
+
+def test_csv_routes_slice_by_time_and_downsample(tmp_path: Path) -> None:
+    httpd, thread = _start_server(tmp_path)
+    rows = "".join(f"2024-01-01T{m // 60:02d}:{m % 60:02d}:00,{m},50,20\n" for m in range(600))
+    (tmp_path / "sample.csv").write_text("timestamp,flow,pressure,temperature\n" + rows)
+    try:
+        base_url = f"http://127.0.0.1:{httpd.server_port}/data/sample"
+        query = "?start=2024-01-01T01:00:00&end=2024-01-01T02:59:00&max_points=12"
+        with urllib.request.urlopen(base_url + query) as response:
+            lines = response.read().decode("utf-8").splitlines()
+        assert lines[0] == "timestamp,flow,pressure,temperature"
+        assert 1 < len(lines) - 1 <= 12
+        assert lines[1] == "2024-01-01T01:00:00,60.0,50.0,20.0"
+        assert lines[-1] == "2024-01-01T02:59:00,179.0,50.0,20.0"
+
+        for bad in ("?max_points=2", "?start=yesterday"):
+            try:
+                urllib.request.urlopen(base_url + bad)
+            except urllib.error.HTTPError as exc:
+                assert exc.code == 400
+            else:
+                raise AssertionError(f"Expected 400 for {bad}")
+    finally:
+        httpd.shutdown()
+        thread.join(timeout=1)
+
+
+def test_rollup_route_picks_the_finest_level_that_fits(tmp_path: Path) -> None:
+    httpd, thread = _start_server(tmp_path)
+    pyramid = RollupPyramid()
+    pyramid.update(read_frame(Path(__file__).resolve().parents[1] / "data" / "sample.csv"))
+    write_pyramid(tmp_path / "rollups", pyramid)
+    try:
+        base_url = f"http://127.0.0.1:{httpd.server_port}/data/rollup"
+        with urllib.request.urlopen(f"{base_url}?max_points=40") as response:
+            payload = json.loads(response.read())
+        assert payload["level"] == "10min"
+        assert len(payload["timestamp"]) == 36
+
+        query = "?level=1h&start=2024-01-01T01:30:00&end=2024-01-01T02:00:00"
+        with urllib.request.urlopen(base_url + query) as response:
+            payload = json.loads(response.read())
+        assert payload["timestamp"] == ["2024-01-01T01:00:00", "2024-01-01T02:00:00"]
+        assert payload["flow"]["count"] == [50, 60]
+
+        try:
+            urllib.request.urlopen(f"{base_url}?level=1week")
+        except urllib.error.HTTPError as exc:
+            assert exc.code == 400
+        else:
+            raise AssertionError("Expected 400 for an unknown level")
+    finally:
+        httpd.shutdown()
+        thread.join(timeout=1)
+
+
+def test_files_stream_from_disk_with_range_support(tmp_path: Path) -> None:
+    httpd, thread = _start_server(tmp_path, server.PooledHTTPServer)
+    rows = "".join(f"2024-01-01T00:{minute:02d}:00,100.25,50.5,20.125\r\n" for minute in range(60))
+    source = tmp_path / "cleaned.csv"
+    source.write_bytes(("timestamp,flow,pressure,temperature\r\n" + rows).encode("utf-8"))
+    expected = source.read_bytes()
+    try:
+        connection = http.client.HTTPConnection("127.0.0.1", httpd.server_port, timeout=2)
+        connection.request("GET", "/data/cleaned")
+        response = connection.getresponse()
+        assert response.status == 200
+        assert response.getheader("Accept-Ranges") == "bytes"
+        assert response.read() == expected
+        etag = response.getheader("ETag", "")
+
+        connection.request("GET", "/data/cleaned", headers={"Range": "bytes=10-19"})
+        response = connection.getresponse()
+        assert response.status == 206
+        assert response.getheader("Content-Range") == f"bytes 10-19/{len(expected)}"
+        assert response.read() == expected[10:20]
+
+        connection.request("GET", "/data/cleaned", headers={"Range": "bytes=-7", "If-Range": etag})
+        response = connection.getresponse()
+        assert response.status == 206
+        assert response.read() == expected[-7:]
+
+        connection.request("GET", "/data/cleaned", headers={"Range": f"bytes={len(expected)}-"})
+        response = connection.getresponse()
+        assert response.status == 416
+        response.read()
+
+        for _ in range(2):  # streamed with chunked encoding, then served from the cache
+            connection.request(
+                "GET", "/data/cleaned", headers={"Accept-Encoding": "gzip", "Range": "bytes=0-3"}
+            )
+            response = connection.getresponse()
+            body = response.read()
+            assert response.getheader("Content-Encoding") == "gzip"
+        assert response.status == 206
+        assert response.getheader("Transfer-Encoding") is None
+        assert body == b"\x1f\x8b\x08\x00"
+        connection.close()
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+        thread.join(timeout=1)
+
+
+def test_http10_clients_get_a_stored_gzip_variant_with_a_length(tmp_path: Path) -> None:
+    httpd, thread = _start_server(tmp_path)
+    rows = "".join(f"2024-01-01T00:{minute:02d}:00,100.25,50.5,20.125\n" for minute in range(60))
+    (tmp_path / "sample.csv").write_text("timestamp,flow,pressure,temperature\n" + rows)
+    try:
+        with socket.create_connection(("127.0.0.1", httpd.server_port), timeout=2) as client:
+            client.sendall(b"GET /data/sample HTTP/1.0\r\nAccept-Encoding: gzip\r\n\r\n")
+            reply = b"".join(iter(lambda: client.recv(65536), b""))
+        head, _, body = reply.partition(b"\r\n\r\n")
+        assert f"Content-Length: {len(body)}".encode() in head
+        assert gzip.decompress(body) == (tmp_path / "sample.csv").read_bytes()
+        assert [path.read_bytes() for path in tmp_path.glob(".sample.csv.*.gz")] == [body]
+    finally:
+        httpd.shutdown()
+        thread.join(timeout=1)
+
+
+def test_parse_byte_range() -> None:
+    assert server.parse_byte_range("bytes=0-9", 100) == (0, 9)
+    assert server.parse_byte_range("bytes=90-", 100) == (90, 99)
+    assert server.parse_byte_range("bytes=-10", 100) == (90, 99)
+    assert server.parse_byte_range("bytes=50-500", 100) == (50, 99)
+    assert server.parse_byte_range("bytes=0-1,5-6", 100) is None
+    assert server.parse_byte_range("items=0-1", 100) is None
+    assert server.parse_byte_range("bytes=9-2", 100) is None
+    for unsatisfiable in ("bytes=100-", "bytes=-0"):
+        try:
+            server.parse_byte_range(unsatisfiable, 100)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f"Expected {unsatisfiable} to be unsatisfiable")
+
+
+def test_stream_pushes_appended_rows_as_server_sent_events(tmp_path: Path) -> None:
+    httpd, thread = _start_server(tmp_path, server.PooledHTTPServer)
+    try:
+        connection = http.client.HTTPConnection("127.0.0.1", httpd.server_port, timeout=5)
+        connection.request("GET", "/stream")
+        response = connection.getresponse()
+        assert response.getheader("Content-Type") == "text/event-stream"
+
+        with (tmp_path / "sample.csv").open("a") as handle:
+            handle.write("2024-01-01T00:01:00,101,50,20\n")
+        event = [response.readline().decode().strip() for _ in range(3)]
+        assert event[0] == "id: 1"
+        assert event[1] == "event: telemetry"
+        payload = json.loads(event[2].removeprefix("data: "))
+        assert payload == {
+            "timestamp": ["2024-01-01T00:01:00"],
+            "flow": [101.0],
+            "pressure": [50.0],
+            "temperature": [20.0],
+        }
+        connection.close()
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+        thread.join(timeout=1)
+
+
+def test_streams_do_not_hold_request_workers(tmp_path: Path) -> None:
+    httpd, thread = _start_server(tmp_path, server.PooledHTTPServer, workers=2, max_streams=4)
+    streams = []
+    try:
+        for _ in range(4):
+            connection = http.client.HTTPConnection("127.0.0.1", httpd.server_port, timeout=5)
+            connection.request("GET", "/stream")
+            response = connection.getresponse()
+            assert response.status == 200
+            streams.append((connection, response))
+
+        connection = http.client.HTTPConnection("127.0.0.1", httpd.server_port, timeout=2)
+        connection.request("GET", "/health")
+        assert connection.getresponse().status == 200
+        connection.close()
+
+        connection = http.client.HTTPConnection("127.0.0.1", httpd.server_port, timeout=2)
+        connection.request("GET", "/stream")
+        response = connection.getresponse()
+        assert response.status == 503
+        assert json.loads(response.read()) == {"error": "Too many streams"}
+        connection.close()
+    finally:
+        for connection, response in streams:
+            response.close()
+            connection.close()
+        httpd.shutdown()
+        httpd.server_close()
+        thread.join(timeout=1)
+    assert not thread.is_alive()
+
+
+def test_stream_is_refused_without_a_stream_hub(tmp_path: Path) -> None:
+    httpd, thread = _start_server(tmp_path)
+    try:
+        connection = http.client.HTTPConnection("127.0.0.1", httpd.server_port, timeout=2)
+        connection.request("GET", "/stream")
+        response = connection.getresponse()
+        assert response.status == 503
+        assert json.loads(response.read()) == {"error": "Streaming needs the pooled server"}
+        connection.close()
+
+        # The single thread is free again, so shutdown does not hang.
+        with urllib.request.urlopen(f"http://127.0.0.1:{httpd.server_port}/health") as health:
+            assert health.status == 200
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+        thread.join(timeout=1)
+    assert not thread.is_alive()
+
+
+def test_bundle_carries_telemetry_once_with_a_missing_mask(tmp_path: Path) -> None:
+    httpd, thread = _start_server(tmp_path)
+    (tmp_path / "sample.csv").write_text(
+        "timestamp,flow,pressure,temperature\n"
+        "2024-01-01T00:00:00,100,50,20\n"
+        "2024-01-01T00:01:00,nan,50,20\n"
+    )
+    try:
+        url = f"http://127.0.0.1:{httpd.server_port}/data/bundle"
+        with urllib.request.urlopen(url) as response:
+            etag = response.headers["ETag"]
+            payload = json.loads(response.read())
+        assert payload["telemetry"] == {
+            "timestamp": ["2024-01-01T00:00:00", "2024-01-01T00:01:00"],
+            "flow": [100.0, None],
+            "pressure": [50.0, 50.0],
+            "temperature": [20.0, 20.0],
+            "missing_rows": [1],
+        }
+        assert payload["labels"][0]["kind"] == "missing"
+        assert payload["alerts"][0]["confidence"] == 0.7
+        assert payload["assets"]["trustBoundaries"]
+        assert payload["summary"] == {"alert_count": 1, "label_count": 1}
+
+        with urllib.request.urlopen(url) as response:
+            assert response.headers["ETag"] == etag
+            assert json.loads(response.read())["generated_at"] == payload["generated_at"]
+    finally:
+        httpd.shutdown()
+        thread.join(timeout=1)
+
+
+def test_metrics_count_routes_caches_and_stage_runs(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(server, "METRICS", ServerMetrics())
+    httpd, thread = _start_server(tmp_path)
+    record_stage(tmp_path / STAGE_METRICS_FILE, "label_quality", seconds=2.0, rows=360)
+    try:
+        base_url = f"http://127.0.0.1:{httpd.server_port}"
+        for _ in range(2):
+            with urllib.request.urlopen(f"{base_url}/data/report") as response:
+                body = response.read()
+        try:
+            urllib.request.urlopen(f"{base_url}/missing")
+        except urllib.error.HTTPError as exc:
+            assert exc.code == 404
+
+        with urllib.request.urlopen(f"{base_url}/metrics") as response:
+            assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+            text = response.read().decode()
+        lines = text.splitlines()
+        assert 'telemetry_http_requests_total{route="/data/report",status="200"} 2' in text
+        assert 'telemetry_http_requests_total{route="other",status="404"} 1' in text
+        assert 'telemetry_http_request_duration_seconds_count{route="/data/report"} 2' in lines
+        size_sum = 'telemetry_http_response_size_bytes_sum{route="/data/report"}'
+        assert any(line.startswith(size_sum) for line in lines)
+        assert 'telemetry_cache_lookups_total{cache="response",result="hit"}' in text
+        assert 'telemetry_stage_rows_per_second{stage="label_quality"} 180.0' in lines
+    finally:
+        httpd.shutdown()
+        thread.join(timeout=1)
+    assert len(body) > 0
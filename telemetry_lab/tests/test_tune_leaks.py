@@ -0,0 +1,91 @@
+import numpy as np
+
+from telemetry_lab.backend.detect_leaks import CusumDetector, detect_leaks
+from telemetry_lab.backend.tune_leaks import leak_windows, sweep_cusum, sweep_parameters
+
+
+def test_sweep_matches_individual_detector_runs() -> None:
+    rng = np.random.default_rng(3)
+    flows = 100.0 + rng.normal(0.0, 1.0, 400)
+    flows[100:130] -= 4.0
+    flows[300:340] -= 3.0
+    leaks = leak_windows(
+        [
+            {"kind": "small_leak", "start_index": 100, "end_index": 129},
+            {"kind": "small_leak", "start_index": 300, "end_index": 339},
+            {"kind": "spike", "start_index": 10, "end_index": 10},
+        ]
+    )
+
+    results = sweep_parameters(
+        flows, leaks, alphas=[0.05, 0.2], drop_thresholds=[2.0, 3.0], persistences=[3, 6]
+    )
+
+    assert len(results) == 8
+    for result in results:
+        alerts = detect_leaks(
+            flows.tolist(),
+            result.persistence,
+            alpha=result.alpha,
+            drop_threshold=result.drop_threshold,
+        )
+        hits = [
+            any(alert.start_index <= end and alert.end_index >= start for start, end in leaks)
+            for alert in alerts
+        ]
+        detected = sum(
+            any(alert.start_index <= end and alert.end_index >= start for alert in alerts)
+            for start, end in leaks
+        )
+        assert result.alert_count == len(alerts)
+        assert result.true_positives == sum(hits)
+        assert result.detected_leaks == detected
+        assert result.recall == detected / 2
+
+
+def test_sweep_counts_a_run_spanning_several_unsorted_leaks() -> None:
+    flows = np.full(200, 100.0)
+    flows[50:90] -= 10.0
+    flows[150:160] -= 10.0
+    leaks = np.array([[150, 155], [80, 89], [50, 60], [100, 120]])
+
+    (result,) = sweep_parameters(
+        flows, leaks, alphas=[0.05], drop_thresholds=[2.0], persistences=[3]
+    )
+
+    assert result.true_positives == result.alert_count == 2
+    assert result.detected_leaks == 3
+    assert result.recall == 0.75
+
+
+def test_cusum_sweep_matches_individual_detector_runs() -> None:
+    rng = np.random.default_rng(5)
+    flows = 100.0 + rng.normal(0.0, 1.0, 500)
+    flows[100:140] -= 3.0
+    flows[350:420] -= 2.0
+    leaks = np.array([[100, 139], [350, 419]])
+
+    results = sweep_cusum(
+        flows,
+        leaks,
+        alphas=[0.05, 0.2],
+        slacks=[0.5, 1.0],
+        thresholds=[5.0, 10.0],
+        persistences=[1, 4],
+    )
+
+    assert len(results) == 16
+    for result in results:
+        detector = CusumDetector(
+            alpha=result.alpha,
+            slack=result.slack,
+            threshold=result.threshold,
+            persistence=result.persistence,
+        )
+        alerts = detector.detect_batch(flows)
+        assert result.alert_count == len(alerts)
+        assert result.flagged_samples == sum(a.end_index - a.start_index + 1 for a in alerts)
+        assert result.detected_leaks == sum(
+            any(a.start_index <= end and a.end_index >= start for a in alerts)
+            for start, end in leaks
+        )
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import json
+from dataclasses import asdict
+from pathlib import Path
+
+from telemetry_lab.backend.detect_leaks import detect_leaks
+from telemetry_lab.backend.frame import TelemetryFrame, read_frame
+from telemetry_lab.backend.label_quality import label_quality
+from telemetry_lab.backend.watch import TelemetryWatch, WatchPool, WatchTargets
+
+DATA_DIR = Path(__file__).resolve().parents[1] / "data"
+
+
+def _batch(frame: TelemetryFrame) -> tuple[list[dict], list[dict]]:
+    labels = [asdict(label) for label in label_quality(frame)]
+    alerts = detect_leaks(frame.channels["flow"], missing=frame.missing)
+    return labels, [asdict(alert) for alert in alerts]
+
+
+def _untimed(alerts: list[dict]) -> list[dict]:
+    return [{key: alert[key] for key in alert if not key.endswith("_time")} for alert in alerts]
+
+
+def test_watch_processes_only_appended_rows_and_matches_batch(tmp_path: Path) -> None:
+    lines = (DATA_DIR / "sample.csv").read_text().splitlines(keepends=True)
+    path = tmp_path / "sample.csv"
+    path.write_text(lines[0])
+    targets = WatchTargets(
+        input_path=path,
+        labels_path=tmp_path / "labels.json",
+        alerts_path=tmp_path / "alerts.json",
+        report_path=tmp_path / "report.json",
+    )
+    watched = TelemetryWatch(targets)
+    assert watched.poll() == 0
+    assert json.loads(targets.labels_path.read_text()) == []
+
+    for start in range(1, len(lines), 50):
+        with path.open("a") as handle:
+            handle.write("".join(lines[start : start + 50]))
+        assert watched.poll() == len(lines[start : start + 50])
+        labels, alerts = _batch(read_frame(path))
+        assert json.loads(targets.labels_path.read_text()) == labels
+        assert _untimed(json.loads(targets.alerts_path.read_text())) == alerts
+    assert watched.poll() == 0
+
+    assert targets.labels_path.read_text() == (DATA_DIR / "labels.json").read_text()
+    assert targets.alerts_path.read_text() == (DATA_DIR / "alerts.json").read_text()
+    report = json.loads(targets.report_path.read_text())
+    assert report["summary"] == {"alert_count": len(alerts), "label_count": len(labels)}
+
+    path.write_text("".join(lines[:80]))
+    assert watched.poll() == 79
+    assert json.loads(targets.labels_path.read_text()) == _batch(read_frame(path))[0]
+
+
+def test_watch_resumes_from_its_checkpoint_after_a_restart(tmp_path: Path) -> None:
+    lines = (DATA_DIR / "sample.csv").read_text().splitlines(keepends=True)
+    path = tmp_path / "sample.csv"
+    path.write_text("".join(lines[:150]))
+    targets = WatchTargets.in_directory(path, tmp_path / "out")
+    assert TelemetryWatch(targets).poll() == 149
+
+    with path.open("a") as handle:
+        handle.write("".join(lines[150:]))
+    restarted = TelemetryWatch(targets)
+    assert restarted.poll() == len(lines) - 150
+    assert targets.labels_path.read_text() == (DATA_DIR / "labels.json").read_text()
+    assert targets.alerts_path.read_text() == (DATA_DIR / "alerts.json").read_text()
+
+    # A checkpoint taken with other settings is not trusted.
+    assert TelemetryWatch(targets, persistence=3).poll() == len(lines) - 1
+    path.write_text("".join(lines[:80]))
+    assert TelemetryWatch(targets, persistence=3).poll() == 79
+
+
+def test_watch_pool_picks_up_telemetry_files_added_to_a_directory(tmp_path: Path) -> None:
+    lines = (DATA_DIR / "sample.csv").read_text().splitlines(keepends=True)
+    (tmp_path / "north.csv").write_text("".join(lines[:100]))
+    (tmp_path / "notes.csv").write_text("site,owner\n")
+    (tmp_path / ".partial.csv").write_text("".join(lines[:100]))
+    pool = WatchPool(directories=[tmp_path], out_dir=tmp_path / "out")
+    assert [item.poll() for item in pool.scan()] == [99]
+
+    (tmp_path / "south.csv").write_text("".join(lines))
+    assert [item.poll() for item in pool.scan()] == [0, len(lines) - 1]
+    out = tmp_path / "out"
+    assert (out / "south.labels.json").read_text() == (DATA_DIR / "labels.json").read_text()
+    labels = _batch(read_frame(tmp_path / "north.csv"))[0]
+    assert json.loads((out / "north.labels.json").read_text()) == labels
+    assert sorted(path.name for path in (out / ".watch").iterdir()) == [
+        "north.json",
+        "south.json",
+    ]
@@ -45,6 +45,22 @@ const addCleanedTelemetry = (rows, cleanedRows) => {
   });
 };
 
+const bundleTelemetry = (columns) => {
+  const missing = new Set(columns.missing_rows);
+  return columns.timestamp.map((timestamp, index) => {
+    const cleaned = !missing.has(index);
+    return {
+      timestamp,
+      flow: columns.flow[index],
+      pressure: columns.pressure[index],
+      temperature: columns.temperature[index],
+      flowCleaned: cleaned ? columns.flow[index] : null,
+      pressureCleaned: cleaned ? columns.pressure[index] : null,
+      temperatureCleaned: cleaned ? columns.temperature[index] : null
+    };
+  });
+};
+
 const formatWindow = (start, end) =>
   `${start.slice(11, 16)} → ${end.slice(11, 16)}`;
 
@@ -103,6 +119,21 @@ export default function App() {
   useEffect(() => {
     const fetchData = async () => {
       try {
+        const bundle = await loadJsonResource('/data/bundle', null, null);
+        if (bundle) {
+          setTelemetry(bundleTelemetry(bundle.telemetry));
+          setLabelsData(bundle.labels);
+          setAlertsData(bundle.alerts);
+          setCommsModel(bundle.assets);
+          setReportData({
+            generated_at: bundle.generated_at,
+            alerts: bundle.alerts,
+            labels: bundle.labels,
+            summary: bundle.summary
+          });
+          return;
+        }
+
         const [
           sampleCsv,
           cleanedCsv,